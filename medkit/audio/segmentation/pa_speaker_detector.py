@@ -5,8 +5,9 @@ To install them, use `pip install medkit-lib[pa-speaker-detector]`.
 
 __all__ = ["PASpeakerDetector"]
 
+import os
 from pathlib import Path
-from typing import Dict, Iterator, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from typing_extensions import Literal
 
 # When pyannote and spacy are both installed, a conflict might occur between the
@@ -22,7 +23,11 @@ from pyannote.audio.pipelines import SpeakerDiarization
 import torch
 
 from medkit.core import Attribute
-from medkit.core.audio import SegmentationOperation, Segment, Span
+from medkit.core._worker_pool import WorkerPool
+from medkit.core.audio import AudioBuffer, SegmentationOperation, Segment, Span
+
+# start, end and speaker label of speech turns
+_Turn = Tuple[float, float, str]
 
 
 class PASpeakerDetector(SegmentationOperation):
@@ -44,6 +49,12 @@ class PASpeakerDetector(SegmentationOperation):
     - group voice segments by speakers using a clustering algorithm such as
       agglomerative clustering, HMM, etc.
 
+    Input segments can be processed in parallel in several worker processes
+    (cf `nb_workers`), each of them loading its own copy of the models. This is
+    mostly useful on CPU-only machines, when running the detector on many
+    segments (for instance all the recordings of an audio archive). Worker
+    processes are started on first use and kept until :meth:`close` is called
+    or the detector is deleted.
     """
 
     def __init__(
@@ -62,6 +73,8 @@ class PASpeakerDetector(SegmentationOperation):
         max_nb_speakers: Optional[int] = None,
         segmentation_batch_size: int = 1,
         embedding_batch_size: int = 1,
+        segmentation_step: float = 0.1,
+        nb_workers: int = 1,
         uid: Optional[str] = None,
     ):
         """
@@ -93,6 +106,20 @@ class PASpeakerDetector(SegmentationOperation):
             Number of input segments in batches processed by segmentation model.
         embedding_batch_size:
             Number of pre-segmented audios in batches processed by embedding model.
+        segmentation_step:
+            Step of the window sliding over the audio to which the segmentation
+            model is applied, as a ratio of its duration. Embeddings are
+            computed for each speaker of each window, so increasing the step
+            (ie. reducing the overlap of consecutive windows) reduces the
+            number of embeddings to compute, at the cost of a possibly less
+            accurate segmentation.
+        nb_workers:
+            Number of worker processes in which to process input segments. When
+            greater than 1, the models are only loaded by the worker processes,
+            which are kept between calls to :meth:`run` (including calls with a
+            single segment, for instance in a
+            :class:`~medkit.core.DocPipeline`), and the computing threads used
+            by torch are evenly shared by the workers.
         uid:
             Identifier of the detector.
         """
@@ -102,19 +129,36 @@ class PASpeakerDetector(SegmentationOperation):
         init_args.pop("self")
         super().__init__(**init_args)
 
+        if nb_workers < 1:
+            raise ValueError("nb_workers must be greater or equal to 1")
+
         self.output_label = output_label
         self.min_nb_speakers = min_nb_speakers
         self.max_nb_speakers = max_nb_speakers
+        self.nb_workers = nb_workers
 
-        self._pipeline = SpeakerDiarization(
+        pipeline_args = dict(
             segmentation=str(segmentation_model),
             embedding=str(embedding_model),
             clustering=clustering,
             embedding_exclude_overlap=True,
             segmentation_batch_size=segmentation_batch_size,
             embedding_batch_size=embedding_batch_size,
+            segmentation_step=segmentation_step,
         )
-        self._pipeline.instantiate(pipeline_params)
+        if nb_workers > 1:
+            # share computing threads between workers rather than having each
+            # of them use all the cores
+            nb_threads = max(1, (os.cpu_count() or 1) // nb_workers)
+            self._worker_pool: Optional[WorkerPool] = WorkerPool(
+                nb_workers,
+                initializer=_init_worker,
+                initargs=(pipeline_args, pipeline_params, nb_threads),
+            )
+            self._pipeline = None
+        else:
+            self._worker_pool = None
+            self._pipeline = _create_pipeline(pipeline_args, pipeline_params)
 
     def run(self, segments: List[Segment]) -> List[Segment]:
         """Return all turn segments detected for all input `segments`.
@@ -130,32 +174,49 @@ class PASpeakerDetector(SegmentationOperation):
             Segments detected as containing speech activity (with speaker
             attributes)
         """
+        if self._worker_pool is not None:
+            # audio buffers are sent rather than signals, so that audio files
+            # are read by the workers
+            tasks = (
+                (seg.audio, self.min_nb_speakers, self.max_nb_speakers)
+                for seg in segments
+            )
+            # imap() returns results in the order of segments
+            all_turns = self._worker_pool.imap(_get_turns_in_worker, tasks)
+        else:
+            all_turns = (
+                _get_turns(
+                    self._pipeline,
+                    seg.audio,
+                    self.min_nb_speakers,
+                    self.max_nb_speakers,
+                )
+                for seg in segments
+            )
+
         return [
             turn_seg
-            for seg in segments
-            for turn_seg in self._detect_turns_in_segment(seg)
+            for seg, turns in zip(segments, all_turns)
+            for turn_seg in self._build_turn_segments(seg, turns)
         ]
 
-    def _detect_turns_in_segment(self, segment: Segment) -> Iterator[Segment]:
-        audio = segment.audio
-        file = {
-            "waveform": torch.from_numpy(audio.read()),
-            "sample_rate": audio.sample_rate,
-        }
-
-        diarization = self._pipeline.apply(
-            file,
-            min_speakers=self.min_nb_speakers,
-            max_speakers=self.max_nb_speakers,
-        )
+    def close(self):
+        """Stop the worker processes, if any (they are started again if the
+        detector is run afterwards)"""
+        if self._worker_pool is not None:
+            self._worker_pool.close()
 
-        for turn, _, speaker in diarization.itertracks(yield_label=True):
+    def _build_turn_segments(
+        self, segment: Segment, turns: List[_Turn]
+    ) -> Iterator[Segment]:
+        audio = segment.audio
+        for start, end, speaker in turns:
             # trim original audio to turn start/end points
-            turn_audio = audio.trim_duration(turn.start, turn.end)
+            turn_audio = audio.trim_duration(start, end)
 
             turn_span = Span(
-                start=segment.span.start + turn.start,
-                end=segment.span.start + turn.end,
+                start=segment.span.start + start,
+                end=segment.span.start + end,
             )
             speaker_attr = Attribute(label="speaker", value=speaker)
             turn_segment = Segment(
@@ -170,3 +231,52 @@ class PASpeakerDetector(SegmentationOperation):
                 self._prov_tracer.add_prov(speaker_attr, self.description, [segment])
 
             yield turn_segment
+
+
+def _create_pipeline(
+    pipeline_args: Dict[str, Any], pipeline_params: Optional[Dict]
+) -> SpeakerDiarization:
+    pipeline = SpeakerDiarization(**pipeline_args)
+    pipeline.instantiate(pipeline_params)
+    return pipeline
+
+
+def _get_turns(
+    pipeline: SpeakerDiarization,
+    audio: AudioBuffer,
+    min_nb_speakers: Optional[int],
+    max_nb_speakers: Optional[int],
+) -> List[_Turn]:
+    file = {
+        # copied since torch doesn't support read-only arrays
+        "waveform": torch.from_numpy(audio.read(copy=True)),
+        "sample_rate": audio.sample_rate,
+    }
+    diarization = pipeline.apply(
+        file,
+        min_speakers=min_nb_speakers,
+        max_speakers=max_nb_speakers,
+    )
+    return [
+        (turn.start, turn.end, speaker)
+        for turn, _, speaker in diarization.itertracks(yield_label=True)
+    ]
+
+
+# pipeline of the current worker process
+_worker_pipeline: Optional[SpeakerDiarization] = None
+
+
+def _init_worker(
+    pipeline_args: Dict[str, Any], pipeline_params: Optional[Dict], nb_threads: int
+):
+    global _worker_pipeline
+    torch.set_num_threads(nb_threads)
+    _worker_pipeline = _create_pipeline(pipeline_args, pipeline_params)
+
+
+def _get_turns_in_worker(
+    task: Tuple[AudioBuffer, Optional[int], Optional[int]]
+) -> List[_Turn]:
+    assert _worker_pipeline is not None
+    return _get_turns(_worker_pipeline, *task)
@@ -6,13 +6,13 @@ To install them, use `pip install medkit-lib[webrtc-voice-detector]`.
 __all__ = ["WebRTCVoiceDetector"]
 
 import collections
-from typing import Iterator, List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 from typing_extensions import Literal
 
 import numpy as np
 import webrtcvad
 
-from medkit.core.audio import SegmentationOperation, Segment, Span
+from medkit.core.audio import AudioBuffer, SegmentationOperation, Segment, Span
 
 
 _SUPPORTED_SAMPLE_RATES = {8000, 16000, 32000, 48000}
@@ -34,6 +34,7 @@ class WebRTCVoiceDetector(SegmentationOperation):
         frame_duration: Literal[10, 20, 30] = 30,
         nb_frames_in_window: int = 10,
         switch_ratio: float = 0.9,
+        block_duration: Optional[float] = None,
         uid: Optional[str] = None,
     ):
         """
@@ -52,6 +53,11 @@ class WebRTCVoiceDetector(SegmentationOperation):
         switch_ratio:
             Percentage of speech/non-speech frames required to switch the window speech
             state when aggregating per-frame VAD results.
+        block_duration:
+            Duration in seconds of the blocks of audio read at once. If `None`,
+            the whole audio of each segment is read at once. Reading by blocks
+            allows processing long recordings without loading their whole
+            signal in memory, with identical results.
         uid:
             Identifier of the detector.
         """
@@ -66,6 +72,7 @@ class WebRTCVoiceDetector(SegmentationOperation):
         self.frame_duration = frame_duration
         self.nb_frames_in_window = nb_frames_in_window
         self.switch_ratio = switch_ratio
+        self.block_duration = block_duration
 
         self._vad = webrtcvad.Vad(aggressiveness)
 
@@ -104,15 +111,8 @@ class WebRTCVoiceDetector(SegmentationOperation):
         sample_rate = audio.sample_rate
         nb_samples = audio.nb_samples
 
-        signal = audio.read()
-        # convert float32 signal to int16 (required by webrtcvad)
-        int_signal = (signal * 32767).astype(np.int16)
         frame_length = int(self.frame_duration * sample_rate / 1000)
-        # zero-pad tail and split in frames
-        padding_length = frame_length - nb_samples % frame_length
-        padding = np.zeros((1, padding_length), dtype=np.int16)
-        int_signal = np.concatenate((int_signal, padding), axis=1)
-        frames = np.split(int_signal, int_signal.shape[1] / frame_length, axis=1)
+        frames = self._iter_frames(audio, frame_length)
 
         # run vad
         speech_frame_indices = self._get_aggregated_vad(frames, sample_rate)
@@ -139,21 +139,53 @@ class WebRTCVoiceDetector(SegmentationOperation):
 
             yield voiced_segment
 
+    def _iter_frames(self, audio: AudioBuffer, frame_length: int) -> Iterator[bytes]:
+        """Yield the frames of `audio` to pass to webrtcvad, reading it by
+        blocks"""
+
+        nb_samples = audio.nb_samples
+        if self.block_duration is None:
+            # range() step can't be 0 for empty audio
+            block_length = max(nb_samples, 1)
+        else:
+            # blocks must contain whole frames
+            nb_frames_in_block = int(self.block_duration * audio.sample_rate) // (
+                frame_length
+            )
+            block_length = max(nb_frames_in_block, 1) * frame_length
+
+        for block_start in range(0, nb_samples, block_length):
+            block_end = min(block_start + block_length, nb_samples)
+            signal = audio.trim(block_start, block_end).read()
+            # convert float32 signal to int16 (required by webrtcvad)
+            int_signal = (signal[0] * 32767).astype(np.int16)
+            for frame_start in range(0, len(int_signal), frame_length):
+                frame = int_signal[frame_start : frame_start + frame_length]
+                if len(frame) < frame_length:
+                    # zero-pad tail
+                    padding = np.zeros(frame_length - len(frame), dtype=np.int16)
+                    frame = np.concatenate((frame, padding))
+                yield frame.tobytes()
+
+        # tail is padded with a whole frame even when there is no partial frame
+        if nb_samples % frame_length == 0:
+            yield np.zeros(frame_length, dtype=np.int16).tobytes()
+
     # from https://github.com/wiseman/py-webrtcvad/blob/master/example.py
-    def _get_aggregated_vad(self, frames, sample_rate):
-        """Return index ranges of voiced frames using webrtcvad"""
+    def _get_aggregated_vad(
+        self, frames: Iterable[bytes], sample_rate: int
+    ) -> Iterator[Tuple[int, int]]:
+        """Yield index ranges of voiced frames using webrtcvad"""
 
         # deque for our sliding window ring buffer
         window_ring_buffer = collections.deque(maxlen=self.nb_frames_in_window)
         # we have two states: SPEECH and NONSPEECH (we start in NONSPEECH)
         is_speech = False
 
-        speech_frame_ranges = []
         start_index = None
         for i, frame in enumerate(frames):
             # compute speech state for frame and push it to ring buffer of frames in window
-            frame_bytes = frame.tobytes()
-            frame_is_speech = self._vad.is_speech(frame_bytes, sample_rate)
+            frame_is_speech = self._vad.is_speech(frame, sample_rate)
             window_ring_buffer.append((i, frame_is_speech))
 
             if not is_speech:
@@ -180,12 +212,10 @@ class WebRTCVoiceDetector(SegmentationOperation):
                     is_speech = False
                     # push indices of the SPEECH range that just ended
                     end_index, _ = window_ring_buffer[-1]
-                    speech_frame_ranges.append((start_index, end_index))
+                    yield start_index, end_index
                     window_ring_buffer.clear()
 
         # handle trail
         if is_speech and window_ring_buffer:
             end_index, _ = window_ring_buffer[-1]
-            speech_frame_ranges.append((start_index, end_index))
-
-        return speech_frame_ranges
+            yield start_index, end_index
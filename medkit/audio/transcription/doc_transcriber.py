@@ -10,6 +10,7 @@ from medkit.audio.transcription.transcribed_document import TranscribedDocument
 from medkit.core import Operation
 from medkit.core.audio import AudioDocument, AudioBuffer, Segment as AudioSegment
 from medkit.core.text import Segment as TextSegment, Span as TextSpan
+from medkit.core.utils import batch_list
 
 
 class TranscriberFunction(Protocol):
@@ -76,6 +77,12 @@ class DocTranscriber(Operation):
 
     The actual transcription task is delegated to a :class:`~.TranscriberFunction`
     that must be provided.
+
+    By default, the audio segments of each document are transcribed together.
+    When `batch_size` is provided, the audio segments of all documents are
+    pooled and sorted by duration before being transcribed by batches, so that
+    the batches processed by the transcriber function contain segments of
+    similar durations, which reduces padding.
     """
 
     def __init__(
@@ -84,6 +91,7 @@ class DocTranscriber(Operation):
         output_label: str,
         transcriber_func: TranscriberFunction,
         attrs_to_copy: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
         uid: Optional[str] = None,
     ):
         """
@@ -99,6 +107,11 @@ class DocTranscriber(Operation):
         attrs_to_copy:
             Labels of attributes that should be copied from the original audio segments
             to the transcribed text segments.
+        batch_size:
+            Maximum number of audio segments passed at once to the transcriber
+            function, pooled from all documents and sorted by duration. If
+            `None`, the segments of each document are passed at once, in their
+            original order.
         uid:
             Identifier of the transcriber.
         """
@@ -110,11 +123,14 @@ class DocTranscriber(Operation):
 
         if attrs_to_copy is None:
             attrs_to_copy = []
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be greater or equal to 1")
 
         self.input_label = input_label
         self.output_label = output_label
         self.transcriber_func = transcriber_func
         self.attrs_to_copy = attrs_to_copy
+        self.batch_size = batch_size
 
     def run(self, audio_docs: List[AudioDocument]) -> List[TranscribedDocument]:
         """Return a transcribed text document for each document in `audio_docs`
@@ -129,7 +145,36 @@ class DocTranscriber(Operation):
         List[TranscribedDocument]:
             Transcribed text documents (once per document in `audio_docs`)
         """
-        return [self._transcribe_doc(d) for d in audio_docs]
+        if self.batch_size is None:
+            return [self._transcribe_doc(d) for d in audio_docs]
+
+        # get all audio segments with specified label in all docs
+        audio_segs_by_doc = [d.anns.get(label=self.input_label) for d in audio_docs]
+        audios = [seg.audio for segs in audio_segs_by_doc for seg in segs]
+        texts = self._transcribe_by_duration(audios)
+
+        # split texts back by doc
+        text_docs = []
+        start = 0
+        for audio_doc, audio_segs in zip(audio_docs, audio_segs_by_doc):
+            end = start + len(audio_segs)
+            text_doc = self._build_text_doc(audio_doc, audio_segs, texts[start:end])
+            text_docs.append(text_doc)
+            start = end
+        return text_docs
+
+    def _transcribe_by_duration(self, audios: List[AudioBuffer]) -> List[str]:
+        """Transcribe `audios` by batches of audios of similar durations, and
+        return texts in the original order"""
+
+        indices = sorted(range(len(audios)), key=lambda i: audios[i].duration)
+        texts: List[Optional[str]] = [None] * len(audios)
+        for batch_indices in batch_list(indices, self.batch_size):
+            batch_audios = [audios[i] for i in batch_indices]
+            batch_texts = self.transcriber_func.transcribe(batch_audios)
+            for i, text in zip(batch_indices, batch_texts):
+                texts[i] = text
+        return texts
 
     def _transcribe_doc(self, audio_doc: AudioDocument) -> TranscribedDocument:
         # get all audio segments with specified label
@@ -137,7 +182,14 @@ class DocTranscriber(Operation):
         # transcribe them to text
         audios = [seg.audio for seg in audio_segs]
         texts = self.transcriber_func.transcribe(audios)
+        return self._build_text_doc(audio_doc, audio_segs, texts)
 
+    def _build_text_doc(
+        self,
+        audio_doc: AudioDocument,
+        audio_segs: List[AudioSegment],
+        texts: List[str],
+    ) -> TranscribedDocument:
         # rebuild full text and segments from transcribed texts
         full_text = ""
         text_segs = []
@@ -12,6 +12,7 @@ __all__ = [
     "DocPipeline",
     "Document",
     "generate_id",
+    "set_id_generator",
     "DocOperation",
     "Operation",
     "OperationDescription",
@@ -20,10 +21,13 @@ __all__ = [
     "PipelineCompatibleOperation",
     "DescribableOperation",
     "ProvCompatibleOperation",
+    "PipelineProfiler",
+    "StepProfile",
     "ProvTracer",
     "Prov",
     "Store",
     "GlobalStore",
+    "create_store",
     "ProvStore",
     "create_prov_store",
     # not imported
@@ -41,7 +45,7 @@ from .conversion import InputConverter, OutputConverter
 from .data_item import IdentifiableDataItem, IdentifiableDataItemWithAttrs
 from .doc_pipeline import DocPipeline
 from .document import Document
-from .id import generate_id
+from .id import generate_id, set_id_generator
 from .operation import Operation, DocOperation
 from .operation_desc import OperationDescription
 from .pipeline import (
@@ -51,6 +55,7 @@ from .pipeline import (
     DescribableOperation,
     ProvCompatibleOperation,
 )
+from .pipeline_profiler import PipelineProfiler, StepProfile
 from .prov_tracer import ProvTracer, Prov
-from .store import Store, GlobalStore
+from .store import Store, GlobalStore, create_store
 from .prov_store import ProvStore, create_prov_store
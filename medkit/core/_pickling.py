@@ -0,0 +1,100 @@
+"""
+Serialization of data items with pickle, independently of the global store.
+
+Attributes of annotations and annotations of documents are held by the global
+store (cf :class:`~medkit.core.GlobalStore`) rather than by their containers,
+and the store is specific to each process. Pickling an annotation or a
+document with the standard pickle functions would therefore pickle the whole
+store. The functions of this module pickle data items along with their
+container instead.
+
+Unpickling has no side effect on the global store, except for the
+annotations of unpickled documents: attributes of unpickled annotations are
+kept by their container, and only added to the global store when the
+annotation is added to a document (so that unpickling a copy of an annotation
+doesn't replace the attributes of the original one in the store).
+"""
+
+__all__ = ["dumps", "loads"]
+
+import copyreg
+import io
+import pickle
+from typing import Any, Callable, Dict, List, Optional
+
+from medkit.core.annotation_container import AnnotationContainer
+from medkit.core.attribute_container import AttributeContainer
+from medkit.core.store import GlobalStore
+
+
+def dumps(obj: Any, reducers: Optional[Dict[type, Callable]] = None) -> bytes:
+    """Pickle `obj`, pickling attribute and annotation containers without their
+    store
+
+    Parameters
+    ----------
+    obj:
+        Object to pickle (data item, list of data items, operation, etc)
+    reducers:
+        Additional reduction functions to use for some classes
+        (cf `copyreg.pickle()`)
+    """
+
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    for container_class in _get_subclasses(AttributeContainer):
+        pickler.dispatch_table[container_class] = _reduce_attr_container
+    for container_class in _get_subclasses(AnnotationContainer):
+        pickler.dispatch_table[container_class] = _reduce_ann_container
+    if reducers is not None:
+        pickler.dispatch_table.update(reducers)
+    pickler.dump(obj)
+    return buffer.getvalue()
+
+
+def loads(data: bytes) -> Any:
+    """Unpickle data pickled with :func:`dumps`"""
+    return pickle.loads(data)
+
+
+def _reduce_attr_container(container: AttributeContainer):
+    state = container.__dict__.copy()
+    del state["_store"]
+    del state["_unstored_attrs_by_id"]
+    return _rebuild_attr_container, (type(container), state, container.get())
+
+
+def _rebuild_attr_container(
+    container_class: type, state: Dict[str, Any], attrs: List[Any]
+) -> AttributeContainer:
+    container = container_class.__new__(container_class)
+    container.__dict__.update(state)
+    container._store = GlobalStore.get_store()
+    container._unstored_attrs_by_id = {attr.uid: attr for attr in attrs}
+    return container
+
+
+def _reduce_ann_container(container: AnnotationContainer):
+    state = container.__dict__.copy()
+    del state["_store"]
+    return _rebuild_ann_container, (type(container), state, list(container))
+
+
+def _rebuild_ann_container(
+    container_class: type, state: Dict[str, Any], anns: List[Any]
+) -> AnnotationContainer:
+    container = container_class.__new__(container_class)
+    container.__dict__.update(state)
+    container._store = GlobalStore.get_store()
+    for ann in anns:
+        container._store.store_data_item(data_item=ann, parent_id=container._doc_id)
+        container._store_attrs(ann)
+    return container
+
+
+def _get_subclasses(class_: type) -> List[type]:
+    subclasses = [class_]
+    for subclass in class_.__subclasses__():
+        subclasses += _get_subclasses(subclass)
+    return subclasses
@@ -2,12 +2,19 @@ from __future__ import annotations
 
 __all__ = ["ProvGraph", "ProvNode"]
 
+import array
 import dataclasses
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# index used in arrays when there is no operation or no edge
+_NONE = -1
 
 
 @dataclasses.dataclass
 class ProvNode:
+    # no per-instance dict, nodes are built each time they are retrieved
+    __slots__ = ("data_item_id", "operation_id", "source_ids", "derived_ids")
+
     data_item_id: str
     operation_id: Optional[str]
     source_ids: List[str]
@@ -23,24 +30,72 @@ class ProvNode:
 
 
 class ProvGraph:
+    """Graph of provenance nodes, possibly with sub graphs for composite
+    operations.
+
+    To limit memory usage, nodes are not stored as :class:`ProvNode` objects
+    but in a columnar way: each data item identifier is mapped to an integer
+    index, operation identifiers are interned, and source and derivation
+    edges are kept in integer arrays. `ProvNode` objects are only built when
+    nodes are retrieved, and modifying them has no effect on the graph.
+    """
+
     def __init__(
         self,
         nodes: Optional[List[ProvNode]] = None,
         sub_graphs_by_op_id: Optional[Dict[str, ProvGraph]] = None,
     ):
-        if nodes is None:
-            nodes = []
         if sub_graphs_by_op_id is None:
             sub_graphs_by_op_id = {}
 
-        self._nodes_by_id: Dict[str, ProvNode] = {n.data_item_id: n for n in nodes}
+        # data item ids by index, and reverse mapping. Indices may be allocated
+        # to ids that don't have a node yet (referenced as derived ids)
+        self._ids: List[str] = []
+        self._index_by_id: Dict[str, int] = {}
+        # 1 for indices that have a node, 0 otherwise
+        self._has_node = bytearray()
+        self._nb_nodes = 0
+
+        # interned operation ids, and operation index of each node
+        self._op_ids: List[str] = []
+        self._op_index_by_id: Dict[str, int] = {}
+        self._op_indices = array.array("i")
+
+        # sources of each node, as a slice of a flat array of indices
+        self._source_indices = array.array("i")
+        self._source_starts = array.array("i")
+        self._source_counts = array.array("i")
+
+        # derived items of each node, as linked lists of edges stored in flat
+        # arrays (derived items are added one by one, at any time)
+        self._derived_heads = array.array("i")
+        self._derived_tails = array.array("i")
+        self._edge_targets = array.array("i")
+        self._edge_nexts = array.array("i")
+
         self._sub_graphs_by_op_id: Dict[str, ProvGraph] = sub_graphs_by_op_id
 
+        if nodes is not None:
+            # allocate indices of all nodes first, to preserve their order
+            indices = [self._get_or_create_index(n.data_item_id) for n in nodes]
+            for index, node in zip(indices, nodes):
+                self._set_node(index, node.operation_id, node.source_ids)
+                for derived_id in node.derived_ids:
+                    self._add_derived(index, self._get_or_create_index(derived_id))
+
     def get_nodes(self) -> List[ProvNode]:
-        return list(self._nodes_by_id.values())
+        return [self._build_node(index) for index in self._iter_node_indices()]
 
     def get_node(self, data_item_id: str) -> ProvNode:
-        return self._nodes_by_id[data_item_id]
+        return self._build_node(self._get_node_index(data_item_id))
+
+    def get_operation_id(self, data_item_id: str) -> Optional[str]:
+        """Return the operation id of a node, without building the node"""
+        return self._get_op_id(self._get_node_index(data_item_id))
+
+    def get_source_ids(self, data_item_id: str) -> List[str]:
+        """Return the source ids of a node, without building the node"""
+        return self._get_source_ids(self._get_node_index(data_item_id))
 
     def add_node(self, data_item_id: str, operation_id: str, source_ids: List[str]):
         """Create a node describing how a data item was created.
@@ -59,7 +114,7 @@ class ProvGraph:
             don't know how it was created.
         """
 
-        node = self._nodes_by_id.get(data_item_id)
+        index = self._index_by_id.get(data_item_id)
         # 2 different cases may occur:
         # - there is no node for data_item_id. This is the most straightforward
         #   case, we just create a node with the provided operation_id and
@@ -70,54 +125,45 @@ class ProvGraph:
         #   data_item_id was used as a source_id in a previous call to
         #   add_node(). In this case, we update the existing node by setting its
         #   operation_id and source_ids to the provided values.
-        if node is None:
-            # no node exist for the data item, we just have to create one
-            node = ProvNode(
-                data_item_id=data_item_id,
-                operation_id=operation_id,
-                source_ids=source_ids,
-                derived_ids=[],
-            )
-            self._nodes_by_id[data_item_id] = node
-        else:
+        if index is not None and self._has_node[index]:
             # a node already exists for the data item. this is valid only if the
             # node is a "stub" node, otherwise it probably means that add_node()
             # has been called twice with the same data_item_id
             assert (
-                node.operation_id is None
+                self._op_indices[index] == _NONE
             ), f"Node with uid {data_item_id} already added to graph"
             # check consistency of stub node: operation_id should be None, and
             # source_ids should be empty
-            assert len(node.source_ids) == 0, (
+            assert self._source_counts[index] == 0, (
                 "Inconsistent values for stub node: operation_id is None but source_ids"
                 " is not empty"
             )
-            # we are now sure that the node is a stub node and that operation_id
-            # and source_ids are empty and can be set to the provided values
-            node.operation_id = operation_id
-            node.source_ids = source_ids
+        elif index is None:
+            index = self._get_or_create_index(data_item_id)
+        # (re)set operation_id and source_ids of new or stub node
+        self._set_node(index, operation_id, source_ids)
 
         # update derivation edges of source nodes
         for source_id in source_ids:
-            source_node = self._nodes_by_id.get(source_id)
+            source_index = self._get_or_create_index(source_id)
             # if source item is unknown to graph,
             # create stub node with no operation
-            if source_node is None:
-                source_node = ProvNode(
-                    source_id,
-                    operation_id=None,
-                    source_ids=[],
-                    derived_ids=[],
-                )
-                self._nodes_by_id[source_id] = source_node
-            source_node.derived_ids.append(data_item_id)
+            if not self._has_node[source_index]:
+                self._set_node(source_index, None, [])
+            self._add_derived(source_index, index)
 
     def has_node(self, data_item_id: str) -> bool:
-        return data_item_id in self._nodes_by_id
+        index = self._index_by_id.get(data_item_id)
+        return index is not None and bool(self._has_node[index])
 
     def get_sub_graphs(self) -> List[ProvGraph]:
         return list(self._sub_graphs_by_op_id.values())
 
+    def iter_sub_graphs(self) -> Iterator[Tuple[str, ProvGraph]]:
+        """Iterate over the sub graphs, with the identifier of the composite
+        operation of each of them"""
+        return iter(self._sub_graphs_by_op_id.items())
+
     def has_sub_graph(self, operation_id: str) -> bool:
         return operation_id in self._sub_graphs_by_op_id
 
@@ -127,31 +173,75 @@ class ProvGraph:
     def add_sub_graph(self, operation_id: str, sub_graph: ProvGraph):
         if operation_id in self._sub_graphs_by_op_id:
             current_sub_graph = self._sub_graphs_by_op_id[operation_id]
+            # composite operations called several times add their sub graph each
+            # time, which is already up to date
+            if current_sub_graph is sub_graph:
+                return
             new_sub_graph = current_sub_graph._merge(sub_graph)
             self._sub_graphs_by_op_id[operation_id] = new_sub_graph
         else:
             self._sub_graphs_by_op_id[operation_id] = sub_graph
 
+    def update(self, other_graph: ProvGraph):
+        """Add all nodes and sub graphs of another graph (for instance built in
+        another process) to this graph.
+
+        Nodes existing in both graphs are merged: stub nodes are completed with
+        the operation and source ids of the other graph and derivation edges are
+        combined. Sub graphs existing in both graphs are updated recursively.
+        """
+
+        for other_node in other_graph.get_nodes():
+            index = self._get_or_create_index(other_node.data_item_id)
+            if not self._has_node[index]:
+                self._set_node(index, other_node.operation_id, other_node.source_ids)
+                derived_ids = []
+            else:
+                if other_node.operation_id is not None:
+                    operation_id = self._get_op_id(index)
+                    if operation_id is None:
+                        self._set_node(
+                            index, other_node.operation_id, other_node.source_ids
+                        )
+                    else:
+                        assert (
+                            operation_id == other_node.operation_id
+                            and self._get_source_ids(index) == other_node.source_ids
+                        ), (
+                            f"Node with uid {other_node.data_item_id} has"
+                            " inconsistent provenance in merged graphs"
+                        )
+                derived_ids = self._get_derived_ids(index)
+            for derived_id in other_node.derived_ids:
+                if derived_id not in derived_ids:
+                    self._add_derived(index, self._get_or_create_index(derived_id))
+
+        for operation_id, other_sub_graph in other_graph.iter_sub_graphs():
+            sub_graph = self._sub_graphs_by_op_id.get(operation_id)
+            if sub_graph is None:
+                sub_graph = ProvGraph()
+                self._sub_graphs_by_op_id[operation_id] = sub_graph
+            sub_graph.update(other_sub_graph)
+
     def _merge(self, other_graph: ProvGraph) -> ProvGraph:
-        merged_prov_graph = ProvGraph()
-        merged_prov_graph._nodes_by_id = {
-            **self._nodes_by_id,
-            **other_graph._nodes_by_id,
-        }
-        merged_prov_graph._sub_graphs_by_op_id = {
+        # nodes of other graph replace nodes of this graph with the same id
+        nodes_by_id = {n.data_item_id: n for n in self.get_nodes()}
+        nodes_by_id.update((n.data_item_id, n) for n in other_graph.get_nodes())
+        sub_graphs_by_op_id = {
             **self._sub_graphs_by_op_id,
             **other_graph._sub_graphs_by_op_id,
         }
-        return merged_prov_graph
+        return ProvGraph(list(nodes_by_id.values()), sub_graphs_by_op_id)
 
     def check_sanity(self):
-        for node_id, node in self._nodes_by_id.items():
+        nodes_by_id = {n.data_item_id: n for n in self.get_nodes()}
+        for node_id, node in nodes_by_id.items():
             if node.source_ids and node.operation_id is None:
                 raise Exception(
                     f"Node with identifier {node_id} has source ids but no operation"
                 )
             for source_id in node.source_ids:
-                source_node = self._nodes_by_id.get(source_id)
+                source_node = nodes_by_id.get(source_id)
                 if source_node is None:
                     raise Exception(
                         f"Source identifier {source_id} in node with identifier"
@@ -164,7 +254,7 @@ class ProvGraph:
                         " not exists"
                     )
             for derived_id in node.derived_ids:
-                derived_node = self._nodes_by_id.get(derived_id)
+                derived_node = nodes_by_id.get(derived_id)
                 if derived_node is None:
                     raise Exception(
                         f"Derived identifier {derived_id} in node with identifier"
@@ -180,8 +270,106 @@ class ProvGraph:
             sub_graph.check_sanity()
 
     def to_dict(self) -> Dict[str, Any]:
-        nodes = [n.to_dict() for n in self._nodes_by_id.values()]
+        nodes = [n.to_dict() for n in self.get_nodes()]
         sub_graphs_by_op_id = {
             uid: s.to_dict() for uid, s in self._sub_graphs_by_op_id.items()
         }
         return dict(nodes=nodes, sub_graphs_by_op_id=sub_graphs_by_op_id)
+
+    def _get_node_index(self, data_item_id: str) -> int:
+        index = self._index_by_id.get(data_item_id)
+        if index is None or not self._has_node[index]:
+            raise KeyError(data_item_id)
+        return index
+
+    def _get_or_create_index(self, data_item_id: str) -> int:
+        index = self._index_by_id.get(data_item_id)
+        if index is None:
+            index = len(self._ids)
+            self._ids.append(data_item_id)
+            self._index_by_id[data_item_id] = index
+            self._has_node.append(0)
+            self._op_indices.append(_NONE)
+            self._source_starts.append(0)
+            self._source_counts.append(0)
+            self._derived_heads.append(_NONE)
+            self._derived_tails.append(_NONE)
+        return index
+
+    def _set_node(self, index: int, operation_id: Optional[str], source_ids: List[str]):
+        """Create or replace the node at `index`, keeping its derivation edges"""
+
+        if not self._has_node[index]:
+            self._has_node[index] = 1
+            self._nb_nodes += 1
+
+        if operation_id is None:
+            self._op_indices[index] = _NONE
+        else:
+            op_index = self._op_index_by_id.get(operation_id)
+            if op_index is None:
+                op_index = len(self._op_ids)
+                self._op_ids.append(operation_id)
+                self._op_index_by_id[operation_id] = op_index
+            self._op_indices[index] = op_index
+
+        self._source_starts[index] = len(self._source_indices)
+        self._source_counts[index] = len(source_ids)
+        self._source_indices.extend(self._get_or_create_index(s) for s in source_ids)
+
+    def _add_derived(self, index: int, derived_index: int):
+        edge = len(self._edge_targets)
+        self._edge_targets.append(derived_index)
+        self._edge_nexts.append(_NONE)
+        tail = self._derived_tails[index]
+        if tail == _NONE:
+            self._derived_heads[index] = edge
+        else:
+            self._edge_nexts[tail] = edge
+        self._derived_tails[index] = edge
+
+    def _iter_node_indices(self) -> Iterator[int]:
+        if self._nb_nodes == len(self._ids):
+            return iter(range(self._nb_nodes))
+        return (i for i, has_node in enumerate(self._has_node) if has_node)
+
+    def _get_op_id(self, index: int) -> Optional[str]:
+        op_index = self._op_indices[index]
+        return self._op_ids[op_index] if op_index != _NONE else None
+
+    def _get_source_ids(self, index: int) -> List[str]:
+        start = self._source_starts[index]
+        end = start + self._source_counts[index]
+        return [self._ids[i] for i in self._source_indices[start:end]]
+
+    def _get_derived_ids(self, index: int) -> List[str]:
+        derived_ids = []
+        edge = self._derived_heads[index]
+        while edge != _NONE:
+            derived_ids.append(self._ids[self._edge_targets[edge]])
+            edge = self._edge_nexts[edge]
+        return derived_ids
+
+    def _build_node(self, index: int) -> ProvNode:
+        # same as _get_op_id(), _get_source_ids() and _get_derived_ids() but
+        # inlined, since nodes are built each time they are retrieved
+        ids = self._ids
+        op_index = self._op_indices[index]
+        start = self._source_starts[index]
+        source_indices = self._source_indices[
+            start : start + self._source_counts[index]
+        ]
+        derived_ids = []
+        edge = self._derived_heads[index]
+        if edge != _NONE:
+            edge_targets = self._edge_targets
+            edge_nexts = self._edge_nexts
+            while edge != _NONE:
+                derived_ids.append(ids[edge_targets[edge]])
+                edge = edge_nexts[edge]
+        return ProvNode(
+            ids[index],
+            self._op_ids[op_index] if op_index != _NONE else None,
+            [ids[i] for i in source_indices],
+            derived_ids,
+        )
@@ -0,0 +1,74 @@
+"""
+Pool of worker processes kept by an operation between calls, so that the
+models loaded by each worker are only loaded once.
+"""
+
+__all__ = ["WorkerPool"]
+
+import multiprocessing
+import multiprocessing.pool
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+
+class WorkerPool:
+    """Pool of worker processes started on first use and kept until closed.
+
+    Workers are started with the "spawn" method, since forking a process in
+    which libraries using threads (such as torch) were already used may
+    deadlock. The pool is not pickled along with its owner.
+    """
+
+    def __init__(
+        self,
+        nb_workers: int,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = (),
+    ):
+        """
+        Parameters
+        ----------
+        nb_workers:
+            Number of worker processes
+        initializer:
+            Function called by each worker process when it starts (must be
+            importable from the worker process)
+        initargs:
+            Arguments of `initializer`
+        """
+        if nb_workers < 1:
+            raise ValueError("nb_workers must be greater or equal to 1")
+
+        self.nb_workers = nb_workers
+        self._initializer = initializer
+        self._initargs = initargs
+        self._pool: Optional[multiprocessing.pool.Pool] = None
+
+    def imap(self, func: Callable[[Any], Any], tasks: Iterable[Any]) -> Iterator[Any]:
+        """Call `func` on each task in the worker processes, starting them if
+        needed, and return the results in the order of `tasks`"""
+
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(
+                self.nb_workers,
+                initializer=self._initializer,
+                initargs=self._initargs,
+            )
+        return self._pool.imap(func, tasks)
+
+    def close(self):
+        """Stop the worker processes (they are started again if needed)"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def __del__(self):
+        # __init__() may have failed before setting _pool
+        if getattr(self, "_pool", None) is not None:
+            self.close()
@@ -33,9 +33,11 @@ class AnnotationContainer(Generic[AnnotationType]):
         """
         self._store: Store = GlobalStore.get_store()
         self._doc_id = doc_id
-        self._ann_ids: List[str] = []
-        self._ann_ids_by_label: Dict[str, List[str]] = {}
-        self._ann_ids_by_key: Dict[str, List[str]] = {}
+        # dicts with None values are used as ordered sets of ids, to have
+        # fast membership checks while preserving insertion order
+        self._ann_ids: Dict[str, None] = {}
+        self._ann_ids_by_label: Dict[str, Dict[str, None]] = {}
+        self._ann_ids_by_key: Dict[str, Dict[str, None]] = {}
 
     def add(self, ann: AnnotationType):
         """
@@ -60,20 +62,28 @@ class AnnotationContainer(Generic[AnnotationType]):
                 " exists in the document"
             )
 
-        self._ann_ids.append(uid)
+        self._ann_ids[uid] = None
         self._store.store_data_item(data_item=ann, parent_id=self._doc_id)
+        self._store_attrs(ann)
 
         # update label index
         label = ann.label
         if label not in self._ann_ids_by_label:
-            self._ann_ids_by_label[label] = []
-        self._ann_ids_by_label[label].append(uid)
+            self._ann_ids_by_label[label] = {}
+        self._ann_ids_by_label[label][uid] = None
 
         # update key index
         for key in ann.keys:
             if key not in self._ann_ids_by_key:
-                self._ann_ids_by_key[key] = []
-            self._ann_ids_by_key[key].append(uid)
+                self._ann_ids_by_key[key] = {}
+            self._ann_ids_by_key[key][uid] = None
+
+    def _store_attrs(self, ann: AnnotationType):
+        # attributes of unpickled annotations are only added to the store once
+        # the annotation belongs to a document (cf medkit.core._pickling)
+        attrs = getattr(ann, "attrs", None)
+        if attrs is not None:
+            attrs._store_attrs()
 
     def __len__(self) -> int:
         """Add support for calling `len()`"""
@@ -123,15 +133,18 @@ class AnnotationContainer(Generic[AnnotationType]):
             Key to use to filter annotations.
         """
 
-        uids = iter(self._ann_ids)
-
-        if label is not None:
-            uids = (uid for uid in uids if uid in self._ann_ids_by_label.get(label, []))
-
-        if key is not None:
-            uids = (uid for uid in uids if uid in self._ann_ids_by_key.get(key, []))
-
-        return uids
+        # indexes preserve the insertion order of annotations, so they can be
+        # used directly. They are copied so that annotations can be added while
+        # iterating
+        if label is None and key is None:
+            return iter(list(self._ann_ids))
+        if key is None:
+            return iter(list(self._ann_ids_by_label.get(label, {})))
+        key_ids = self._ann_ids_by_key.get(key, {})
+        if label is None:
+            return iter(list(key_ids))
+        label_ids = self._ann_ids_by_label.get(label, {})
+        return iter([uid for uid in label_ids if uid in key_ids])
 
     def get_by_id(self, uid: str) -> AnnotationType:
         """Return the annotation corresponding to a specific identifier.
@@ -145,6 +158,34 @@ class AnnotationContainer(Generic[AnnotationType]):
         ann = self._store.get_data_item(uid)
         return typing.cast(AnnotationType, ann)
 
+    def release(self):
+        """
+        Remove all the annotations of the document (and their attributes) from
+        the container and from the store.
+
+        This should be called when a document is no longer needed, so that the
+        store doesn't keep its annotations for the rest of the program
+        (for instance in a long-running service processing many documents).
+        This is only supported by stores keeping track of the children of each
+        data item, such as the "disk" store (cf
+        :func:`~medkit.core.create_store`).
+
+        Raises
+        ------
+        TypeError
+            If the store doesn't support releasing data items (for instance
+            the default dict store)
+        """
+
+        if not hasattr(self._store, "release_data_items"):
+            raise TypeError(
+                f"Store of type {type(self._store).__name__} can't release data items"
+            )
+        self._store.release_data_items(self._doc_id)
+        self._ann_ids.clear()
+        self._ann_ids_by_label.clear()
+        self._ann_ids_by_key.clear()
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
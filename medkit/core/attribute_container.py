@@ -26,6 +26,9 @@ class AttributeContainer:
         self._ann_id = ann_id
         self._attr_ids: List[str] = []
         self._attr_ids_by_label: Dict[str, List[str]] = {}
+        # attributes of containers rebuilt by unpickling, not added to the
+        # store until the annotation is added to a document
+        self._unstored_attrs_by_id: Dict[str, Attribute] = {}
 
     def __len__(self) -> int:
         """Add support for calling `len()`"""
@@ -85,9 +88,19 @@ class AttributeContainer:
         self._attr_ids_by_label[label].append(uid)
 
     def get_by_id(self, uid: str) -> Attribute:
-        attr = self._store.get_data_item(uid)
+        attr = self._unstored_attrs_by_id.get(uid)
+        if attr is None:
+            attr = self._store.get_data_item(uid)
         return typing.cast(Attribute, attr)
 
+    def _store_attrs(self):
+        """Add attributes not yet in the store to the store (called when the
+        annotation is added to a document)"""
+
+        for attr in self._unstored_attrs_by_id.values():
+            self._store.store_data_item(data_item=attr, parent_id=self._ann_id)
+        self._unstored_attrs_by_id.clear()
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return False
@@ -8,8 +8,10 @@ __all__ = [
     "PreprocessingOperation",
     "SegmentationOperation",
     "Span",
+    "set_file_audio_cache",
 ]
 
+from ._file_cache import set_file_audio_cache
 from .annotation import Segment
 from .annotation_container import AudioAnnotationContainer
 from .audio_buffer import AudioBuffer, FileAudioBuffer, MemoryAudioBuffer
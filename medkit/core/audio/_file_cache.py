@@ -0,0 +1,246 @@
+"""
+Cache of decoded audio signals, shared by all :class:`FileAudioBuffer` objects.
+
+Audio files are decoded by blocks of samples, which are kept in a LRU cache, so
+that reading many small portions of the same file (for instance the segments
+found by a voice detector) doesn't decode the same parts of the file over and
+over again.
+
+Alternatively, files can be decoded once into uncompressed cache files, which
+are then memory-mapped (cf :func:`~medkit.core.audio.set_file_audio_cache`).
+"""
+
+from __future__ import annotations
+
+__all__ = ["FileAudioCache", "get_file_audio_cache", "set_file_audio_cache"]
+
+import collections
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import soundfile as sf
+
+# number of frames decoded at once when creating memory-mapped cache files
+_MMAP_DECODING_SIZE = 2**20
+
+# file path, modification time and size, so that modified files are not read
+# from the cache
+_FileKey = Tuple[str, int, int]
+
+
+class FileAudioCache:
+    """Cache of decoded blocks of audio files"""
+
+    def __init__(
+        self,
+        max_size: int = 128 * 2**20,
+        block_size: int = 2**16,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        max_size:
+            Maximum size of the decoded blocks kept in memory, in bytes. Use `0`
+            to disable the cache.
+        block_size:
+            Number of frames of each decoded block
+        cache_dir:
+            Directory in which to store memory-mapped uncompressed copies of
+            audio files. If provided, blocks are not kept in memory.
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be positive")
+        if block_size < 1:
+            raise ValueError("block_size must be strictly positive")
+
+        self.max_size = max_size
+        self.block_size = block_size
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+        # blocks of shape (nb_frames, nb_channels), in order of use
+        self._blocks: collections.OrderedDict[
+            Tuple[_FileKey, int], np.ndarray
+        ] = collections.OrderedDict()
+        self._size = 0
+        self._mmap_signals: Dict[_FileKey, np.ndarray] = {}
+        self._nb_channels_by_file_key: Dict[_FileKey, int] = {}
+
+    def read(self, path: Path, start: int, end: int, copy: bool = True) -> np.ndarray:
+        """Return the samples of `path` from frame `start` to frame `end`
+        (excluded), with shape (nb_frames, nb_channels)
+
+        If `copy` is False, the returned array may be a read-only view of
+        cached samples.
+        """
+
+        stat = os.stat(path)
+        file_key = (str(path), stat.st_mtime_ns, stat.st_size)
+
+        if self.cache_dir is not None:
+            signal = self._get_mmap_signal(path, file_key)[start:end]
+            return np.array(signal) if copy else signal
+
+        # reads that wouldn't fit in the cache are not cached, to avoid
+        # evicting all other blocks for nothing
+        if (
+            self.max_size == 0
+            or end <= start
+            or (end - start) * self._get_frame_size(path, file_key) > self.max_size
+        ):
+            return _read(path, start, end)
+
+        first_block = start // self.block_size
+        last_block = (end - 1) // self.block_size
+        blocks: List[Optional[np.ndarray]] = []
+        for block_index in range(first_block, last_block + 1):
+            block = self._blocks.get((file_key, block_index))
+            if block is not None:
+                self._blocks.move_to_end((file_key, block_index))
+            blocks.append(block)
+
+        # decode consecutive missing blocks at once
+        i = 0
+        while i < len(blocks):
+            if blocks[i] is not None:
+                i += 1
+                continue
+            j = i
+            while j < len(blocks) and blocks[j] is None:
+                j += 1
+            run_start = (first_block + i) * self.block_size
+            run_end = (first_block + j) * self.block_size
+            signal = _read(path, run_start, run_end)
+            for k in range(i, j):
+                offset = (k - i) * self.block_size
+                blocks[k] = self._add_block(
+                    (file_key, first_block + k),
+                    signal[offset : offset + self.block_size],
+                )
+            i = j
+
+        offset = first_block * self.block_size
+        if len(blocks) > 1:
+            # concatenated signal is already a new array
+            signal = np.concatenate(blocks)
+            return signal[start - offset : end - offset]
+        signal = blocks[0][start - offset : end - offset]
+        return np.array(signal) if copy else signal
+
+    def clear(self):
+        """Remove all decoded blocks from memory (memory-mapped cache files are
+        not deleted)"""
+        self._blocks.clear()
+        self._size = 0
+        self._mmap_signals.clear()
+        self._nb_channels_by_file_key.clear()
+
+    def _add_block(self, key: Tuple[_FileKey, int], block: np.ndarray) -> np.ndarray:
+        """Add a decoded block to the cache and return the cached block"""
+
+        if block.nbytes > self.max_size:
+            return block
+        # copy block so that it doesn't keep alive the whole decoded signal
+        block = block.copy()
+        # cached blocks may be returned as is, they must not be modified
+        block.flags.writeable = False
+        self._blocks[key] = block
+        self._size += block.nbytes
+        while self._size > self.max_size:
+            _, evicted_block = self._blocks.popitem(last=False)
+            self._size -= evicted_block.nbytes
+        return block
+
+    def _get_frame_size(self, path: Path, file_key: _FileKey) -> int:
+        """Return the size in bytes of a decoded frame of `path`"""
+
+        nb_channels = self._nb_channels_by_file_key.get(file_key)
+        if nb_channels is None:
+            nb_channels = sf.info(path).channels
+            self._nb_channels_by_file_key[file_key] = nb_channels
+        return nb_channels * np.dtype(np.float32).itemsize
+
+    def _get_mmap_signal(self, path: Path, file_key: _FileKey) -> np.ndarray:
+        signal = self._mmap_signals.get(file_key)
+        if signal is not None:
+            return signal
+
+        digest = hashlib.sha1(repr(file_key).encode()).hexdigest()
+        cache_path = self.cache_dir / f"{digest}.npy"
+        if not cache_path.exists():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # decode to a temporary file renamed once complete, so that
+            # incomplete files are never used (even by other processes)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".npy")
+            os.close(fd)
+            try:
+                _decode_to_npy(path, Path(tmp_path))
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+        signal = np.load(cache_path, mmap_mode="r")
+        self._mmap_signals[file_key] = signal
+        return signal
+
+
+def _read(path: Path, start: int, end: int) -> np.ndarray:
+    signal, _ = sf.read(path, start=start, stop=end, always_2d=True, dtype=np.float32)
+    return signal
+
+
+def _decode_to_npy(path: Path, npy_path: Path):
+    info = sf.info(path)
+    signal = np.lib.format.open_memmap(
+        npy_path, mode="w+", dtype=np.float32, shape=(info.frames, info.channels)
+    )
+    with sf.SoundFile(path) as file:
+        start = 0
+        for block in file.blocks(
+            blocksize=_MMAP_DECODING_SIZE, always_2d=True, dtype="float32"
+        ):
+            signal[start : start + len(block)] = block
+            start += len(block)
+    signal.flush()
+    del signal
+
+
+_cache = FileAudioCache()
+
+
+def get_file_audio_cache() -> FileAudioCache:
+    """Return the cache used by all :class:`~medkit.core.audio.FileAudioBuffer`
+    objects"""
+    return _cache
+
+
+def set_file_audio_cache(
+    max_size: int = 128 * 2**20,
+    block_size: int = 2**16,
+    cache_dir: Optional[Union[str, Path]] = None,
+):
+    """Replace the cache used by all :class:`~medkit.core.audio.FileAudioBuffer`
+    objects
+
+    Parameters
+    ----------
+    max_size:
+        Maximum size of the decoded blocks kept in memory, in bytes. Use `0` to
+        disable the cache, in which case each read decodes the file.
+    block_size:
+        Number of frames of each decoded block
+    cache_dir:
+        Directory in which to store memory-mapped uncompressed copies of audio
+        files (decoded entirely on first read). This avoids decoding again
+        files that are read many times, including across processes and
+        programs, at the cost of disk space (4 bytes per sample).
+    """
+    global _cache
+    _cache = FileAudioCache(
+        max_size=max_size, block_size=block_size, cache_dir=cache_dir
+    )
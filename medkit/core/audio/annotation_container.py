@@ -32,6 +32,11 @@ class AudioAnnotationContainer(AnnotationContainer[Segment]):
 
         super().add(ann)
 
+    def release(self):
+        super().release()
+        # attributes of the raw segment
+        self._store.release_data_items(self.raw_segment.uid)
+
     def get(
         self, *, label: Optional[str] = None, key: Optional[str] = None
     ) -> List[Segment]:
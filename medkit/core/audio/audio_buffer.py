@@ -16,6 +16,7 @@ import numpy as np
 import soundfile as sf
 
 from medkit.core import dict_conv
+from medkit.core.audio._file_cache import get_file_audio_cache
 
 
 class AudioBuffer(abc.ABC, dict_conv.SubclassMapping):
@@ -181,12 +182,10 @@ class FileAudioBuffer(AudioBuffer):
         self._sf_info = sf_info
 
     def read(self, copy: bool = False) -> np.ndarray:
-        signal, _ = sf.read(
-            self.path,
-            start=self._trim_start,
-            stop=self._trim_end,
-            always_2d=True,
-            dtype=np.float32,
+        # decoded samples are shared with other buffers reading the same file
+        # (cf set_file_audio_cache())
+        signal = get_file_audio_cache().read(
+            self.path, self._trim_start, self._trim_end, copy=copy
         )
         return signal.T
 
@@ -1,24 +1,70 @@
 __all__ = ["DocPipeline"]
 
-from typing import Dict, Generic, List, Optional, Tuple, cast
+import contextlib
+import multiprocessing
+import multiprocessing.pool
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 from medkit.core.annotation import AnnotationType
+from medkit.core.data_item import IdentifiableDataItem
 from medkit.core.document import Document
 from medkit.core.operation import DocOperation
+from medkit.core.operation_desc import OperationDescription
 from medkit.core.pipeline import Pipeline
+from medkit.core.pipeline_profiler import PipelineProfiler
 from medkit.core.prov_tracer import ProvTracer
+from medkit.core._pickling import dumps, loads
+from medkit.core._prov_graph import ProvGraph
+from medkit.core.store import GlobalStore
+from medkit.core.utils import batch_iter
+
+
+# output annotations, attributes added to input annotations (by annotation id)
+# and provenance data (graph, data items other than input items, ids of input
+# items referenced in graph, operation descriptions)
+_WorkerResult = Tuple[
+    Tuple[List[Any], ...],
+    Dict[str, List[Any]],
+    Optional[
+        Tuple[
+            ProvGraph, List[IdentifiableDataItem], Set[str], List[OperationDescription]
+        ]
+    ],
+]
 
 
 class DocPipeline(DocOperation, Generic[AnnotationType]):
     """Wrapper around the `Pipeline` class that runs a pipeline on a list
     (or collection) of documents, retrieving input annotations from each document
     and attaching output annotations back to documents.
+
+    Documents can be processed in parallel in several worker processes (cf.
+    `nb_workers`). In that case, input annotations of each document are sent to
+    a worker running a copy of the pipeline, and output annotations,
+    attributes added to input annotations and provenance information (when a
+    provenance tracer is set) are sent back and attached to the documents in
+    their original order. This requires all operations of the pipeline and all
+    annotations to be picklable. Worker processes always use a default
+    in-memory store.
     """
 
     def __init__(
         self,
         pipeline: Pipeline,
         labels_by_input_key: Dict[str, List[str]],
+        nb_workers: int = 1,
+        chunk_size: int = 1,
         uid: Optional[str] = None,
     ):
         """Initialize the pipeline
@@ -47,6 +93,14 @@ class DocPipeline(DocOperation, Generic[AnnotationType]):
             Because the values of `labels_by_input_key` are lists (one per
             input), it is possible to use annotation with different labels for
             the same input key.
+        nb_workers:
+            Number of worker processes in which to process documents. If 1,
+            documents are processed in the current process.
+        chunk_size:
+            Number of documents sent at once to each worker process (only used
+            when `nb_workers` is greater than 1). Bigger chunks reduce the
+            communication overhead with workers but may balance the load less
+            evenly between them.
         """
 
         # Pass all arguments to super (remove self)
@@ -54,12 +108,24 @@ class DocPipeline(DocOperation, Generic[AnnotationType]):
         init_args.pop("self")
         super().__init__(**init_args)
 
+        if nb_workers < 1:
+            raise ValueError("nb_workers must be greater or equal to 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be greater or equal to 1")
+
         self.pipeline = pipeline
         self.labels_by_input_key: Dict[str, List[str]] = labels_by_input_key
+        self.nb_workers: int = nb_workers
+        self.chunk_size: int = chunk_size
 
     def set_prov_tracer(self, prov_tracer: ProvTracer):
+        self._prov_tracer = prov_tracer
         self.pipeline.set_prov_tracer(prov_tracer)
 
+    def set_profiler(self, profiler: Optional[PipelineProfiler]):
+        # steps are only profiled when they run in the current process
+        self.pipeline.set_profiler(profiler)
+
     def run(self, docs: List[Document[AnnotationType]]) -> None:
         """Run the pipeline on a list of documents, adding
         the output annotations to each document
@@ -73,31 +139,250 @@ class DocPipeline(DocOperation, Generic[AnnotationType]):
             be added to each corresponding document.
         """
 
-        for doc in docs:
-            self._process_doc(doc)
+        if self.nb_workers > 1:
+            with self._create_pool() as pool:
+                self._process_docs_in_pool(pool, docs)
+        else:
+            for doc in docs:
+                self._process_doc(doc)
+
+    def run_iter(
+        self,
+        docs: Iterable[Document[AnnotationType]],
+        batch_size: int = 100,
+        release: bool = False,
+    ) -> Iterator[Document[AnnotationType]]:
+        """Run the pipeline on documents that are consumed and returned lazily,
+        one batch at a time.
+
+        This allows to process large collections of documents (for instance
+        loaded with a generator) without holding all of them at once. Note
+        however that the annotations of processed documents are kept by the
+        global store (cf :class:`~medkit.core.GlobalStore`) unless `release`
+        is set.
+
+        Parameters
+        ----------
+        docs:
+            Iterable (list, generator, etc) of documents on which to run the
+            pipeline
+        batch_size:
+            Maximum number of documents to process at once. When the pipeline
+            runs in several worker processes, this is the number of documents
+            dispatched to the workers before processed documents are returned.
+        release:
+            If True, the annotations of each returned document are released
+            from the store (cf :meth:`~medkit.core.AnnotationContainer.release`)
+            once the next document is requested, so that memory usage stays
+            bounded. Documents must therefore be used before moving to the next
+            one. This requires a store supporting release, such as the "disk"
+            store (cf :func:`~medkit.core.create_store`).
+
+        Returns
+        -------
+        Iterator[Document[AnnotationType]]
+            The processed documents, in the same order as `docs`, with the
+            output annotations of the pipeline added to them
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater or equal to 1")
+
+        with contextlib.ExitStack() as stack:
+            pool = None
+            if self.nb_workers > 1:
+                # reuse same worker processes for all batches
+                pool = stack.enter_context(self._create_pool())
+
+            for batch in batch_iter(iter(docs), batch_size):
+                if pool is not None:
+                    self._process_docs_in_pool(pool, batch)
+                else:
+                    for doc in batch:
+                        self._process_doc(doc)
+                for doc in batch:
+                    yield doc
+                    if release:
+                        doc.anns.release()
 
     def _process_doc(self, doc: Document[AnnotationType]):
+        all_input_anns = self._get_input_anns(doc)
+        all_output_anns = _run_pipeline(self.pipeline, all_input_anns)
+        self._add_output_anns(doc, all_output_anns)
+
+    def _get_input_anns(self, doc: Document[AnnotationType]) -> List[List[Any]]:
         all_input_anns = []
         for input_key in self.pipeline.input_keys:
             labels = self.labels_by_input_key[input_key]
             input_anns = [ann for label in labels for ann in doc.anns.get(label=label)]
             all_input_anns.append(input_anns)
-        all_output_anns = self.pipeline.run(*all_input_anns)
-
-        # wrap output in tuple if necessary
-        # (operations performing in-place modifications
-        # have no output and return None,
-        # operations with single output may return a
-        # single list instead of a tuple of lists)
-        if all_output_anns is None:
-            all_output_anns = tuple()
-        elif not isinstance(all_output_anns, tuple):
-            all_output_anns = (all_output_anns,)
-
-        # operations must return annotations of expected modality type
-        all_output_anns = cast(Tuple[List[AnnotationType], ...], all_output_anns)
-
-        # add output anns to doc
+        return all_input_anns
+
+    @staticmethod
+    def _add_output_anns(
+        doc: Document[AnnotationType],
+        all_output_anns: Tuple[List[AnnotationType], ...],
+    ):
         for output_anns in all_output_anns:
             for output_ann in output_anns:
                 doc.anns.add(output_ann)
+
+    def _create_pool(self) -> multiprocessing.pool.Pool:
+        context = multiprocessing.get_context()
+        return context.Pool(
+            self.nb_workers,
+            initializer=_init_worker,
+            initargs=(_dumps(self.pipeline),),
+        )
+
+    def _process_docs_in_pool(
+        self, pool: multiprocessing.pool.Pool, docs: List[Document[AnnotationType]]
+    ):
+        trace_prov = self._prov_tracer is not None
+        # tasks are built in the current thread rather than lazily by the task
+        # handler thread of the pool, since stores may not be thread-safe
+        tasks = [(_dumps(self._get_input_anns(doc)), trace_prov) for doc in docs]
+        # imap() returns results in the order of documents
+        results = pool.imap(_process_in_worker, tasks, chunksize=self.chunk_size)
+        for doc, result in zip(docs, results):
+            self._merge_worker_result(doc, _loads(result))
+
+    def _merge_worker_result(
+        self, doc: Document[AnnotationType], result: _WorkerResult
+    ):
+        all_output_anns, new_attrs_by_ann_id, prov_data = result
+
+        # worker processed copies of input annotations, retrieve the originals
+        input_items_by_id: Dict[str, IdentifiableDataItem] = {}
+        for input_anns in self._get_input_anns(doc):
+            for ann in input_anns:
+                input_items_by_id[ann.uid] = ann
+                for attr in ann.attrs:
+                    input_items_by_id[attr.uid] = attr
+
+        # report attributes added to input annotations by the pipeline
+        for ann_id, attrs in new_attrs_by_ann_id.items():
+            ann = input_items_by_id[ann_id]
+            for attr in attrs:
+                ann.attrs.add(attr)
+
+        self._add_output_anns(doc, all_output_anns)
+
+        if prov_data is not None:
+            assert self._prov_tracer is not None
+            graph, data_items, input_ids, op_descs = prov_data
+            data_items += (input_items_by_id[uid] for uid in input_ids)
+            self._prov_tracer.add_provs_from_graph(graph, data_items, op_descs)
+
+
+def _run_pipeline(
+    pipeline: Pipeline, all_input_anns: List[List[Any]]
+) -> Tuple[List[AnnotationType], ...]:
+    all_output_anns = pipeline.run(*all_input_anns)
+
+    # wrap output in tuple if necessary
+    # (operations performing in-place modifications
+    # have no output and return None,
+    # operations with single output may return a
+    # single list instead of a tuple of lists)
+    if all_output_anns is None:
+        all_output_anns = tuple()
+    elif not isinstance(all_output_anns, tuple):
+        all_output_anns = (all_output_anns,)
+
+    # operations must return annotations of expected modality type
+    return cast(Tuple[List[AnnotationType], ...], all_output_anns)
+
+
+# pipeline run by the current worker process
+_worker_pipeline: Optional[Pipeline] = None
+
+
+def _init_worker(pipeline_data: bytes):
+    global _worker_pipeline
+    # don't keep data items inherited from parent process
+    GlobalStore.del_store()
+    _worker_pipeline = _loads(pipeline_data)
+    # steps are not profiled in worker processes
+    _worker_pipeline.set_profiler(None)
+
+
+def _process_in_worker(task: Tuple[bytes, bool]) -> bytes:
+    assert _worker_pipeline is not None
+    input_data, trace_prov = task
+
+    # release data items of previously processed documents
+    GlobalStore.del_store()
+    all_input_anns = _loads(input_data)
+
+    input_ids = set()
+    attr_ids_by_ann_id = {}
+    for input_anns in all_input_anns:
+        for ann in input_anns:
+            attr_ids = {attr.uid for attr in ann.attrs}
+            attr_ids_by_ann_id[ann.uid] = attr_ids
+            input_ids.add(ann.uid)
+            input_ids.update(attr_ids)
+
+    prov_tracer = None
+    if trace_prov:
+        prov_tracer = ProvTracer()
+        _worker_pipeline.set_prov_tracer(prov_tracer)
+
+    all_output_anns = _run_pipeline(_worker_pipeline, all_input_anns)
+
+    new_attrs_by_ann_id = {}
+    for input_anns in all_input_anns:
+        for ann in input_anns:
+            attr_ids = attr_ids_by_ann_id[ann.uid]
+            new_attrs = [attr for attr in ann.attrs if attr.uid not in attr_ids]
+            if new_attrs:
+                new_attrs_by_ann_id[ann.uid] = new_attrs
+
+    prov_data = None
+    if prov_tracer is not None:
+        prov_data = _get_prov_data(prov_tracer, input_ids)
+
+    result: _WorkerResult = (all_output_anns, new_attrs_by_ann_id, prov_data)
+    return _dumps(result)
+
+
+def _get_prov_data(prov_tracer: ProvTracer, input_ids: Set[str]):
+    """Gather all data needed to merge the provenance of a worker, excluding
+    input data items that are already known to the parent process"""
+
+    data_item_ids = set()
+    op_ids = set()
+
+    def visit(graph: ProvGraph):
+        for node in graph.get_nodes():
+            data_item_ids.add(node.data_item_id)
+            if node.operation_id is not None:
+                op_ids.add(node.operation_id)
+        for op_id, sub_graph in graph.iter_sub_graphs():
+            op_ids.add(op_id)
+            visit(sub_graph)
+
+    graph = prov_tracer.get_graph()
+    visit(graph)
+
+    store = prov_tracer.store
+    data_items = [
+        store.get_data_item(uid) for uid in data_item_ids if uid not in input_ids
+    ]
+    op_descs = [store.get_op_desc(uid) for uid in op_ids]
+    return graph, data_items, data_item_ids & input_ids, op_descs
+
+
+def _reduce_prov_tracer(prov_tracer: ProvTracer):
+    # worker processes use their own provenance tracer, there is no need to
+    # send the one of the parent process (and its store) to them
+    return ProvTracer, ()
+
+
+def _dumps(obj: Any) -> bytes:
+    """Pickle data items or pipeline to send them to another process"""
+    return dumps(obj, reducers={ProvTracer: _reduce_prov_tracer})
+
+
+def _loads(data: bytes) -> Any:
+    return loads(data)
@@ -1,7 +1,96 @@
-__all__ = ["generate_id"]
+"""
+Generation of identifiers for data items and operations.
 
+By default, identifiers are UUIDs (cf. :func:`generate_uuid`). A more compact
+and faster generator can be selected with :func:`set_id_generator`
+(cf. :func:`generate_compact_id`), or any custom function returning unique
+strings.
+"""
+
+__all__ = [
+    "generate_id",
+    "generate_uuid",
+    "generate_compact_id",
+    "set_id_generator",
+    "IdGenerator",
+]
+
+import itertools
+import os
 import uuid
+from typing import Callable, Union
 
+from typing_extensions import Literal
 
-def generate_id() -> str:
+#: Function returning a new unique identifier each time it is called
+IdGenerator = Callable[[], str]
+
+
+def generate_uuid() -> str:
+    """Return a time-based UUID (36 characters)"""
     return str(uuid.uuid1())
+
+
+def _new_compact_prefix() -> str:
+    # 64 random bits, unique to each process
+    return os.urandom(8).hex() + "-"
+
+
+_compact_prefix = _new_compact_prefix()
+_compact_counter = itertools.count()
+
+
+def _reset_compact_state():
+    global _compact_prefix, _compact_counter
+    _compact_prefix = _new_compact_prefix()
+    _compact_counter = itertools.count()
+
+
+# forked processes (ex: DocPipeline workers) must not generate the same ids as
+# their parent
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_compact_state)
+
+
+def generate_compact_id() -> str:
+    """Return an identifier made of a random prefix specific to the current
+    process and of an increasing counter, both in hexadecimal
+    (ex: "1f3a9c27b04e5d68-2a").
+
+    Such identifiers are shorter (usually less than 24 characters) and much
+    faster to generate than UUIDs, and are still unique across processes.
+    """
+    return _compact_prefix + format(next(_compact_counter), "x")
+
+
+_generator: IdGenerator = generate_uuid
+
+
+def generate_id() -> str:
+    """Return a new unique identifier, using the current id generator
+    (cf. :func:`set_id_generator`)"""
+    return _generator()
+
+
+def set_id_generator(generator: Union[Literal["uuid", "compact"], IdGenerator]):
+    """Change the function used by :func:`generate_id` to create identifiers
+
+    Identifiers generated before the change remain valid, so this can be called
+    at any time, but it is best to call it once at the start of a program.
+
+    Parameters
+    ----------
+    generator:
+        "uuid" to generate UUIDs (default, cf. :func:`generate_uuid`),
+        "compact" to generate shorter identifiers (cf.
+        :func:`generate_compact_id`), or any function returning unique strings
+    """
+    global _generator
+    if generator == "uuid":
+        _generator = generate_uuid
+    elif generator == "compact":
+        _generator = generate_compact_id
+    elif callable(generator):
+        _generator = generator
+    else:
+        raise ValueError(f"Unsupported id generator: {generator}")
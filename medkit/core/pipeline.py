@@ -10,6 +10,8 @@ import dataclasses
 from typing import (
     Any,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Tuple,
@@ -22,7 +24,9 @@ from medkit.core.annotation import Annotation
 from medkit.core.data_item import IdentifiableDataItem, IdentifiableDataItemWithAttrs
 from medkit.core.id import generate_id
 from medkit.core.operation_desc import OperationDescription
+from medkit.core.pipeline_profiler import PipelineProfiler, ProfilableOperation
 from medkit.core.prov_tracer import ProvTracer
+from medkit.core.utils import batch_iter
 
 
 @runtime_checkable
@@ -152,6 +156,7 @@ class Pipeline:
 
         self._prov_tracer: Optional[ProvTracer] = None
         self._sub_prov_tracer: Optional[ProvTracer] = None
+        self._profiler: Optional[PipelineProfiler] = None
 
     @property
     def description(self) -> OperationDescription:
@@ -179,6 +184,24 @@ class Pipeline:
                 )
             step.operation.set_prov_tracer(self._sub_prov_tracer)
 
+    def set_profiler(self, profiler: Optional[PipelineProfiler]):
+        """Enable profiling of the pipeline steps
+
+        Parameters
+        ----------
+        profiler:
+            Profiler in which to record the time and memory spent in each step
+            (and in the steps of nested pipelines). If None, profiling is
+            disabled.
+        """
+        self._profiler = profiler
+        for step in self.steps:
+            if isinstance(step.operation, ProfilableOperation):
+                sub_profiler = (
+                    profiler.get_sub_profiler(step) if profiler is not None else None
+                )
+                step.operation.set_profiler(sub_profiler)
+
     def run(
         self, *all_input_data: List[Any]
     ) -> Union[None, List[Any], Tuple[List[Any], ...]]:
@@ -235,6 +258,41 @@ class Pipeline:
         else:
             return all_output_data
 
+    def run_iter(
+        self, input_data: Iterable[Any], batch_size: int = 100
+    ) -> Iterator[Union[None, List[Any], Tuple[List[Any], ...]]]:
+        """Run the pipeline on successive batches of input items, without loading
+        all of them in memory.
+
+        Only pipelines with a single input key are supported. Input items are
+        consumed lazily and the pipeline is run on batches of at most `batch_size`
+        items, so that only the data of one batch (and its intermediate data)
+        is held in memory at a time.
+
+        Parameters
+        ----------
+        input_data:
+            Iterable (list, generator, etc) of items corresponding to the
+            only input key of the pipeline
+        batch_size:
+            Maximum number of input items to process at once
+
+        Returns
+        -------
+        Iterator[Union[None, List[Any], Tuple[List[Any], ...]]]
+            For each batch of input items, all output data returned by the
+            pipeline (cf `run()`)
+        """
+        if len(self.input_keys) != 1:
+            raise ValueError(
+                "run_iter() is only supported for pipelines with a single input key"
+            )
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater or equal to 1")
+
+        for batch in batch_iter(iter(input_data), batch_size):
+            yield self.run(batch)
+
     def _perform_step(self, step: PipelineStep, data_by_key: Dict[str, Any]):
         # find data to feed to operation
         all_input_data = []
@@ -254,7 +312,10 @@ class Pipeline:
             ]
 
         # call operation
-        all_output_data = step.operation.run(*all_input_data)
+        if self._profiler is not None:
+            all_output_data = self._profiler.run_step(step, all_input_data)
+        else:
+            all_output_data = step.operation.run(*all_input_data)
 
         # wrap output in tuple if necessary
         # (operations performing in-place modifications
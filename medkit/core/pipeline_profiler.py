@@ -0,0 +1,269 @@
+__all__ = ["PipelineProfiler", "StepProfile"]
+
+import dataclasses
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Union
+
+from typing_extensions import Protocol, runtime_checkable
+
+
+@runtime_checkable
+class ProfilableOperation(Protocol):
+    """Operation made of sub-operations that can be profiled
+    (ex: nested pipelines)"""
+
+    def set_profiler(self, profiler: "PipelineProfiler"):
+        pass
+
+
+@dataclasses.dataclass
+class StepProfile:
+    """Profiling information of a pipeline step, accumulated over all runs
+    of the pipeline
+
+    Parameters
+    ----------
+    operation_name:
+        Name of the operation of the step (its class name if it doesn't have
+        a description)
+    operation_id:
+        Identifier of the operation of the step, if it has a description
+    input_keys:
+        Input keys of the step
+    output_keys:
+        Output keys of the step
+    nb_calls:
+        Number of times the operation was called
+    wall_time:
+        Total elapsed time spent in the operation, in seconds
+    cpu_time:
+        Total CPU time of the current process spent in the operation, in seconds
+    nb_input_items:
+        Total number of data items given as input to the operation
+    nb_output_items:
+        Total number of data items returned by the operation
+    peak_memory:
+        Maximum memory allocated during a call of the operation, in bytes, in
+        addition to memory allocated before the call (only available when
+        memory tracing is enabled)
+    sub_steps:
+        Profiles of the steps of the operation, if it is a pipeline (or a
+        `DocPipeline`)
+    """
+
+    operation_name: str
+    operation_id: Optional[str]
+    input_keys: List[str]
+    output_keys: List[str]
+    nb_calls: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    nb_input_items: int = 0
+    nb_output_items: int = 0
+    peak_memory: Optional[int] = None
+    sub_steps: List["StepProfile"] = dataclasses.field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            operation_name=self.operation_name,
+            operation_id=self.operation_id,
+            input_keys=self.input_keys,
+            output_keys=self.output_keys,
+            nb_calls=self.nb_calls,
+            wall_time=self.wall_time,
+            cpu_time=self.cpu_time,
+            nb_input_items=self.nb_input_items,
+            nb_output_items=self.nb_output_items,
+            peak_memory=self.peak_memory,
+            sub_steps=[s.to_dict() for s in self.sub_steps],
+        )
+
+
+class PipelineProfiler:
+    """Records the time and memory spent in each step of a pipeline
+
+    Profiling is opt-in: a profiler must be given to a pipeline with
+    :meth:`~medkit.core.Pipeline.set_profiler` (which also profiles nested
+    pipelines), and the accumulated profiles of all pipeline runs can be then
+    retrieved with :meth:`get_report`.
+
+    >>> profiler = PipelineProfiler()
+    >>> pipeline.set_profiler(profiler)
+    >>> pipeline.run(segments)
+    >>> profiler.save_json("profile.json")
+
+    Note that steps of a :class:`~medkit.core.doc_pipeline.DocPipeline` running
+    in several worker processes are not profiled, only the whole `DocPipeline`
+    step is.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        Parameters
+        ----------
+        trace_memory:
+            Whether to measure the peak memory of each step, using
+            `tracemalloc`. If tracing wasn't already started, it is only
+            enabled while steps are running. This significantly slows down
+            execution. On python < 3.9, the peak memory of a step can't be
+            measured when it is lower than a peak reached before the step
+            (while tracing), in which case the memory allocated by the step
+            when it ends (or when nested steps start and end) is reported
+            instead.
+        """
+        self.trace_memory: bool = trace_memory
+        # profiles and sub-profilers by identifier of pipeline step
+        self._profiles_by_step_id: Dict[int, StepProfile] = {}
+        self._sub_profilers_by_step_id: Dict[int, PipelineProfiler] = {}
+
+    def get_report(self) -> List[StepProfile]:
+        """Return the profiles of all steps that have been run, in order of
+        first execution"""
+        profiles = []
+        for step_id, profile in self._profiles_by_step_id.items():
+            sub_profiler = self._sub_profilers_by_step_id.get(step_id)
+            if sub_profiler is not None:
+                profile.sub_steps = sub_profiler.get_report()
+            profiles.append(profile)
+        return profiles
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            trace_memory=self.trace_memory,
+            steps=[p.to_dict() for p in self.get_report()],
+        )
+
+    def save_json(self, path: Union[str, Path]):
+        """Export the profiling report to a JSON file
+
+        Parameters
+        ----------
+        path:
+            Path of the JSON file to create
+        """
+        with open(path, mode="w", encoding="utf-8") as fp:
+            json.dump(self.to_dict(), fp, indent=4)
+
+    def reset(self):
+        """Discard all profiles recorded so far"""
+        self._profiles_by_step_id.clear()
+        for sub_profiler in self._sub_profilers_by_step_id.values():
+            sub_profiler.reset()
+
+    def get_sub_profiler(self, step) -> "PipelineProfiler":
+        """Return the profiler to use for a nested pipeline used as operation
+        of `step`"""
+        step_id = id(step)
+        sub_profiler = self._sub_profilers_by_step_id.get(step_id)
+        if sub_profiler is None:
+            sub_profiler = PipelineProfiler(trace_memory=self.trace_memory)
+            self._sub_profilers_by_step_id[step_id] = sub_profiler
+        return sub_profiler
+
+    def run_step(self, step, all_input_data: List[List[Any]]) -> Any:
+        """Call the operation of `step` on `all_input_data`, recording its
+        profile, and return its output"""
+
+        profile = self._get_profile(step)
+        nb_input_items = sum(len(d) for d in all_input_data)
+
+        if self.trace_memory:
+            _start_memory_tracing()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            all_output_data = step.operation.run(*all_input_data)
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            peak_memory = _stop_memory_tracing() if self.trace_memory else None
+
+        profile.nb_calls += 1
+        profile.wall_time += wall_time
+        profile.cpu_time += cpu_time
+        profile.nb_input_items += nb_input_items
+        if all_output_data is not None:
+            if isinstance(all_output_data, tuple):
+                profile.nb_output_items += sum(len(d) for d in all_output_data)
+            else:
+                profile.nb_output_items += len(all_output_data)
+        if peak_memory is not None:
+            profile.peak_memory = max(profile.peak_memory or 0, peak_memory)
+
+        return all_output_data
+
+    def _get_profile(self, step) -> StepProfile:
+        step_id = id(step)
+        profile = self._profiles_by_step_id.get(step_id)
+        if profile is None:
+            operation = step.operation
+            description = getattr(operation, "description", None)
+            if description is not None:
+                operation_name = description.name
+                operation_id = description.uid
+            else:
+                operation_name = type(operation).__name__
+                operation_id = None
+            profile = StepProfile(
+                operation_name=operation_name,
+                operation_id=operation_id,
+                input_keys=list(step.input_keys),
+                output_keys=list(step.output_keys),
+            )
+            self._profiles_by_step_id[step_id] = profile
+        return profile
+
+
+# for each step being currently profiled (including nested ones), memory
+# allocated when it started, peak memory seen so far, and global peak of
+# tracemalloc when it started. tracemalloc only has one global peak, which is
+# reset at the start of each step, so the peak of outer steps must be saved
+# before nested steps reset it
+_memory_stack: List[List[int]] = []
+# whether tracemalloc was started by the profiler and must be stopped once
+# the outermost step is done
+_stop_tracing_when_done = False
+
+
+def _start_memory_tracing():
+    global _stop_tracing_when_done
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _stop_tracing_when_done = not _memory_stack
+    if _memory_stack:
+        _update_peak(_memory_stack[-1])
+    # tracemalloc.reset_peak() only exists in python >= 3.9
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    current, global_peak = tracemalloc.get_traced_memory()
+    _memory_stack.append([current, current, global_peak])
+
+
+def _stop_memory_tracing() -> int:
+    entry = _memory_stack.pop()
+    _update_peak(entry)
+    start, peak, _ = entry
+    if _memory_stack:
+        outer = _memory_stack[-1]
+        outer[1] = max(outer[1], peak)
+    elif _stop_tracing_when_done:
+        tracemalloc.stop()
+    return peak - start
+
+
+def _update_peak(entry: List[int]):
+    """Update the peak memory of a step being profiled with the memory traced
+    so far"""
+
+    current, global_peak = tracemalloc.get_traced_memory()
+    # the global peak was reached during the step if it was reset when the
+    # step started or if it increased since then. Otherwise, it was reached
+    # before the step (it can't be reset on python < 3.9), and only the current
+    # memory is known to have been reached during the step
+    if hasattr(tracemalloc, "reset_peak") or global_peak > entry[2]:
+        entry[1] = max(entry[1], global_peak)
+    else:
+        entry[1] = max(entry[1], current)
@@ -1,8 +1,15 @@
+from __future__ import annotations
+
 __all__ = ["ProvStore", "create_prov_store"]
 
-from typing import Dict
+import json
+from pathlib import Path
+import sqlite3
+from typing import Dict, List, Optional, Union
 from typing_extensions import runtime_checkable, Literal, Protocol
 
+from medkit.core import _pickling
+from medkit.core._prov_graph import ProvGraph, ProvNode
 from medkit.core.data_item import IdentifiableDataItem
 from medkit.core.operation_desc import OperationDescription
 
@@ -40,10 +47,211 @@ class _DictStore:
         return self._op_descs_by_id[operation_id]
 
 
-StoreType = Literal["dict"]
+class _SQLiteStore:
+    """Provenance store keeping data items and operation descriptions in a
+    SQLite database, so that provenance of large collections of documents
+    doesn't have to fit in memory.
+
+    Data items are pickled and written by batches. Until they are written, they
+    are kept as is in memory, and are returned as is by `get_data_item()`.
+    Afterwards, a new unpickled copy is returned each time, reflecting the state
+    of the data item when it was written.
+
+    The provenance graph of a tracer using this store can also be saved in the
+    database, with one row per node (cf
+    :meth:`~medkit.core.ProvTracer.save_graph`), to be loaded afterwards in
+    another program (cf :meth:`~medkit.core.ProvTracer.load`).
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 1000):
+        """
+        Parameters
+        ----------
+        path:
+            Path of the SQLite database file (created if it doesn't exist)
+        batch_size:
+            Number of data items to write at once
+        """
+        self.path = Path(path)
+        self.batch_size = batch_size
+
+        self._conn = sqlite3.connect(str(self.path))
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS data_items (uid TEXT PRIMARY KEY, data"
+                " BLOB)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS op_descs (uid TEXT PRIMARY KEY, data BLOB)"
+            )
+            # nodes of the saved provenance graph and of its sub graphs (the
+            # main graph has id 0), one row per node
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prov_nodes (graph_id INTEGER,"
+                " data_item_id TEXT, operation_id TEXT, source_ids TEXT,"
+                " derived_ids TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS prov_nodes_graph_id ON prov_nodes"
+                " (graph_id)"
+            )
+            # saved graph and sub graphs, with the parent graph and operation
+            # of each sub graph
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prov_graphs (graph_id INTEGER PRIMARY"
+                " KEY, parent_graph_id INTEGER, operation_id TEXT)"
+            )
+
+        self._pending_data_items: Dict[str, IdentifiableDataItem] = {}
+        # operation descriptions are few, they are also kept in memory
+        self._op_descs_by_id: Dict[str, OperationDescription] = {}
+
+    def store_data_item(self, data_item: IdentifiableDataItem):
+        self._pending_data_items[data_item.uid] = data_item
+        if len(self._pending_data_items) >= self.batch_size:
+            self.flush()
+
+    def get_data_item(self, data_item_id: str) -> IdentifiableDataItem:
+        data_item = self._pending_data_items.get(data_item_id)
+        if data_item is not None:
+            return data_item
+        row = self._conn.execute(
+            "SELECT data FROM data_items WHERE uid = ?", (data_item_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(data_item_id)
+        return _pickling.loads(row[0])
+
+    def store_op_desc(self, op_desc: OperationDescription):
+        if op_desc.uid in self._op_descs_by_id:
+            return
+        self._op_descs_by_id[op_desc.uid] = op_desc
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO op_descs VALUES (?, ?)",
+                (op_desc.uid, _pickling.dumps(op_desc)),
+            )
+
+    def get_op_desc(self, operation_id: str) -> OperationDescription:
+        op_desc = self._op_descs_by_id.get(operation_id)
+        if op_desc is not None:
+            return op_desc
+        row = self._conn.execute(
+            "SELECT data FROM op_descs WHERE uid = ?", (operation_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(operation_id)
+        op_desc = _pickling.loads(row[0])
+        self._op_descs_by_id[operation_id] = op_desc
+        return op_desc
+
+    def flush(self):
+        """Write all pending data items to the database"""
+        if not self._pending_data_items:
+            return
+        rows = (
+            (uid, _pickling.dumps(data_item))
+            for uid, data_item in self._pending_data_items.items()
+        )
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO data_items VALUES (?, ?)", rows
+            )
+        self._pending_data_items.clear()
+
+    def save_graph(self, graph: ProvGraph):
+        """Write a provenance graph (and its sub graphs) to the database,
+        replacing any previously saved graph"""
+        self.flush()
+        with self._conn:
+            self._conn.execute("DELETE FROM prov_nodes")
+            self._conn.execute("DELETE FROM prov_graphs")
+            self._conn.execute("INSERT INTO prov_graphs VALUES (0, NULL, NULL)")
+            # graphs to write, with their id
+            graphs = [(0, graph)]
+            nb_graphs = 1
+            while graphs:
+                graph_id, graph = graphs.pop()
+                rows = (
+                    (
+                        graph_id,
+                        node.data_item_id,
+                        node.operation_id,
+                        json.dumps(node.source_ids),
+                        json.dumps(node.derived_ids),
+                    )
+                    for node in graph.get_nodes()
+                )
+                self._conn.executemany(
+                    "INSERT INTO prov_nodes VALUES (?, ?, ?, ?, ?)", rows
+                )
+                for operation_id, sub_graph in graph.iter_sub_graphs():
+                    sub_graph_id = nb_graphs
+                    nb_graphs += 1
+                    self._conn.execute(
+                        "INSERT INTO prov_graphs VALUES (?, ?, ?)",
+                        (sub_graph_id, graph_id, operation_id),
+                    )
+                    graphs.append((sub_graph_id, sub_graph))
+
+    def load_graph(self) -> Optional[ProvGraph]:
+        """Return the provenance graph saved in the database, if any"""
+        nodes_by_graph_id: Dict[int, List[ProvNode]] = {}
+        rows = self._conn.execute(
+            "SELECT graph_id, data_item_id, operation_id, source_ids, derived_ids"
+            " FROM prov_nodes ORDER BY rowid"
+        )
+        for graph_id, data_item_id, operation_id, source_ids, derived_ids in rows:
+            node = ProvNode(
+                data_item_id=data_item_id,
+                operation_id=operation_id,
+                source_ids=json.loads(source_ids),
+                derived_ids=json.loads(derived_ids),
+            )
+            nodes_by_graph_id.setdefault(graph_id, []).append(node)
+
+        graphs_by_id: Dict[int, ProvGraph] = {}
+        # parent graphs are written before their sub graphs
+        rows = self._conn.execute(
+            "SELECT graph_id, parent_graph_id, operation_id FROM prov_graphs"
+            " ORDER BY graph_id"
+        )
+        for graph_id, parent_graph_id, operation_id in rows:
+            graph = ProvGraph(nodes_by_graph_id.get(graph_id, []))
+            graphs_by_id[graph_id] = graph
+            if parent_graph_id is not None:
+                graphs_by_id[parent_graph_id].add_sub_graph(operation_id, graph)
+        return graphs_by_id.get(0)
+
+    def close(self):
+        """Write pending data items and close the database"""
+        self.flush()
+        self._conn.close()
+
+
+StoreType = Literal["dict", "sqlite"]
+
+default_stores = {"dict": _DictStore, "sqlite": _SQLiteStore}
+
 
-default_stores = {"dict": _DictStore}
+def create_prov_store(store_type: StoreType = "dict", **kwargs) -> ProvStore:
+    """Create a provenance store
 
+    Parameters
+    ----------
+    store_type:
+        "dict" for an in-memory store (default), or "sqlite" for a store
+        writing data items to a SQLite database
+    **kwargs:
+        Parameters of the store (for the "sqlite" store: `path`, the path of the
+        database file, and `batch_size`, the number of data items written at
+        once)
 
-def create_prov_store(store_type: StoreType = "dict"):
-    return default_stores.get(store_type, "dict")()
+    Examples
+    --------
+    >>> store = create_prov_store("sqlite", path="provenance.db")
+    >>> prov_tracer = ProvTracer(store)
+    """
+    if store_type not in default_stores:
+        raise ValueError(f"Unsupported store type: {store_type}")
+    return default_stores[store_type](**kwargs)
@@ -146,8 +146,7 @@ class ProvTracer:
             # (can happen with attributes being copied from one annotation to another)
             if self._graph.has_node(data_item.uid):
                 # check operation_id is consistent
-                node = self._graph.get_node(data_item.uid)
-                if node.operation_id != op_desc.uid:
+                if self._graph.get_operation_id(data_item.uid) != op_desc.uid:
                     raise RuntimeError(
                         "Trying to add provenance for sub graph for data item with uid"
                         f" {data_item.uid} that already has a node, but with different"
@@ -175,15 +174,87 @@ class ProvTracer:
             sub_graph_node_id = queue.popleft()
             seen.add(sub_graph_node_id)
 
-            sub_graph_node = sub_graph.get_node(sub_graph_node_id)
-            if sub_graph_node.operation_id is None:
+            if sub_graph.get_operation_id(sub_graph_node_id) is None:
                 source_ids.append(sub_graph_node_id)
-            queue.extend(uid for uid in sub_graph_node.source_ids if uid not in seen)
+            queue.extend(
+                uid
+                for uid in sub_graph.get_source_ids(sub_graph_node_id)
+                if uid not in seen
+            )
 
         # add new node on main graph representing
         # the data item generation by the composed operation
         self._graph.add_node(data_item_id, operation_id, source_ids)
 
+    def get_graph(self) -> ProvGraph:
+        """Return the provenance graph of the tracer, for instance to merge it
+        into a tracer of another process with :meth:`~.add_provs_from_graph`"""
+        return self._graph
+
+    def add_provs_from_graph(
+        self,
+        graph: ProvGraph,
+        data_items: List[IdentifiableDataItem],
+        op_descs: List[OperationDescription],
+    ):
+        """Append provenance information built by another provenance tracer that
+        doesn't share the same store (for instance in another process).
+
+        Parameters
+        ----------
+        graph:
+            Provenance graph of the other tracer, to merge with the graph of
+            this tracer.
+        data_items:
+            Data items referenced by `graph` that are not already in the store
+            of this tracer.
+        op_descs:
+            Descriptions of the operations referenced by `graph`.
+        """
+        for data_item in data_items:
+            self.store.store_data_item(data_item)
+        for op_desc in op_descs:
+            self.store.store_op_desc(op_desc)
+        self._graph.update(graph)
+
+    def save_graph(self):
+        """Save the provenance graph (including sub-provenance information) in
+        the store of the tracer, for stores supporting it (such as the "sqlite"
+        store, cf :func:`~medkit.core.create_prov_store`).
+
+        The provenance tracer can then be reloaded with :meth:`~.load`.
+        """
+        if not hasattr(self.store, "save_graph"):
+            raise TypeError(
+                f"Store of type {type(self.store).__name__} can't save provenance"
+                " graphs"
+            )
+        self.store.save_graph(self._graph)
+
+    @classmethod
+    def load(cls, store: ProvStore) -> ProvTracer:
+        """Create a provenance tracer from a provenance graph previously saved
+        in a store with :meth:`~.save_graph`.
+
+        Parameters
+        ----------
+        store:
+            Store in which the graph was saved, containing all traced data items
+
+        Returns
+        -------
+        ProvTracer
+            Provenance tracer with the saved provenance information
+        """
+        if not hasattr(store, "load_graph"):
+            raise TypeError(
+                f"Store of type {type(store).__name__} can't load provenance graphs"
+            )
+        graph = store.load_graph()
+        if graph is None:
+            raise ValueError("No provenance graph was saved in store")
+        return cls(store=store, _graph=graph)
+
     def has_prov(self, data_item_id: str) -> bool:
         """Check if the provenance tracer has provenance information about a
         specific data item.
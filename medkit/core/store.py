@@ -1,7 +1,18 @@
-__all__ = ["Store", "GlobalStore"]
+from __future__ import annotations
 
-from typing import Dict, Union
-from typing_extensions import Protocol, runtime_checkable
+__all__ = ["Store", "GlobalStore", "create_store"]
+
+import collections
+import io
+import os
+from pathlib import Path
+import pickle
+import sqlite3
+import tempfile
+from typing import Dict, List, Optional, Union
+import weakref
+
+from typing_extensions import Literal, Protocol, runtime_checkable
 
 from medkit.core.data_item import IdentifiableDataItem
 
@@ -20,6 +31,47 @@ class Store(Protocol):
         pass
 
 
+class _ParentIndex:
+    """Parent of each data item and children of each parent, used by
+    :class:`_DiskStore` to release all the data items of a document"""
+
+    def __init__(self) -> None:
+        self.parent_ids_by_id: Dict[str, str] = {}
+        # ordered sets of ids (cf AnnotationContainer)
+        self.child_ids_by_parent_id: Dict[str, Dict[str, None]] = {}
+
+    def add(self, data_item_id: str, parent_id: str):
+        previous_parent_id = self.parent_ids_by_id.get(data_item_id)
+        if previous_parent_id is not None and previous_parent_id != parent_id:
+            # data item was moved to another parent, it must not be released
+            # with its previous parent
+            self._remove_child(previous_parent_id, data_item_id)
+        self.parent_ids_by_id[data_item_id] = parent_id
+        if parent_id not in self.child_ids_by_parent_id:
+            self.child_ids_by_parent_id[parent_id] = {}
+        self.child_ids_by_parent_id[parent_id][data_item_id] = None
+
+    def remove_descendants(self, parent_id: str) -> List[str]:
+        """Remove all descendants of `parent_id` from the index and return
+        their ids"""
+
+        removed_ids = []
+        parent_ids = [parent_id]
+        while parent_ids:
+            child_ids = self.child_ids_by_parent_id.pop(parent_ids.pop(), {})
+            for child_id in child_ids:
+                del self.parent_ids_by_id[child_id]
+                removed_ids.append(child_id)
+                parent_ids.append(child_id)
+        return removed_ids
+
+    def _remove_child(self, parent_id: str, child_id: str):
+        child_ids = self.child_ids_by_parent_id[parent_id]
+        del child_ids[child_id]
+        if not child_ids:
+            del self.child_ids_by_parent_id[parent_id]
+
+
 class _DictStore:
     def __init__(self) -> None:
         self._data_items_by_id: Dict[str, IdentifiableDataItem] = {}
@@ -37,6 +89,149 @@ class _DictStore:
         return self._data_items_by_id.get(parent_id, None)
 
 
+class _DiskStore:
+    """Store keeping only the most recently used data items in memory, and
+    writing the other ones to a SQLite database.
+
+    Data items are written when they are evicted from the in-memory cache. A
+    weak reference to evicted data items is kept, so that the same object is
+    returned as long as it is still in use elsewhere. Otherwise, a new object is
+    unpickled from the database, reflecting the state of the data item when it
+    was evicted. Data items added to an evicted data item through its
+    containers (for instance attributes added to an annotation) bring it back
+    in memory, so that it is written again. Other changes made to data items
+    once they have been added to a document or an annotation may be lost.
+
+    Data items of discarded documents should be released with
+    :meth:`~medkit.core.AnnotationContainer.release` to be deleted from the
+    database.
+    """
+
+    def __init__(
+        self, path: Optional[Union[str, Path]] = None, cache_size: int = 10000
+    ):
+        """
+        Parameters
+        ----------
+        path:
+            Path of the SQLite database file. If None, a temporary file is
+            used, and deleted when the store is closed.
+        cache_size:
+            Maximum number of data items kept in memory
+        """
+        if cache_size < 1:
+            raise ValueError("cache_size must be strictly positive")
+
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="medkit-store-", suffix=".db")
+            os.close(fd)
+            self._is_temporary = True
+        else:
+            self._is_temporary = False
+        self.path = Path(path)
+        self.cache_size = cache_size
+
+        self._conn = sqlite3.connect(str(self.path))
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS data_items (uid TEXT PRIMARY KEY, data"
+                " BLOB)"
+            )
+
+        # most recently used data items, in order of use
+        self._cache: collections.OrderedDict[
+            str, IdentifiableDataItem
+        ] = collections.OrderedDict()
+        self._evicted_items: weakref.WeakValueDictionary[
+            str, IdentifiableDataItem
+        ] = weakref.WeakValueDictionary()
+        self._parent_index = _ParentIndex()
+
+    def store_data_item(self, data_item: IdentifiableDataItem, parent_id: str):
+        self._parent_index.add(data_item.uid, parent_id)
+        self._cache_data_item(data_item)
+        # the parent (for instance the annotation of an attribute) was modified
+        # and must be written again if it was already evicted
+        parent_item = self._evicted_items.get(parent_id)
+        if parent_item is not None:
+            self._cache_data_item(parent_item)
+
+    def get_data_item(self, data_item_id: str) -> IdentifiableDataItem:
+        data_item = self._cache.get(data_item_id)
+        if data_item is not None:
+            self._cache.move_to_end(data_item_id)
+            return data_item
+
+        data_item = self._evicted_items.get(data_item_id)
+        if data_item is None:
+            row = self._conn.execute(
+                "SELECT data FROM data_items WHERE uid = ?", (data_item_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(data_item_id)
+            data_item = self._loads(row[0])
+        self._cache_data_item(data_item)
+        return data_item
+
+    def get_parent_item(self, data_item_id: str) -> IdentifiableDataItem:
+        parent_id = self._parent_index.parent_ids_by_id[data_item_id]
+        if parent_id not in self._parent_index.parent_ids_by_id:
+            return None
+        return self.get_data_item(parent_id)
+
+    def release_data_items(self, parent_id: str):
+        """Remove from the store all the data items having `parent_id` as
+        parent, as well as their own children (for instance all the
+        annotations of a document and their attributes)"""
+
+        uids = self._parent_index.remove_descendants(parent_id)
+        for uid in uids:
+            self._cache.pop(uid, None)
+            self._evicted_items.pop(uid, None)
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM data_items WHERE uid = ?", ((uid,) for uid in uids)
+            )
+
+    def close(self):
+        """Close the database (and delete it if it is a temporary file)"""
+        self._conn.close()
+        if self._is_temporary:
+            self.path.unlink()
+
+    def _cache_data_item(self, data_item: IdentifiableDataItem):
+        self._cache[data_item.uid] = data_item
+        self._cache.move_to_end(data_item.uid)
+        if len(self._cache) <= self.cache_size:
+            return
+
+        # evict least recently used data items by batches, to group writes
+        nb_evicted = max(len(self._cache) - self.cache_size, self.cache_size // 10)
+        rows = []
+        for _ in range(nb_evicted):
+            uid, evicted_item = self._cache.popitem(last=False)
+            self._evicted_items[uid] = evicted_item
+            rows.append((uid, self._dumps(evicted_item)))
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO data_items VALUES (?, ?)", rows
+            )
+
+    def _dumps(self, data_item: IdentifiableDataItem) -> bytes:
+        # attribute containers of data items reference the store, which is
+        # pickled as a reference to be restored when unpickling
+        buffer = io.BytesIO()
+        pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = lambda obj: "store" if obj is self else None
+        pickler.dump(data_item)
+        return buffer.getvalue()
+
+    def _loads(self, data: bytes) -> IdentifiableDataItem:
+        unpickler = pickle.Unpickler(io.BytesIO(data))
+        unpickler.persistent_load = lambda pid: self
+        return unpickler.load()
+
+
 class GlobalStore:
     """Global store"""
 
@@ -86,3 +281,32 @@ class GlobalStore:
         Delete the global store object
         """
         cls._store = None
+
+
+StoreType = Literal["dict", "disk"]
+
+default_stores = {"dict": _DictStore, "disk": _DiskStore}
+
+
+def create_store(store_type: StoreType = "dict", **kwargs) -> Store:
+    """Create a store, to be used as global store
+    (cf :meth:`~medkit.core.GlobalStore.init_store`)
+
+    Parameters
+    ----------
+    store_type:
+        "dict" for a store keeping all data items in memory (default), or
+        "disk" for a store keeping only the most recently used data items in
+        memory and writing the other ones to a SQLite database
+    **kwargs:
+        Parameters of the store (for the "disk" store: `path`, the path of the
+        database file, temporary if not provided, and `cache_size`, the maximum
+        number of data items kept in memory)
+
+    Examples
+    --------
+    >>> GlobalStore.init_store(create_store("disk", cache_size=100000))
+    """
+    if store_type not in default_stores:
+        raise ValueError(f"Unsupported store type: {store_type}")
+    return default_stores[store_type](**kwargs)
@@ -18,6 +18,7 @@ __all__ = [
     # not imported
     "utils",
     "span_utils",
+    "transliteration",
 ]
 
 from .annotation import TextAnnotation, Segment, Entity, Relation
@@ -0,0 +1,282 @@
+"""
+Literal-based prefiltering of large sets of regexps.
+
+Python's `re` module has no multi-pattern automaton: merging hundreds of rules
+into one big alternation is not faster than running them one by one, because
+the engine still tries every alternative at every position and loses the fast
+literal search it uses for simple patterns. Most rules however contain literal
+strings that must appear in the text for the rule to match (ex: "diab" for
+"diab[eé]te"). :class:`LiteralPrefilter` extracts these required literals once
+and, for a given text, returns the indices of the only regexps that may match,
+using fast substring lookups. It never discards a regexp that could match, so
+running the remaining regexps gives exactly the same results as running all of
+them.
+"""
+
+__all__ = ["LiteralPrefilter", "RulesPrefilter"]
+
+import functools
+import re
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+try:  # python >= 3.11
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+_LITERAL = _sre_parse.LITERAL
+_BRANCH = _sre_parse.BRANCH
+_SUBPATTERN = _sre_parse.SUBPATTERN
+_REPEATS = {
+    op
+    for op in (
+        _sre_parse.MAX_REPEAT,
+        _sre_parse.MIN_REPEAT,
+        getattr(_sre_parse, "POSSESSIVE_REPEAT", None),
+    )
+    if op is not None
+}
+_ATOMIC_GROUP = getattr(_sre_parse, "ATOMIC_GROUP", None)
+
+# set of alternative literals, one of which must be found in a text for a regexp
+# to match it
+_Requirement = FrozenSet[str]
+
+
+class LiteralPrefilter:
+    """Quickly find which regexps of a set may match a text, based on the
+    literal strings each regexp requires.
+
+    Regexps for which no required literal can be found are always returned
+    as candidates.
+    """
+
+    def __init__(self, regexps: Sequence[str], flags: Sequence[int]):
+        """
+        Parameters
+        ----------
+        regexps:
+            Regexp patterns to prefilter
+        flags:
+            Flags used to compile each pattern in `regexps`
+            (only `re.IGNORECASE` is taken into account)
+        """
+        assert len(regexps) == len(flags)
+
+        self._nb_regexps = len(regexps)
+        self._always_candidates: List[int] = []
+        self._indices_by_literal: Dict[str, List[int]] = {}
+        self._indices_by_ci_literal: Dict[str, List[int]] = {}
+
+        for index, (regexp, regexp_flags) in enumerate(zip(regexps, flags)):
+            requirement, ignore_case = _extract_requirement(regexp, regexp_flags)
+            if requirement is None:
+                self._always_candidates.append(index)
+                continue
+            indices_by_literal = (
+                self._indices_by_ci_literal if ignore_case else self._indices_by_literal
+            )
+            for literal in requirement:
+                indices_by_literal.setdefault(literal, []).append(index)
+
+        # translation table mapping all case variants of characters used in
+        # case-insensitive literals to a single representative character,
+        # applied both to literals and to texts
+        ci_chars = {c for literal in self._indices_by_ci_literal for c in literal}
+        self._ci_table = _build_ignore_case_table(frozenset(ci_chars))
+        self._indices_by_ci_literal = {
+            literal.translate(self._ci_table): indices
+            for literal, indices in self._indices_by_ci_literal.items()
+        }
+
+    @property
+    def nb_prefiltered(self) -> int:
+        """Number of regexps for which a required literal was found"""
+        return self._nb_regexps - len(self._always_candidates)
+
+    def get_candidates(self, text: str) -> List[int]:
+        """Return the sorted indices of the regexps that may match `text`"""
+
+        candidates: Set[int] = set(self._always_candidates)
+        for literal, indices in self._indices_by_literal.items():
+            if literal in text:
+                candidates.update(indices)
+        if self._indices_by_ci_literal:
+            folded_text = text.translate(self._ci_table)
+            for literal, indices in self._indices_by_ci_literal.items():
+                if literal in folded_text:
+                    candidates.update(indices)
+        return sorted(candidates)
+
+
+class RulesPrefilter:
+    """Prefilter of the rules of a rule-based operation, some of them being run
+    on the unicode text of segments and the others on their ASCII text.
+
+    Rules are grouped by unicode sensitivity, since they are not run on the same
+    text, with a :class:`LiteralPrefilter` for each group.
+    """
+
+    def __init__(
+        self,
+        regexps: Sequence[str],
+        flags: Sequence[int],
+        unicode_sensitive: Sequence[bool],
+    ):
+        """
+        Parameters
+        ----------
+        regexps:
+            Regexp patterns of the rules
+        flags:
+            Flags used to compile each pattern in `regexps`
+        unicode_sensitive:
+            Whether each rule is run on the unicode text (or on the ASCII text)
+        """
+        assert len(regexps) == len(flags) == len(unicode_sensitive)
+
+        self._prefilters: List[Tuple[bool, List[int], LiteralPrefilter]] = []
+        for group_unicode_sensitive in (True, False):
+            rule_indices = [
+                i
+                for i, u in enumerate(unicode_sensitive)
+                if u == group_unicode_sensitive
+            ]
+            if not rule_indices:
+                continue
+            prefilter = LiteralPrefilter(
+                regexps=[regexps[i] for i in rule_indices],
+                flags=[flags[i] for i in rule_indices],
+            )
+            self._prefilters.append((group_unicode_sensitive, rule_indices, prefilter))
+
+    def get_candidates(self, text_unicode: str, text_ascii: Optional[str]) -> List[int]:
+        """Return the indices of the rules that may match a text, in rule order
+
+        Parameters
+        ----------
+        text_unicode:
+            Unicode text, for unicode-sensitive rules
+        text_ascii:
+            ASCII text, for other rules (may be `None` if there are no such
+            rules)
+        """
+        candidates = []
+        for unicode_sensitive, rule_indices, prefilter in self._prefilters:
+            text = text_unicode if unicode_sensitive else text_ascii
+            candidates += (rule_indices[i] for i in prefilter.get_candidates(text))
+        return sorted(candidates)
+
+
+def _extract_requirement(
+    regexp: str, flags: int
+) -> Tuple[Optional[_Requirement], bool]:
+    """Return a set of literals, one of which is present in any string matched
+    by `regexp` (or None if no such set could be found), and whether these
+    literals must be looked up case-insensitively"""
+
+    try:
+        parsed = _sre_parse.parse(regexp, flags)
+    except re.error:
+        return None, False
+
+    # "state" was named "pattern" before python 3.8
+    state = parsed.state if hasattr(parsed, "state") else parsed.pattern
+    ignore_case = bool(state.flags & re.IGNORECASE)
+    requirement = _get_seq_requirement(parsed, ignore_case)
+    return requirement, ignore_case
+
+
+def _get_seq_requirement(seq, ignore_case: bool) -> Optional[_Requirement]:
+    """Return the best requirement of a sequence of regexp nodes"""
+
+    requirements = []
+    current_run = []
+
+    def close_run():
+        if current_run:
+            requirements.append(frozenset(["".join(current_run)]))
+            current_run.clear()
+
+    for op, av in seq:
+        if op is _LITERAL:
+            char = _normalize_literal_char(chr(av), ignore_case)
+            if char is not None:
+                current_run.append(char)
+                continue
+            close_run()
+        else:
+            close_run()
+            requirement = _get_node_requirement(op, av, ignore_case)
+            if requirement is not None:
+                requirements.append(requirement)
+    close_run()
+
+    if not requirements:
+        return None
+    # prefer requirements with long literals, then with few alternatives
+    return max(requirements, key=lambda r: (min(len(s) for s in r), -len(r)))
+
+
+def _get_node_requirement(op, av, ignore_case: bool) -> Optional[_Requirement]:
+    if op is _SUBPATTERN:
+        _, add_flags, del_flags, sub_seq = av
+        # scoped flags changing case sensitivity are not supported
+        if (add_flags | del_flags) & re.IGNORECASE:
+            return None
+        return _get_seq_requirement(sub_seq, ignore_case)
+    if op is _ATOMIC_GROUP:
+        return _get_seq_requirement(av, ignore_case)
+    if op in _REPEATS:
+        min_repeat, _, sub_seq = av
+        if min_repeat < 1:
+            return None
+        return _get_seq_requirement(sub_seq, ignore_case)
+    if op is _BRANCH:
+        _, branches = av
+        literals = set()
+        for branch in branches:
+            requirement = _get_seq_requirement(branch, ignore_case)
+            if requirement is None:
+                return None
+            literals.update(requirement)
+        # literals containing another literal of the set are redundant
+        return frozenset(
+            literal
+            for literal in literals
+            if not any(other != literal and other in literal for other in literals)
+        )
+    # character classes, assertions, anchors, group references, etc
+    return None
+
+
+def _normalize_literal_char(char: str, ignore_case: bool) -> Optional[str]:
+    if not ignore_case:
+        return char
+    # case variants are only looked up for characters in the BMP
+    if ord(char) > 0xFFFF:
+        return None
+    lower_char = char.lower()
+    return lower_char if len(lower_char) == 1 else char
+
+
+@functools.lru_cache(maxsize=32)
+def _build_ignore_case_table(chars: FrozenSet[str]) -> Dict[int, str]:
+    """Build a translation table mapping every character that `re.IGNORECASE`
+    considers equivalent to one of `chars` to a representative character"""
+
+    if not chars:
+        return {}
+
+    all_chars = "".join(map(chr, range(0x10000)))
+    table = {}
+    for char in sorted(chars):
+        pattern = re.compile(re.escape(char), flags=re.IGNORECASE)
+        variants = pattern.findall(all_chars)
+        # reuse representative of equivalent characters already processed
+        representative = next(
+            (table[ord(v)] for v in variants if ord(v) in table), char
+        )
+        for variant in variants:
+            table[ord(variant)] = representative
+    return {k: v for k, v in table.items() if chr(k) != v}
@@ -0,0 +1,311 @@
+"""
+Lazy equivalent of the `span_utils` operations used by text cleaning functions.
+
+Applying many successive operations to a text with many spans is costly, because
+each operation rewrites all the spans. With the functions of this module, spans
+are replaced by a :class:`SpanPieces` object, recording which parts of the
+original spans (or which replacements) make up the current text. Operations only
+update these pieces, which are usually much fewer than the original spans, and
+the resulting spans are built once with :func:`to_spans`.
+
+The spans returned by :func:`to_spans` are identical to those that would have
+been obtained by applying the same operations with `span_utils`.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "SpanPieces",
+    "from_spans",
+    "to_spans",
+    "replace",
+    "remove",
+    "extract",
+    "insert",
+    "concatenate",
+]
+
+import bisect
+import itertools
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from medkit.core.text.span import AnySpan, ModifiedSpan, Span
+
+
+class _SourcePiece(NamedTuple):
+    """Part of the original spans, in "relative" coords (as if the original spans
+    were laid end to end)"""
+
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+
+class _ModifiedPiece(NamedTuple):
+    """Replacement text, referencing the parts of the original spans it
+    replaced"""
+
+    length: int
+    replaced: Tuple[_SourcePiece, ...]
+
+
+_Piece = Union[_SourcePiece, _ModifiedPiece]
+
+
+class _Source:
+    """Original spans, with their start and end in "relative" coords"""
+
+    def __init__(self, spans: List[AnySpan]):
+        self.spans = spans
+        self.starts = []
+        self.ends = []
+        end = 0
+        for span in spans:
+            self.starts.append(end)
+            end += span.length
+            self.ends.append(end)
+
+    def get_spans(self, piece: _SourcePiece) -> List[AnySpan]:
+        """Return the parts of the original spans covered by `piece`, as if they
+        were kept by `span_utils` operations"""
+
+        spans = []
+        index = bisect.bisect_right(self.ends, piece.start)
+        while index < len(self.spans) and self.starts[index] < piece.end:
+            span = self.spans[index]
+            span_start = self.starts[index]
+            start = max(piece.start, span_start)
+            end = min(piece.end, self.ends[index])
+            if end > start:
+                if end - start == span.length:
+                    spans.append(span)
+                elif isinstance(span, Span):
+                    offset = span.start - span_start
+                    spans.append(Span(start + offset, end + offset))
+                else:
+                    assert isinstance(span, ModifiedSpan)
+                    spans.append(ModifiedSpan(end - start, span.replaced_spans))
+            index += 1
+        return spans
+
+    def get_replaced_spans(self, piece: _SourcePiece) -> List[Span]:
+        """Return the parts of the original spans covered by `piece`, as if they
+        were replaced by `span_utils` operations"""
+
+        replaced_spans = []
+        for span in self.get_spans(piece):
+            if isinstance(span, Span):
+                replaced_spans.append(span)
+            else:
+                replaced_spans += span.replaced_spans
+        return replaced_spans
+
+
+class SpanPieces:
+    """Spans of a text being modified, as a list of pieces referencing the
+    original spans (cf :func:`from_spans`)"""
+
+    def __init__(self, source: _Source, pieces: Optional[List[_Piece]]):
+        self._source = source
+        # None as long as no operation was applied, in which case the
+        # original spans are returned as is (including empty spans, which are
+        # dropped by span_utils operations)
+        self._pieces = pieces
+        self._ends: Optional[List[int]] = None
+
+    @property
+    def pieces(self) -> List[_Piece]:
+        if self._pieces is None:
+            return [_SourcePiece(0, end) for end in self._source.ends[-1:] if end > 0]
+        return self._pieces
+
+    @property
+    def ends(self) -> List[int]:
+        """End of each piece in the text"""
+        if self._ends is None:
+            self._ends = list(itertools.accumulate(p.length for p in self.pieces))
+        return self._ends
+
+    @property
+    def length(self) -> int:
+        ends = self.ends
+        return ends[-1] if ends else 0
+
+    def __bool__(self) -> bool:
+        if self._pieces is None:
+            return bool(self._source.spans)
+        return bool(self._pieces)
+
+
+def from_spans(spans: List[AnySpan]) -> SpanPieces:
+    """Wrap `spans` into a :class:`SpanPieces` object, to be used instead of
+    `spans` with the functions of this module"""
+    return SpanPieces(_Source(spans), None)
+
+
+def to_spans(spans: SpanPieces) -> List[AnySpan]:
+    """Return the spans corresponding to `spans` after all the operations that
+    were applied to it"""
+
+    if spans._pieces is None:
+        return spans._source.spans
+
+    source = spans._source
+    output_spans = []
+    for piece in spans._pieces:
+        if isinstance(piece, _SourcePiece):
+            output_spans += source.get_spans(piece)
+        else:
+            replaced_spans = [
+                span
+                for replaced in piece.replaced
+                for span in source.get_replaced_spans(replaced)
+            ]
+            output_spans.append(ModifiedSpan(piece.length, replaced_spans))
+    return output_spans
+
+
+def replace(
+    text: str,
+    spans: SpanPieces,
+    ranges: List[Tuple[int, int]],
+    replacement_texts: List[str],
+) -> Tuple[str, SpanPieces]:
+    """Same as :func:`~medkit.core.text.span_utils.replace`"""
+
+    assert len(text) == spans.length
+    assert len(ranges) == len(replacement_texts)
+
+    if len(ranges) == 0:
+        return text, spans
+
+    text_parts = []
+    prev_range_end = 0
+    for (range_start, range_end), rep_text in zip(ranges, replacement_texts):
+        text_parts.append(text[prev_range_end:range_start])
+        text_parts.append(rep_text)
+        prev_range_end = range_end
+    text_parts.append(text[prev_range_end:])
+    text = "".join(text_parts)
+
+    replacement_lengths = [len(rep_text) for rep_text in replacement_texts]
+    return text, _replace_in_pieces(spans, ranges, replacement_lengths)
+
+
+def remove(
+    text: str,
+    spans: SpanPieces,
+    ranges: List[Tuple[int, int]],
+) -> Tuple[str, SpanPieces]:
+    """Same as :func:`~medkit.core.text.span_utils.remove`"""
+    return replace(text, spans, ranges, [""] * len(ranges))
+
+
+def extract(
+    text: str,
+    spans: SpanPieces,
+    ranges: List[Tuple[int, int]],
+) -> Tuple[str, SpanPieces]:
+    """Same as :func:`~medkit.core.text.span_utils.extract`"""
+
+    assert len(text) == spans.length
+
+    if len(ranges) == 0:
+        return "", SpanPieces(spans._source, [])
+
+    text = "".join(text[s:e] for s, e in ranges)
+    pieces = []
+    for start, end in ranges:
+        pieces += _get_pieces_in_range(spans, start, end)
+    return text, SpanPieces(spans._source, pieces)
+
+
+def insert(
+    text: str,
+    spans: SpanPieces,
+    positions: List[int],
+    insertion_texts: List[str],
+) -> Tuple[str, SpanPieces]:
+    """Same as :func:`~medkit.core.text.span_utils.insert`"""
+    ranges = [(p, p) for p in positions]
+    return replace(text, spans, ranges, insertion_texts)
+
+
+def concatenate(
+    texts: List[str], all_spans: List[SpanPieces]
+) -> Tuple[str, SpanPieces]:
+    """Same as :func:`~medkit.core.text.span_utils.concatenate`"""
+
+    assert len(texts) == len(all_spans)
+    source = all_spans[0]._source
+    assert all(spans._source is source for spans in all_spans)
+    # concatenated spans always come from extract() or insert(), so they are
+    # never the original spans kept as is (whose empty spans would be lost)
+    assert all(spans._pieces is not None for spans in all_spans)
+
+    text = "".join(texts)
+    pieces = [piece for spans in all_spans for piece in spans.pieces]
+    return text, SpanPieces(source, pieces)
+
+
+def _replace_in_pieces(
+    spans: SpanPieces,
+    ranges: List[Tuple[int, int]],
+    replacement_lengths: List[int],
+) -> SpanPieces:
+    output_pieces = []
+    prev_range_end = 0
+    for (range_start, range_end), replacement_length in zip(
+        ranges, replacement_lengths
+    ):
+        # part of the text before range, which is kept
+        output_pieces += _get_pieces_in_range(spans, prev_range_end, range_start)
+        # ranges replaced by an empty string are just removed
+        if replacement_length > 0:
+            replaced = []
+            for piece in _get_pieces_in_range(spans, range_start, range_end):
+                if isinstance(piece, _SourcePiece):
+                    replaced.append(piece)
+                else:
+                    replaced += piece.replaced
+            output_pieces.append(_ModifiedPiece(replacement_length, tuple(replaced)))
+        prev_range_end = range_end
+    output_pieces += _get_pieces_in_range(spans, prev_range_end, spans.length)
+    return SpanPieces(spans._source, output_pieces)
+
+
+def _get_pieces_in_range(spans: SpanPieces, start: int, end: int) -> List[_Piece]:
+    """Return the non-empty parts of the pieces of `spans` in the `[start, end[`
+    range of the text"""
+
+    if end <= start:
+        return []
+
+    pieces = spans.pieces
+    ends = spans.ends
+    # first piece ending after start, and piece containing end
+    first = bisect.bisect_right(ends, start)
+    last = bisect.bisect_left(ends, end)
+    first_start = ends[first] - pieces[first].length
+    if first == last:
+        return [_get_part(pieces[first], start - first_start, end - first_start)]
+
+    last_start = ends[last] - pieces[last].length
+    return [
+        _get_part(pieces[first], start - first_start, pieces[first].length),
+        *pieces[first + 1 : last],
+        _get_part(pieces[last], 0, end - last_start),
+    ]
+
+
+def _get_part(piece: _Piece, start: int, end: int) -> _Piece:
+    if end - start == piece.length:
+        return piece
+    if isinstance(piece, _SourcePiece):
+        return _SourcePiece(piece.start + start, piece.start + end)
+    # same as span_utils for ModifiedSpans, not possible to know which subpart
+    # of the replaced spans corresponds to the part
+    return _ModifiedPiece(end - start, piece.replaced)
@@ -1,9 +1,12 @@
 __all__ = ["TextAnnotationContainer"]
 
 import typing
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from intervaltree import Interval, IntervalTree
 
 from medkit.core.annotation_container import AnnotationContainer
+from medkit.core.text import span_utils
 from medkit.core.text.annotation import TextAnnotation, Segment, Entity, Relation
 
 
@@ -16,6 +19,14 @@ class TextAnnotationContainer(AnnotationContainer[TextAnnotation]):
 
     Also provides retrieval of entities, segments, relations, and handling of
     raw segment.
+
+    Segments and entities can also be retrieved by position, with
+    :meth:`get_overlapping`, :meth:`get_contained` and :meth:`get_containing`.
+    These queries rely on an interval index of the normalized spans of the
+    annotations (cf :func:`~medkit.core.text.span_utils.normalize_spans`),
+    which is updated with the annotations added since the last query. Spans of
+    annotations must therefore not be modified once they have been added to
+    the container.
     """
 
     def __init__(self, doc_id: str, raw_segment: Segment):
@@ -26,10 +37,21 @@ class TextAnnotationContainer(AnnotationContainer[TextAnnotation]):
         # and get_by_id()
         self.raw_segment = raw_segment
 
-        self._segment_ids: List[str] = []
-        self._entity_ids: List[str] = []
-        self._relation_ids: List[str] = []
-        self._relation_ids_by_source_id: Dict[str, List[str]] = {}
+        # ordered sets of ids (cf AnnotationContainer)
+        self._segment_ids: Dict[str, None] = {}
+        self._entity_ids: Dict[str, None] = {}
+        self._relation_ids: Dict[str, None] = {}
+        self._relation_ids_by_source_id: Dict[str, Dict[str, None]] = {}
+
+        # interval index of normalized spans of segments and entities, with
+        # the list of (insertion rank, uid) of annotations having this span as
+        # data of each interval (intervaltree doesn't handle well many
+        # intervals with the same bounds). Annotations are only indexed when a
+        # positional query is made
+        self._span_tree: IntervalTree = IntervalTree()
+        self._intervals_by_bounds: Dict[Tuple[int, int], Interval] = {}
+        self._nb_spans_by_id: Dict[str, int] = {}
+        self._segments_to_index: List[Tuple[int, str]] = []
 
     @property
     def segments(self) -> List[Segment]:
@@ -56,14 +78,30 @@ class TextAnnotationContainer(AnnotationContainer[TextAnnotation]):
 
         # update entity/segments/relations index
         if isinstance(ann, Entity):
-            self._entity_ids.append(ann.uid)
+            self._entity_ids[ann.uid] = None
+            self._segments_to_index.append((len(self._ann_ids), ann.uid))
         elif isinstance(ann, Segment):
-            self._segment_ids.append(ann.uid)
+            self._segment_ids[ann.uid] = None
+            self._segments_to_index.append((len(self._ann_ids), ann.uid))
         elif isinstance(ann, Relation):
-            self._relation_ids.append(ann.uid)
+            self._relation_ids[ann.uid] = None
             if ann.source_id not in self._relation_ids_by_source_id:
-                self._relation_ids_by_source_id[ann.source_id] = []
-            self._relation_ids_by_source_id[ann.source_id].append(ann.uid)
+                self._relation_ids_by_source_id[ann.source_id] = {}
+            self._relation_ids_by_source_id[ann.source_id][ann.uid] = None
+
+    def release(self):
+        super().release()
+        # attributes of the raw segment
+        self._store.release_data_items(self.raw_segment.uid)
+
+        self._segment_ids.clear()
+        self._entity_ids.clear()
+        self._relation_ids.clear()
+        self._relation_ids_by_source_id.clear()
+        self._span_tree = IntervalTree()
+        self._intervals_by_bounds.clear()
+        self._nb_spans_by_id.clear()
+        self._segments_to_index = []
 
     def get(
         self, *, label: Optional[str] = None, key: Optional[str] = None
@@ -79,6 +117,27 @@ class TextAnnotationContainer(AnnotationContainer[TextAnnotation]):
             return self.raw_segment
         return super().get_by_id(uid)
 
+    def _filter_ids(
+        self,
+        type_ids: Dict[str, None],
+        label: Optional[str],
+        key: Optional[str],
+    ) -> Iterator[str]:
+        """Return ids of `type_ids` also matching `label` and `key`, in
+        insertion order"""
+
+        if label is None and key is None:
+            return iter(type_ids)
+        label_ids = self._ann_ids_by_label.get(label, {}) if label is not None else None
+        key_ids = self._ann_ids_by_key.get(key, {}) if key is not None else None
+        # iterate over the smallest set of ids, all being in insertion order
+        candidates = [type_ids] + [
+            ids for ids in (label_ids, key_ids) if ids is not None
+        ]
+        smallest = min(candidates, key=len)
+        others = [ids for ids in candidates if ids is not smallest]
+        return (uid for uid in smallest if all(uid in ids for ids in others))
+
     def get_segments(
         self, *, label: Optional[str] = None, key: Optional[str] = None
     ) -> List[Segment]:
@@ -94,10 +153,8 @@ class TextAnnotationContainer(AnnotationContainer[TextAnnotation]):
             Key to use to filter segments.
         """
 
-        # get ids filtered by label/key
-        uids = self.get_ids(label=label, key=key)
-        # keep only segment ids
-        uids = (uid for uid in uids if uid in self._segment_ids)
+        # keep only segment ids, iterating over the smallest index
+        uids = self._filter_ids(self._segment_ids, label=label, key=key)
 
         segments = [self.get_by_id(uid) for uid in uids]
         return typing.cast(List[Segment], segments)
@@ -117,10 +174,8 @@ class TextAnnotationContainer(AnnotationContainer[TextAnnotation]):
             Key to use to filter entities.
         """
 
-        # get ids filtered by label/key
-        uids = self.get_ids(label=label, key=key)
-        # keep only entity ids
-        uids = (uid for uid in uids if uid in self._entity_ids)
+        # keep only entity ids, iterating over the smallest index
+        uids = self._filter_ids(self._entity_ids, label=label, key=key)
 
         entities = [self.get_by_id(uid) for uid in uids]
         return typing.cast(List[Entity], entities)
@@ -146,15 +201,170 @@ class TextAnnotationContainer(AnnotationContainer[TextAnnotation]):
             Identifier of the source entity to use to filter relations.
         """
 
-        # get ids filtered by label/key
-        uids = self.get_ids(label=label, key=key)
         # keep only relation ids
         # (either all relations or relations with specific source)
         if source_id is None:
-            uids = (uid for uid in uids if uid in self._relation_ids)
+            relation_ids = self._relation_ids
         else:
-            relation_ids = self._relation_ids_by_source_id.get(source_id, [])
-            uids = (uid for uid in uids if uid in relation_ids)
+            relation_ids = self._relation_ids_by_source_id.get(source_id, {})
+        uids = self._filter_ids(relation_ids, label=label, key=key)
 
         entities = [self.get_by_id(uid) for uid in uids]
         return typing.cast(List[Relation], entities)
+
+    def get_overlapping(
+        self,
+        start: int,
+        end: int,
+        *,
+        label: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> List[Segment]:
+        """
+        Return the segments and entities of the document having at least one
+        character in the `[start, end[` range of the raw text, optionally
+        filtering by label or key.
+
+        Parameters
+        ----------
+        start:
+            Start of the range
+        end:
+            End of the range (exclusive)
+        label:
+            Label to use to filter annotations.
+        key:
+            Key to use to filter annotations.
+        """
+
+        self._update_span_tree()
+        matches = {m for iv in self._span_tree.overlap(start, end) for m in iv.data}
+        return self._get_matching_segments(matches, label, key)
+
+    def get_contained(
+        self,
+        start: int,
+        end: int,
+        *,
+        label: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> List[Segment]:
+        """
+        Return the segments and entities of the document of which all
+        characters are in the `[start, end[` range of the raw text, optionally
+        filtering by label or key.
+
+        Parameters
+        ----------
+        start:
+            Start of the range
+        end:
+            End of the range (exclusive)
+        label:
+            Label to use to filter annotations.
+        key:
+            Key to use to filter annotations.
+        """
+
+        self._update_span_tree()
+        nb_spans_by_match: Dict[Tuple[int, str], int] = {}
+        for interval in self._span_tree.envelop(start, end):
+            for match in interval.data:
+                nb_spans = nb_spans_by_match.get(match, 0)
+                nb_spans_by_match[match] = nb_spans + 1
+        # all spans of discontinuous annotations must be in the range
+        matches = {
+            match
+            for match, nb_spans in nb_spans_by_match.items()
+            if nb_spans == self._nb_spans_by_id[match[1]]
+        }
+        return self._get_matching_segments(matches, label, key)
+
+    def get_containing(
+        self,
+        start: int,
+        end: int,
+        *,
+        label: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> List[Segment]:
+        """
+        Return the segments and entities of the document having a span covering
+        the whole `[start, end[` range of the raw text, optionally filtering by
+        label or key.
+
+        For instance, the segments containing an entity can be retrieved with:
+
+        >>> spans = span_utils.normalize_spans(entity.spans)
+        >>> segments = doc.anns.get_containing(spans[0].start, spans[-1].end)
+
+        Parameters
+        ----------
+        start:
+            Start of the range
+        end:
+            End of the range (exclusive)
+        label:
+            Label to use to filter annotations.
+        key:
+            Key to use to filter annotations.
+        """
+
+        self._update_span_tree()
+        matches = {
+            match
+            for iv in self._span_tree.overlap(start, max(end, start + 1))
+            if iv.begin <= start and iv.end >= end
+            for match in iv.data
+        }
+        return self._get_matching_segments(matches, label, key)
+
+    def _update_span_tree(self):
+        """Add segments and entities added since last update to the interval
+        index"""
+
+        if not self._segments_to_index:
+            return
+
+        intervals = []
+        for rank, uid in self._segments_to_index:
+            # only ids are kept until indexing, so that segments are not held
+            # in memory by the container (cf disk store)
+            segment = typing.cast(Segment, self.get_by_id(uid))
+            # empty spans can't be indexed
+            spans = [
+                s for s in span_utils.normalize_spans(segment.spans) if s.length > 0
+            ]
+            self._nb_spans_by_id[uid] = len(spans)
+            for span in spans:
+                bounds = (span.start, span.end)
+                interval = self._intervals_by_bounds.get(bounds)
+                if interval is None:
+                    interval = Interval(span.start, span.end, [])
+                    self._intervals_by_bounds[bounds] = interval
+                    intervals.append(interval)
+                interval.data.append((rank, uid))
+        if self._span_tree:
+            self._span_tree.update(intervals)
+        else:
+            # building a new tree is faster than adding intervals one by one
+            self._span_tree = IntervalTree(intervals)
+        self._segments_to_index = []
+
+    def _get_matching_segments(
+        self,
+        matches: typing.Set[Tuple[int, str]],
+        label: Optional[str],
+        key: Optional[str],
+    ) -> List[Segment]:
+        # return segments in insertion order
+        uids = (uid for _, uid in sorted(matches))
+        if label is not None:
+            label_ids = self._ann_ids_by_label.get(label, {})
+            uids = (uid for uid in uids if uid in label_ids)
+        if key is not None:
+            key_ids = self._ann_ids_by_key.get(key, {})
+            uids = (uid for uid in uids if uid in key_ids)
+
+        segments = [self.get_by_id(uid) for uid in uids]
+        return typing.cast(List[Segment], segments)
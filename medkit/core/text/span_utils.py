@@ -13,8 +13,16 @@ __all__ = [
 
 from typing import List, Tuple
 
+import numpy as np
+
 from medkit.core.text.span import Span, ModifiedSpan, AnySpan
 
+# minimum number of spans and ranges above which span operations use
+# vectorized implementations relying on numpy arrays, which are faster for
+# segments with many spans (ex: after cleaning or replacing many characters)
+# but slower for a few spans
+_VECTORIZATION_THRESHOLD = 64
+
 
 def _spans_have_same_length_as_text(text, spans):
     return len(text) == sum(sp.length for sp in spans)
@@ -87,22 +95,29 @@ def replace(
     if len(ranges) == 0:
         return text, spans
 
-    offset = 0
-    replacement_lengths = []
+    # build new text from parts in one pass rather than creating a new string
+    # for each replacement
+    text_parts = []
+    prev_range_end = 0
     for (range_start, range_end), rep_text in zip(ranges, replacement_texts):
-        range_start += offset
-        range_end += offset
-        text = text[:range_start] + rep_text + text[range_end:]
-
-        rep_length = len(rep_text)
-        offset += rep_length - (range_end - range_start)
-        replacement_lengths.append(rep_length)
+        text_parts.append(text[prev_range_end:range_start])
+        text_parts.append(rep_text)
+        prev_range_end = range_end
+    text_parts.append(text[prev_range_end:])
+    text = "".join(text_parts)
 
+    replacement_lengths = [len(rep_text) for rep_text in replacement_texts]
     spans = _replace_in_spans(spans, ranges, replacement_lengths)
     return text, spans
 
 
 def _replace_in_spans(spans, ranges, replacement_lengths):
+    if len(spans) + len(ranges) >= _VECTORIZATION_THRESHOLD:
+        return _replace_in_spans_vectorized(spans, ranges, replacement_lengths)
+    return _replace_in_spans_iteratively(spans, ranges, replacement_lengths)
+
+
+def _replace_in_spans_iteratively(spans, ranges, replacement_lengths):
     output_spans = []
 
     # current span and associated values
@@ -217,6 +232,126 @@ def _replace_in_spans(spans, ranges, replacement_lengths):
     return output_spans
 
 
+def _replace_in_spans_vectorized(spans, ranges, replacement_lengths):
+    """Same as `_replace_in_spans_iteratively()`, but computing the intersections
+    of spans with replaced ranges and with the parts of the text to keep
+    between them with numpy arrays"""
+
+    # start and end of each span in "relative" coords (can be compared to range
+    # start/end)
+    span_lengths = np.fromiter(
+        (s.length for s in spans), dtype=np.int64, count=len(spans)
+    )
+    span_ends = np.cumsum(span_lengths)
+    span_starts = span_ends - span_lengths
+    total_length = int(span_ends[-1]) if len(spans) else 0
+    # start in original text of each span, used to compute the start of parts
+    # of spans (meaningless for ModifiedSpans)
+    is_modified = [isinstance(s, ModifiedSpan) for s in spans]
+    orig_offsets = np.fromiter(
+        (0 if m else s.start for s, m in zip(spans, is_modified)),
+        dtype=np.int64,
+        count=len(spans),
+    )
+    orig_offsets -= span_starts
+
+    range_bounds = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+    range_starts = range_bounds[:, 0]
+    range_ends = range_bounds[:, 1]
+    # parts of the text before, between and after ranges, which are kept
+    kept_starts = np.concatenate(([0], range_ends))
+    kept_ends = np.concatenate((range_starts, [total_length]))
+
+    # kept parts of spans, reusing whole spans when possible
+    kept_part_indices, span_indices, part_starts, part_ends = _intersect(
+        span_starts, span_ends, kept_starts, kept_ends
+    )
+    part_lengths = part_ends - part_starts
+    is_whole = part_lengths == span_lengths[span_indices]
+    kept_spans = []
+    for span_index, whole, orig_start, length in zip(
+        span_indices.tolist(),
+        is_whole.tolist(),
+        (orig_offsets[span_indices] + part_starts).tolist(),
+        part_lengths.tolist(),
+    ):
+        if whole:
+            kept_spans.append(spans[span_index])
+        elif is_modified[span_index]:
+            # not possible to know which subpart of the replaced_spans
+            # corresponds to the kept part of the ModifiedSpan
+            span = spans[span_index]
+            kept_spans.append(ModifiedSpan(length, span.replaced_spans))
+        else:
+            kept_spans.append(Span(orig_start, orig_start + length))
+
+    # ModifiedSpan for each range not replaced by an empty string (other ranges
+    # are just removed), referencing the replaced parts of spans
+    modified_range_indices = np.flatnonzero(np.array(replacement_lengths) > 0)
+    if len(modified_range_indices) == 0:
+        return kept_spans
+
+    range_indices, span_indices, part_starts, part_ends = _intersect(
+        span_starts,
+        span_ends,
+        range_starts[modified_range_indices],
+        range_ends[modified_range_indices],
+    )
+    replaced_spans_by_range = [[] for _ in modified_range_indices]
+    for range_index, span_index, orig_start, orig_end in zip(
+        range_indices.tolist(),
+        span_indices.tolist(),
+        (orig_offsets[span_indices] + part_starts).tolist(),
+        (orig_offsets[span_indices] + part_ends).tolist(),
+    ):
+        if is_modified[span_index]:
+            replaced_spans_by_range[range_index] += spans[span_index].replaced_spans
+        else:
+            replaced_spans_by_range[range_index].append(Span(orig_start, orig_end))
+    modified_spans = [
+        ModifiedSpan(replacement_lengths[i], replaced_spans)
+        for i, replaced_spans in zip(
+            modified_range_indices.tolist(), replaced_spans_by_range
+        )
+    ]
+
+    # interleave kept parts and modified spans, kept part i being
+    # before range i
+    order = np.argsort(
+        np.concatenate((2 * kept_part_indices, 2 * modified_range_indices + 1)),
+        kind="stable",
+    )
+    all_spans = kept_spans + modified_spans
+    return [all_spans[i] for i in order.tolist()]
+
+
+def _intersect(span_starts, span_ends, starts, ends):
+    """Return the non-empty intersections of contiguous spans and of sorted
+    non-overlapping intervals, as the indices of the interval and of the span
+    of each intersection, and the start and end of each intersection (sorted)
+    """
+
+    # spans ending after the start of each interval and starting before its end
+    first_span_indices = np.searchsorted(span_ends, starts, side="right")
+    end_span_indices = np.searchsorted(span_starts, ends, side="left")
+    counts = np.maximum(end_span_indices - first_span_indices, 0)
+
+    interval_indices = np.repeat(np.arange(len(starts)), counts)
+    # index of each intersection among the intersections of its interval
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    span_indices = np.repeat(first_span_indices, counts) + offsets
+
+    part_starts = np.maximum(span_starts[span_indices], starts[interval_indices])
+    part_ends = np.minimum(span_ends[span_indices], ends[interval_indices])
+    non_empty = part_ends > part_starts
+    return (
+        interval_indices[non_empty],
+        span_indices[non_empty],
+        part_starts[non_empty],
+        part_ends[non_empty],
+    )
+
+
 def remove(
     text: str,
     spans: List[AnySpan],
@@ -251,12 +386,14 @@ def remove(
     if len(ranges) == 0:
         return text, spans
 
-    offset = 0
+    text_parts = []
+    prev_range_end = 0
     for range_start, range_end in ranges:
-        range_start += offset
-        range_end += offset
-        text = text[:range_start] + text[range_end:]
-        offset -= range_end - range_start
+        text_parts.append(text[prev_range_end:range_start])
+        prev_range_end = range_end
+    text_parts.append(text[prev_range_end:])
+    text = "".join(text_parts)
+
     spans = _remove_in_spans(spans, ranges)
     return text, spans
 
@@ -371,15 +508,16 @@ def insert(
     if len(positions) == 0:
         return text, spans
 
-    offset = 0
-    insertion_lengths = []
+    text_parts = []
+    prev_position = 0
     for position, insertion_text in zip(positions, insertion_texts):
-        position += offset
-        text = text[:position] + insertion_text + text[position:]
+        text_parts.append(text[prev_position:position])
+        text_parts.append(insertion_text)
+        prev_position = position
+    text_parts.append(text[prev_position:])
+    text = "".join(text_parts)
 
-        insertion_length = len(insertion_text)
-        offset += insertion_length
-        insertion_lengths.append(insertion_length)
+    insertion_lengths = [len(insertion_text) for insertion_text in insertion_texts]
 
     spans = _insert_in_spans(spans, positions, insertion_lengths)
     return text, spans
@@ -517,6 +655,9 @@ def normalize_spans(spans: List[AnySpan]) -> List[Span]:
     if not all_spans:
         return []
 
+    if len(all_spans) >= _VECTORIZATION_THRESHOLD:
+        return _merge_spans_vectorized(all_spans)
+
     all_spans.sort(key=lambda s: s.start)
     # merge contiguous spans
     all_spans_merged = [all_spans[0]]
@@ -531,6 +672,29 @@ def normalize_spans(spans: List[AnySpan]) -> List[Span]:
     return all_spans_merged
 
 
+def _merge_spans_vectorized(spans: List[Span]) -> List[Span]:
+    """Sort spans and merge contiguous spans with numpy arrays"""
+
+    starts = np.fromiter((s.start for s in spans), dtype=np.int64, count=len(spans))
+    ends = np.fromiter((s.end for s in spans), dtype=np.int64, count=len(spans))
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    ends = ends[order]
+
+    # a new merged span begins at each span not starting at the end of the
+    # previous one
+    group_firsts = np.flatnonzero(np.concatenate(([True], starts[1:] != ends[:-1])))
+    group_lasts = np.append(group_firsts[1:], len(spans)) - 1
+
+    merged_spans = []
+    for first, last in zip(group_firsts.tolist(), group_lasts.tolist()):
+        if first == last:
+            merged_spans.append(spans[order[first]])
+        else:
+            merged_spans.append(Span(int(starts[first]), int(ends[last])))
+    return merged_spans
+
+
 def clean_up_gaps_in_normalized_spans(
     spans: List[Span], text: str, max_gap_length: int = 3
 ):
@@ -0,0 +1,131 @@
+"""
+ASCII transliteration of segment texts, shared by all rule-based operations
+that are not sensitive to unicode.
+
+Transliterations are kept in a bounded LRU cache so that several operations
+processing the same segments in a pipeline only compute them once. They can
+also be precomputed for some segments (cf. :func:`set_ascii_text` and
+:class:`~medkit.text.preprocessing.ASCIITransliterator`), in which case they
+are reused as is. Precomputed texts are kept internally (they are not
+attributes of the segments, so they don't appear in exports or provenance) and
+are forgotten when their segment is garbage collected.
+"""
+
+__all__ = [
+    "transliterate",
+    "get_ascii_text",
+    "set_ascii_text",
+    "has_ascii_text",
+    "set_transliteration_cache_size",
+    "clear_transliteration_cache",
+    "get_transliteration_cache_info",
+]
+
+import functools
+from typing import Dict
+import weakref
+
+import unidecode
+
+from medkit.core.text.annotation import Segment
+
+_DEFAULT_CACHE_SIZE = 4096
+
+# precomputed ASCII texts, by segment uid
+_ascii_texts_by_segment_id: Dict[str, str] = {}
+
+_cached_unidecode = functools.lru_cache(maxsize=_DEFAULT_CACHE_SIZE)(
+    unidecode.unidecode
+)
+
+
+def transliterate(text: str) -> str:
+    """Return the closest ASCII representation of `text`, using `unidecode`.
+
+    Results are cached so calling this function several times with the same text
+    is cheap.
+
+    Parameters
+    ----------
+    text:
+        Text to transliterate
+
+    Returns
+    -------
+    str:
+        ASCII text (which might not have the same length as `text`)
+    """
+    return _cached_unidecode(text)
+
+
+def get_ascii_text(segment: Segment) -> str:
+    """Return the closest ASCII representation of the text of `segment`.
+
+    If an ASCII text was precomputed for the segment (cf.
+    :func:`set_ascii_text`), it is returned. Otherwise the text is
+    transliterated (cf. :func:`transliterate`).
+
+    Parameters
+    ----------
+    segment:
+        Segment for which to retrieve the ASCII text
+
+    Returns
+    -------
+    str:
+        ASCII text (which might not have the same length as the segment text)
+    """
+    ascii_text = _ascii_texts_by_segment_id.get(segment.uid)
+    if ascii_text is not None:
+        return ascii_text
+    return transliterate(segment.text)
+
+
+def set_ascii_text(segment: Segment, ascii_text: str):
+    """Set the precomputed ASCII text of `segment`, to be returned by
+    :func:`get_ascii_text` until the segment is garbage collected.
+
+    Parameters
+    ----------
+    segment:
+        Segment for which to set the ASCII text
+    ascii_text:
+        ASCII text of the segment
+    """
+    if segment.uid not in _ascii_texts_by_segment_id:
+        weakref.finalize(segment, _ascii_texts_by_segment_id.pop, segment.uid, None)
+    _ascii_texts_by_segment_id[segment.uid] = ascii_text
+
+
+def has_ascii_text(segment: Segment) -> bool:
+    """Whether an ASCII text was precomputed for `segment`
+
+    Parameters
+    ----------
+    segment:
+        Segment to check
+    """
+    return segment.uid in _ascii_texts_by_segment_id
+
+
+def set_transliteration_cache_size(size: int):
+    """Change the maximum number of texts for which transliterations are cached.
+    This clears the cache.
+
+    Parameters
+    ----------
+    size:
+        New size of the cache (0 disables caching)
+    """
+    global _cached_unidecode
+    _cached_unidecode = functools.lru_cache(maxsize=size)(unidecode.unidecode)
+
+
+def clear_transliteration_cache():
+    """Remove all cached transliterations"""
+    _cached_unidecode.cache_clear()
+
+
+def get_transliteration_cache_info() -> functools._CacheInfo:
+    """Return hits, misses, maximum size and current size of the cache"""
+    return _cached_unidecode.cache_info()
@@ -1,6 +1,7 @@
 __all__ = ["batch_iter", "batch_list", "modules_are_available"]
 
 import importlib.util
+import itertools
 from typing import Any, Iterator, List
 
 
@@ -18,16 +19,12 @@ def batch_iter(iter: Iterator[Any], batch_size: int) -> Iterator[List[Any]]:
     -------
     Iterator[List[Any]]:
         Iterator yielding lists of `batch_size` items (the last list yielded may
-        be smaller).
+        be smaller, no empty list is yielded).
     """
     while True:
-        batch = []
-        for _ in range(batch_size):
-            try:
-                batch.append(next(iter))
-            except StopIteration:
-                yield batch
-                return
+        batch = list(itertools.islice(iter, batch_size))
+        if not batch:
+            return
         yield batch
 
 
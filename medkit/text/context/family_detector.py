@@ -9,11 +9,11 @@ import re
 from typing import List, Optional, Union
 from typing_extensions import TypedDict
 
-import unidecode
 import yaml
 
 from medkit.core import Attribute
 from medkit.core.text import ContextOperation, Segment
+from medkit.core.text.transliteration import get_ascii_text
 
 logger = logging.getLogger(__name__)
 
@@ -159,7 +159,7 @@ class FamilyDetector(ContextOperation):
                 segment.attrs.add(family_attr)
 
     def _detect_family_ref_in_segment(self, segment: Segment) -> Optional[Attribute]:
-        rule_id = self._find_matching_rule(segment.text)
+        rule_id = self._find_matching_rule(segment)
         if rule_id is not None:
             family_attr = Attribute(
                 label=self.output_label,
@@ -176,17 +176,18 @@ class FamilyDetector(ContextOperation):
 
         return family_attr
 
-    def _find_matching_rule(self, text: str) -> Optional[Union[str, int]]:
+    def _find_matching_rule(self, segment: Segment) -> Optional[Union[str, int]]:
+        text_unicode = segment.text
+
         # skip empty text
-        if self._non_empty_text_pattern.search(text) is None:
+        if self._non_empty_text_pattern.search(text_unicode) is None:
             return None
 
-        text_unicode = text
         text_ascii = None
 
         if self._has_non_unicode_sensitive_rule:
             # If there exists one rule which is not unicode-sensitive
-            text_ascii = unidecode.unidecode(text_unicode)
+            text_ascii = get_ascii_text(segment)
             # Verify that text length is conserved
             if len(text_ascii) != len(
                 text_unicode
@@ -13,12 +13,12 @@ from pathlib import Path
 import re
 from typing import Dict, List, Optional, Tuple, Union
 from typing_extensions import Literal, TypedDict
-import unidecode
 
 import yaml
 
 from medkit.core import Attribute
 from medkit.core.text import ContextOperation, Segment
+from medkit.core.text.transliteration import get_ascii_text
 
 logger = logging.getLogger(__name__)
 
@@ -236,7 +236,7 @@ class HypothesisDetector(ContextOperation):
             matched_verb = self._find_matching_verb(segment.text)
             # then match by rule if no verb match
             if not matched_verb:
-                rule_id = self._find_matching_rule(segment.text)
+                rule_id = self._find_matching_rule(segment)
 
         if matched_verb is not None:
             hyp_attr = Attribute(
@@ -266,17 +266,18 @@ class HypothesisDetector(ContextOperation):
                 return verb
         return None
 
-    def _find_matching_rule(self, text: str) -> Optional[Union[str, int]]:
+    def _find_matching_rule(self, segment: Segment) -> Optional[Union[str, int]]:
+        text_unicode = segment.text
+
         # skip empty text
-        if self._non_empty_text_pattern.search(text) is None:
+        if self._non_empty_text_pattern.search(text_unicode) is None:
             return None
 
-        text_unicode = text
         text_ascii = None
 
         if self._has_non_unicode_sensitive_rule:
             # If there exists one rule which is not unicode-sensitive
-            text_ascii = unidecode.unidecode(text_unicode)
+            text_ascii = get_ascii_text(segment)
             # Verify that text length is conserved
             if len(text_ascii) != len(
                 text_unicode
@@ -7,13 +7,14 @@ import logging
 from pathlib import Path
 import re
 from typing import List, Optional, Union
-from typing_extensions import TypedDict
+from typing_extensions import Literal, TypedDict
 
-import unidecode
 import yaml
 
 from medkit.core import Attribute
 from medkit.core.text import ContextOperation, Segment
+from medkit.core.text._regexp_prefilter import RulesPrefilter
+from medkit.core.text.transliteration import get_ascii_text
 
 logger = logging.getLogger(__name__)
 
@@ -87,12 +88,19 @@ class NegationDetector(ContextOperation):
     (e.g., `n°` -> `number`). So, if the text lengths are different, we fall back on
     initial unicode text for detection even if rule is not unicode-sensitive.
     In this case, a warning is logged for recommending to pre-process data.
+
+    With the "multi_rule" engine, all rules are compiled together into a
+    prefilter looking up, in one go, the literal strings that each rule requires.
+    Only the rules that may match a segment are then tried, in the same order,
+    which gives exactly the same results as the "per_rule" engine but is much
+    faster when most segments are not negated.
     """
 
     def __init__(
         self,
         output_label: str,
         rules: Optional[List[NegationDetectorRule]] = None,
+        engine: Literal["per_rule", "multi_rule"] = "per_rule",
         uid: Optional[str] = None,
     ):
         """Instantiate the negation detector
@@ -104,6 +112,10 @@ class NegationDetector(ContextOperation):
         rules:
             The set of rules to use when detecting negation. If none provided,
             the rules in "negation_detector_default_rules.yml" will be used
+        engine:
+            Engine used to find the first matching rule. "per_rule" tries every
+            rule in order. "multi_rule" first looks up the literals required by
+            all rules to only try the rules that may match each segment.
         uid:
             Identifier of the detector
         """
@@ -115,10 +127,14 @@ class NegationDetector(ContextOperation):
         if rules is None:
             rules = self.load_rules(_PATH_TO_DEFAULT_RULES, encoding="utf-8")
 
+        if engine not in ("per_rule", "multi_rule"):
+            raise ValueError(f"Unsupported engine: {engine}")
+
         self.check_rules_sanity(rules)
 
         self.output_label = output_label
         self.rules = rules
+        self.engine = engine
 
         # pre-compile patterns
         self._non_empty_text_pattern = re.compile(r"[a-z]", flags=re.IGNORECASE)
@@ -141,6 +157,13 @@ class NegationDetector(ContextOperation):
             not r.unicode_sensitive for r in rules
         )
 
+        if self.engine == "multi_rule":
+            self._prefilter = RulesPrefilter(
+                regexps=[rule.regexp for rule in self.rules],
+                flags=[pattern.flags for pattern in self._patterns],
+                unicode_sensitive=[rule.unicode_sensitive for rule in self.rules],
+            )
+
     def run(self, segments: List[Segment]):
         """Add a negation attribute to each segment with a boolean value
         indicating if an hypothesis has been found.
@@ -160,7 +183,7 @@ class NegationDetector(ContextOperation):
                 segment.attrs.add(neg_attr)
 
     def _detect_negation_in_segment(self, segment: Segment) -> Optional[Attribute]:
-        rule_id = self._find_matching_rule(segment.text)
+        rule_id = self._find_matching_rule(segment)
         if rule_id is not None:
             neg_attr = Attribute(
                 label=self.output_label,
@@ -177,17 +200,18 @@ class NegationDetector(ContextOperation):
 
         return neg_attr
 
-    def _find_matching_rule(self, text: str) -> Optional[Union[str, int]]:
+    def _find_matching_rule(self, segment: Segment) -> Optional[Union[str, int]]:
+        text_unicode = segment.text
+
         # skip empty text
-        if self._non_empty_text_pattern.search(text) is None:
+        if self._non_empty_text_pattern.search(text_unicode) is None:
             return None
 
-        text_unicode = text
         text_ascii = None
 
         if self._has_non_unicode_sensitive_rule:
             # If there exists one rule which is not unicode-sensitive
-            text_ascii = unidecode.unidecode(text_unicode)
+            text_ascii = get_ascii_text(segment)
             # Verify that text length is conserved
             if len(text_ascii) != len(
                 text_unicode
@@ -201,8 +225,14 @@ class NegationDetector(ContextOperation):
                 # Fallback on unicode text
                 text_ascii = text_unicode
 
+        if self.engine == "multi_rule":
+            rule_indices = self._prefilter.get_candidates(text_unicode, text_ascii)
+        else:
+            rule_indices = range(len(self.rules))
+
         # try all rules until we have a match
-        for rule_index, rule in enumerate(self.rules):
+        for rule_index in rule_indices:
+            rule = self.rules[rule_index]
             pattern = self._patterns[rule_index]
             exclusion_pattern = self._exclusion_patterns[rule_index]
             text = text_unicode if rule.unicode_sensitive else text_ascii
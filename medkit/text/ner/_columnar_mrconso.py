@@ -0,0 +1,259 @@
+"""
+Columnar copy of a UMLS MRCONSO.RRF file, used by
+:func:`~medkit.text.ner.umls_utils.load_umls` to avoid parsing the whole text
+file each time it is loaded.
+
+Only the columns needed to load UMLS entries are kept, each of them in its own
+binary file: CUIs and terms are stored as UTF-8 bytes with row offsets, LUIs,
+languages and sources are dictionary-encoded as integer codes. Rows can then be
+filtered with numpy, and only the terms of the selected rows are decoded
+(from memory-mapped files).
+
+Arrow/feather files (through pyarrow, required by the `feather-format` package
+of the `umls-coder-normalizer` extra) would provide the same dictionary-encoded
+columns, but :func:`~medkit.text.ner.umls_utils.load_umls` is part of the core
+of medkit and is also used without that extra, so the columns are stored as
+plain numpy files, which only depend on numpy.
+"""
+
+from __future__ import annotations
+
+__all__ = ["convert_mrconso", "ColumnarMRCONSO"]
+
+import contextlib
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from tqdm import tqdm
+
+_FORMAT_VERSION = 1
+_META_FILENAME = "meta.json"
+# number of rows decoded at once
+_BATCH_SIZE = 65536
+# approximate number of chars of MRCONSO lines parsed at once
+_READ_SIZE = 2**23
+
+# dtype of each column file (there are only a few hundreds of languages and
+# sources)
+_COLUMNS = {
+    "cui_offsets": np.int64,
+    "cuis": np.uint8,
+    "term_offsets": np.int64,
+    "terms": np.uint8,
+    "luis": np.int32,
+    "languages": np.int16,
+    "sources": np.int16,
+}
+
+
+def convert_mrconso(
+    mrconso_file: Union[str, Path],
+    dir: Union[str, Path],
+    show_progress: bool = False,
+):
+    """Convert a MRCONSO.RRF file into a columnar copy in `dir`
+
+    Parameters
+    ----------
+    mrconso_file:
+        Path to the UMLS MRCONSO.RRF file
+    dir:
+        Directory in which to write the columnar copy (created if it doesn't
+        exist, previous copy replaced if any)
+    show_progress:
+        Whether to show a progressbar
+    """
+    mrconso_file = Path(mrconso_file)
+    dir = Path(dir)
+    dir.mkdir(parents=True, exist_ok=True)
+    # metadata is written last, so that an incomplete copy is never used
+    meta_file = dir / _META_FILENAME
+    if meta_file.exists():
+        meta_file.unlink()
+
+    stat = mrconso_file.stat()
+    # codes of dictionary-encoded columns, and index of these columns in MRCONSO
+    codes_by_column: Dict[str, Dict[str, int]] = {
+        "luis": {},
+        "languages": {},
+        "sources": {},
+    }
+    column_indices = {"luis": 3, "languages": 1, "sources": 11}
+    nb_rows = 0
+
+    with contextlib.ExitStack() as stack:
+        fp = stack.enter_context(open(mrconso_file, encoding="utf-8"))
+        cuis_writer = stack.enter_context(_StringColumnWriter(dir, "cuis"))
+        terms_writer = stack.enter_context(_StringColumnWriter(dir, "terms"))
+        codes_fps = {
+            name: stack.enter_context(open(dir / f"{name}.bin", mode="wb"))
+            for name in codes_by_column
+        }
+
+        if show_progress:
+            progress_bar = stack.enter_context(
+                tqdm(total=stat.st_size, unit="B", unit_scale=True, unit_divisor=1024)
+            )
+
+        while True:
+            lines = fp.readlines(_READ_SIZE)
+            if not lines:
+                break
+            if show_progress:
+                progress_bar.update(sum(len(line.encode("utf-8")) for line in lines))
+
+            rows = [line.strip().split("|") for line in lines]
+            cuis_writer.write([row[0] for row in rows])
+            terms_writer.write([row[14] for row in rows])
+            for name, codes in codes_by_column.items():
+                column_index = column_indices[name]
+                values = [
+                    codes.setdefault(row[column_index], len(codes)) for row in rows
+                ]
+                np.array(values, dtype=_COLUMNS[name]).tofile(codes_fps[name])
+            nb_rows += len(rows)
+
+    meta = dict(
+        format_version=_FORMAT_VERSION,
+        mrconso_size=stat.st_size,
+        mrconso_mtime_ns=stat.st_mtime_ns,
+        nb_rows=nb_rows,
+        languages=list(codes_by_column["languages"]),
+        sources=list(codes_by_column["sources"]),
+    )
+    tmp_meta_file = dir / (_META_FILENAME + ".tmp")
+    with open(tmp_meta_file, mode="w") as fp:
+        json.dump(meta, fp)
+    os.replace(tmp_meta_file, meta_file)
+
+
+class _StringColumnWriter:
+    """Write strings as UTF-8 bytes, with the end offset of each string (after
+    an initial 0 offset)"""
+
+    def __init__(self, dir: Path, name: str):
+        self._data_fp = open(dir / f"{name}.bin", mode="wb")
+        self._offsets_fp = open(dir / f"{name[:-1]}_offsets.bin", mode="wb")
+        self._offset = 0
+        np.zeros(1, dtype=np.int64).tofile(self._offsets_fp)
+
+    def write(self, strings: List[str]):
+        encoded = [s.encode("utf-8") for s in strings]
+        lengths = np.fromiter((len(e) for e in encoded), np.int64, len(encoded))
+        offsets = self._offset + np.cumsum(lengths)
+        self._data_fp.write(b"".join(encoded))
+        offsets.tofile(self._offsets_fp)
+        if len(offsets):
+            self._offset = int(offsets[-1])
+
+    def __enter__(self) -> _StringColumnWriter:
+        return self
+
+    def __exit__(self, *args):
+        self._data_fp.close()
+        self._offsets_fp.close()
+
+
+class ColumnarMRCONSO:
+    """Columnar copy of a MRCONSO.RRF file, written by :func:`convert_mrconso`"""
+
+    def __init__(self, dir: Union[str, Path]):
+        """
+        Parameters
+        ----------
+        dir:
+            Directory containing the columnar copy
+        """
+        self.dir = Path(dir)
+        with open(self.dir / _META_FILENAME) as fp:
+            meta = json.load(fp)
+        if meta["format_version"] != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported MRCONSO copy format in {self.dir}")
+
+        self.nb_rows: int = meta["nb_rows"]
+        self.languages: List[str] = meta["languages"]
+        self.sources: List[str] = meta["sources"]
+
+    @staticmethod
+    def is_copy_of(dir: Union[str, Path], mrconso_file: Union[str, Path]) -> bool:
+        """Whether `dir` contains a columnar copy of the current version of
+        `mrconso_file`"""
+        meta_file = Path(dir) / _META_FILENAME
+        if not meta_file.exists():
+            return False
+        with open(meta_file) as fp:
+            meta = json.load(fp)
+        stat = Path(mrconso_file).stat()
+        return (
+            meta["format_version"] == _FORMAT_VERSION
+            and meta["mrconso_size"] == stat.st_size
+            and meta["mrconso_mtime_ns"] == stat.st_mtime_ns
+        )
+
+    def iter_entries(
+        self,
+        sources: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[str, str]]:
+        """Iterate over the CUI and term of the rows with one of `sources` and
+        `languages` (all rows if `None`), skipping rows with a LUI already seen,
+        in the order of the MRCONSO file"""
+
+        mask = np.ones(self.nb_rows, dtype=bool)
+        if sources is not None:
+            mask &= self._get_mask("sources", self.sources, sources)
+        if languages is not None:
+            mask &= self._get_mask("languages", self.languages, languages)
+        row_indices = np.flatnonzero(mask)
+
+        # keep first row of each LUI
+        luis = self._read_column("luis")[row_indices]
+        _, first_indices = np.unique(luis, return_index=True)
+        row_indices = row_indices[np.sort(first_indices)]
+
+        cui_offsets = self._read_column("cui_offsets")
+        term_offsets = self._read_column("term_offsets")
+        with _open_bytes(self.dir / "cuis.bin") as cuis, _open_bytes(
+            self.dir / "terms.bin"
+        ) as terms:
+            for start in range(0, len(row_indices), _BATCH_SIZE):
+                batch = row_indices[start : start + _BATCH_SIZE]
+                # read offsets with numpy but slice bytes with python ints
+                cui_starts = cui_offsets[batch].tolist()
+                cui_ends = cui_offsets[batch + 1].tolist()
+                term_starts = term_offsets[batch].tolist()
+                term_ends = term_offsets[batch + 1].tolist()
+                for cui_start, cui_end, term_start, term_end in zip(
+                    cui_starts, cui_ends, term_starts, term_ends
+                ):
+                    yield (
+                        cuis[cui_start:cui_end].decode("utf-8"),
+                        terms[term_start:term_end].decode("utf-8"),
+                    )
+
+    def _get_mask(self, name: str, values: List[str], selected_values: List[str]):
+        codes = [code for code, value in enumerate(values) if value in selected_values]
+        return np.isin(self._read_column(name), codes)
+
+    def _read_column(self, name: str) -> np.ndarray:
+        path = self.dir / f"{name}.bin"
+        dtype = _COLUMNS[name]
+        if path.stat().st_size == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r").view(np.ndarray)
+
+
+@contextlib.contextmanager
+def _open_bytes(path: Path) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Memory-map a file of bytes (empty files can't be memory-mapped)"""
+    if path.stat().st_size == 0:
+        yield b""
+        return
+    with open(path, mode="rb") as fp, mmap.mmap(
+        fp.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        yield data
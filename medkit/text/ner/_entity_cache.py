@@ -0,0 +1,182 @@
+"""
+Cache of entity embeddings and best UMLS matches, used by
+:class:`~medkit.text.ner.umls_coder_normalizer.UMLSCoderNormalizer` to avoid
+re-computing the embeddings of entity texts that were already seen.
+
+Entries are kept in memory in a bounded LRU cache, and optionally in a SQLite
+database so they can be reused by other normalizers (including in other
+programs) using the same pre-computed UMLS embeddings. The database is opened
+in WAL mode, so that readers are not blocked while another connection writes.
+"""
+
+from __future__ import annotations
+
+__all__ = ["EntityCache", "EntityCacheEntry"]
+
+from collections import OrderedDict
+import json
+from pathlib import Path
+import sqlite3
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+# how long to wait for other connections to release their lock on the database
+_SQLITE_TIMEOUT = 30.0
+
+
+class EntityCacheEntry(NamedTuple):
+    """Cached data of an entity term"""
+
+    #: Embedding of the term (float32 vector)
+    embedding: np.ndarray
+    #: Description of the search params with which the matches were found
+    search_key: str
+    #: Indices of the best matches of the term in the UMLS entries
+    match_indices: List[int]
+    #: Similarity scores of the best matches
+    match_scores: List[float]
+
+
+class EntityCache:
+    """LRU cache of entity embeddings and best matches, indexed by entity term,
+    with hit/miss counters"""
+
+    def __init__(self, max_size: int, path: Optional[Union[str, Path]] = None):
+        """
+        Parameters
+        ----------
+        max_size:
+            Maximum number of entries kept in memory
+        path:
+            Path of the SQLite database file in which entries are persisted
+            (created if it doesn't exist). If `None`, entries are only kept in
+            memory.
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be greater or equal to 0")
+
+        self.max_size = max_size
+        self.path = Path(path) if path is not None else None
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+        self._entries: OrderedDict[str, EntityCacheEntry] = OrderedDict()
+        # entries not written to the database yet
+        self._pending_entries: Dict[str, EntityCacheEntry] = {}
+        # database connection, opened on first use
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # connections can't be pickled, a new one is opened when needed
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups for which an entry was found"""
+        nb_lookups = self.nb_hits + self.nb_misses
+        return self.nb_hits / nb_lookups if nb_lookups else 0.0
+
+    def get(self, term: str) -> Optional[EntityCacheEntry]:
+        """Return the entry of `term`, or `None` if it is not cached"""
+        entry = self._entries.get(term)
+        if entry is not None:
+            self._entries.move_to_end(term)
+        else:
+            entry = self._pending_entries.get(term)
+            if entry is None and self.path is not None:
+                entry = self._read_entry(term)
+            if entry is not None:
+                self._add_to_memory(term, entry)
+
+        if entry is None:
+            self.nb_misses += 1
+        else:
+            self.nb_hits += 1
+        return entry
+
+    def put(self, term: str, entry: EntityCacheEntry):
+        """Add or replace the entry of `term`"""
+        self._add_to_memory(term, entry)
+        if self.path is not None:
+            self._pending_entries[term] = entry
+
+    def flush(self):
+        """Write pending entries to the database"""
+        if self.path is None or not self._pending_entries:
+            return
+        rows = (
+            (
+                term,
+                np.asarray(entry.embedding, dtype=np.float32).tobytes(),
+                entry.search_key,
+                json.dumps(entry.match_indices),
+                json.dumps(entry.match_scores),
+            )
+            for term, entry in self._pending_entries.items()
+        )
+        conn = self._get_conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", rows
+            )
+        self._pending_entries.clear()
+
+    def close(self):
+        """Write pending entries and close the database"""
+        self.flush()
+        if self._conn is None:
+            return
+        self._conn.close()
+        self._conn = None
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return the hit/miss counters and the hit rate"""
+        return dict(
+            nb_hits=self.nb_hits,
+            nb_misses=self.nb_misses,
+            hit_rate=self.hit_rate,
+        )
+
+    def _add_to_memory(self, term: str, entry: EntityCacheEntry):
+        if self.max_size == 0:
+            return
+        self._entries[term] = entry
+        self._entries.move_to_end(term)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            assert self.path is not None
+            self._conn = sqlite3.connect(str(self.path), timeout=_SQLITE_TIMEOUT)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries (term TEXT PRIMARY KEY,"
+                    " embedding BLOB, search_key TEXT, match_indices TEXT,"
+                    " match_scores TEXT)"
+                )
+        return self._conn
+
+    def _read_entry(self, term: str) -> Optional[EntityCacheEntry]:
+        row = (
+            self._get_conn()
+            .execute(
+                "SELECT embedding, search_key, match_indices, match_scores FROM entries"
+                " WHERE term = ?",
+                (term,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        embedding, search_key, match_indices, match_scores = row
+        return EntityCacheEntry(
+            embedding=np.frombuffer(embedding, dtype=np.float32),
+            search_key=search_key,
+            match_indices=json.loads(match_indices),
+            match_scores=json.loads(match_scores),
+        )
@@ -0,0 +1,338 @@
+"""
+Inverted file (IVF) index for approximate nearest neighbour search by inner
+product, used by :class:`~medkit.text.ner.umls_coder_normalizer.UMLSCoderNormalizer`.
+
+Embeddings are grouped in lists by k-means clustering. When searching for the
+nearest neighbours of a query, only the embeddings in the lists of the closest
+centroids are compared to the query (with exact similarities), instead of all
+embeddings. The index keeps a copy of the embeddings ordered by list (with the
+same dtype as the indexed embeddings), so that the embeddings of each list are
+contiguous and can be memory-mapped.
+"""
+
+from __future__ import annotations
+
+__all__ = ["IVFIndex"]
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from medkit.text.ner._umls_embeddings_file import SUPPORTED_DTYPES, quantize_int8
+
+# number of embeddings processed at once when assigning them to lists
+_ASSIGNMENT_BATCH_SIZE = 65536
+# number of embeddings per list used to train k-means
+_NB_TRAINING_EMBEDDINGS_PER_LIST = 64
+_LISTS_FILENAME = "ivf_lists.npz"
+_EMBEDDINGS_FILENAME = "ivf_embeddings.npy"
+
+
+class IVFIndex:
+    """Inverted file index over a matrix of embeddings"""
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        list_indices: np.ndarray,
+        list_embeddings: np.ndarray,
+        list_scales: Optional[np.ndarray] = None,
+    ):
+        """
+        Parameters
+        ----------
+        centroids:
+            Centroid of each list, of shape (nb_lists, dim)
+        list_offsets:
+            Start of each list in `list_indices` (plus end of last list)
+        list_indices:
+            Indices of the embeddings in each list, concatenated
+        list_embeddings:
+            Embeddings corresponding to `list_indices`
+        list_scales:
+            Scale of each row of `list_embeddings`, if they are quantized to
+            int8
+        """
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_indices = list_indices
+        self.list_embeddings = list_embeddings
+        self.list_scales = list_scales
+        # file from which list_embeddings were memory-mapped, if any
+        self._embeddings_path: Optional[Path] = None
+
+    @property
+    def nb_lists(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def nb_embeddings(self) -> int:
+        return len(self.list_indices)
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: Sequence[np.ndarray],
+        dir: Union[str, Path],
+        nb_lists: Optional[int] = None,
+        nb_iterations: int = 10,
+        seed: int = 0,
+        block_size: int = _ASSIGNMENT_BATCH_SIZE,
+    ) -> IVFIndex:
+        """Build an index by clustering `embeddings` and save it in `dir`
+
+        `embeddings` are only read by blocks of contiguous rows, and the
+        embeddings ordered by list are written block by block to a
+        memory-mapped file, so that they are never all loaded in memory.
+
+        Parameters
+        ----------
+        embeddings:
+            Embeddings to index, of shape (nb_embeddings, dim). Can be any
+            object supporting `len()` and returning float32 rows when sliced
+            (ex: a numpy array or an
+            :class:`~medkit.text.ner._umls_embeddings_file.UMLSEmbeddingsMatrix`).
+            The embeddings of the index are stored with the same `dtype` as
+            `embeddings` (float32 if they have no `dtype`).
+        dir:
+            Directory in which to save the index
+        nb_lists:
+            Number of lists (clusters). Defaults to the square root of the
+            number of embeddings.
+        nb_iterations:
+            Number of k-means iterations
+        seed:
+            Seed of the random generator used to sample training embeddings and
+            initial centroids
+        block_size:
+            Number of embeddings read at once
+
+        Returns
+        -------
+        IVFIndex
+            Index of `embeddings`, with memory-mapped embeddings
+        """
+        nb_embeddings = len(embeddings)
+        if nb_embeddings == 0:
+            raise ValueError("Can't build an index without embeddings")
+        if nb_lists is None:
+            nb_lists = max(1, round(np.sqrt(nb_embeddings)))
+        nb_lists = min(nb_lists, nb_embeddings)
+        dtype = np.dtype(getattr(embeddings, "dtype", np.float32))
+        if dtype.name not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embeddings dtype: {dtype}")
+
+        # train k-means on a sample of embeddings
+        rng = np.random.default_rng(seed)
+        nb_training = min(nb_embeddings, nb_lists * _NB_TRAINING_EMBEDDINGS_PER_LIST)
+        training_indices = np.sort(
+            rng.choice(nb_embeddings, size=nb_training, replace=False)
+        )
+        training_blocks = []
+        for start, block in _iter_blocks(embeddings, block_size):
+            first, last = np.searchsorted(training_indices, [start, start + len(block)])
+            training_blocks.append(block[training_indices[first:last] - start])
+        training_embeddings = np.concatenate(training_blocks)
+        centroids = _train_kmeans(training_embeddings, nb_lists, nb_iterations, rng)
+
+        # assign all embeddings to lists
+        assignments = np.concatenate(
+            [
+                _assign(block, centroids)
+                for _, block in _iter_blocks(embeddings, block_size)
+            ]
+        )
+        # stable sort keeps indices sorted in each list (for more local reads)
+        list_indices = np.argsort(assignments, kind="stable")
+        list_sizes = np.bincount(assignments, minlength=nb_lists)
+        list_offsets = np.concatenate(([0], np.cumsum(list_sizes)))
+
+        dir = Path(dir)
+        dir.mkdir(parents=True, exist_ok=True)
+        # lists are written last, so that an interrupted build leaves no index
+        lists_file = dir / _LISTS_FILENAME
+        if lists_file.exists():
+            lists_file.unlink()
+
+        # write embeddings ordered by list, by scattering each block of
+        # embeddings to the positions of its rows
+        positions = np.empty(nb_embeddings, dtype=np.int64)
+        positions[list_indices] = np.arange(nb_embeddings)
+        list_embeddings = np.lib.format.open_memmap(
+            dir / _EMBEDDINGS_FILENAME,
+            mode="w+",
+            dtype=dtype,
+            shape=(nb_embeddings, training_embeddings.shape[1]),
+        )
+        list_scales = np.empty(nb_embeddings, np.float32) if dtype == np.int8 else None
+        for start, block in _iter_blocks(embeddings, block_size):
+            block_positions = positions[start : start + len(block)]
+            if list_scales is not None:
+                block, list_scales[block_positions] = quantize_int8(block)
+            list_embeddings[block_positions] = block
+        list_embeddings.flush()
+        del list_embeddings
+
+        lists = dict(
+            centroids=centroids, list_offsets=list_offsets, list_indices=list_indices
+        )
+        if list_scales is not None:
+            lists.update(list_scales=list_scales)
+        with open(lists_file, mode="wb") as fp:
+            np.savez(fp, **lists)
+        return cls.load(dir)
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nb_probes: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find approximate nearest neighbours of `queries` in the indexed
+        embeddings
+
+        Parameters
+        ----------
+        queries:
+            Query embeddings, of shape (nb_queries, dim)
+        k:
+            Number of neighbours to return for each query
+        nb_probes:
+            Number of lists in which to look for neighbours. More lists are
+            probed if they don't contain at least `k` embeddings.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Similarity scores and indices of the neighbours of each query, of
+            shape (nb_queries, k), by decreasing similarity
+        """
+        k = min(k, self.nb_embeddings)
+        queries = np.asarray(queries, np.float32)
+        list_sizes = np.diff(self.list_offsets)
+
+        # lists to probe for each query, by decreasing centroid similarity
+        probe_order = np.argsort(-(queries @ self.centroids.T), axis=1)
+        probed_lists_by_query = []
+        query_indices_by_list: Dict[int, List[int]] = {}
+        for query_index, lists in enumerate(probe_order):
+            # probe more lists until they contain enough embeddings
+            nb_lists = min(nb_probes, self.nb_lists)
+            cumulative_sizes = np.cumsum(list_sizes[lists])
+            nb_lists = max(nb_lists, int(np.searchsorted(cumulative_sizes, k)) + 1)
+            probed_lists = lists[:nb_lists]
+            probed_lists_by_query.append(probed_lists)
+            for list_index in probed_lists:
+                query_indices_by_list.setdefault(int(list_index), []).append(
+                    query_index
+                )
+
+        # exact similarities with the embeddings of each probed list, computed
+        # for all queries probing it
+        scores_by_list_and_query = {}
+        for list_index, query_indices in query_indices_by_list.items():
+            start, end = self.list_offsets[list_index : list_index + 2]
+            list_scores = queries[query_indices] @ self.list_embeddings[start:end].T
+            if self.list_scales is not None:
+                list_scores *= self.list_scales[start:end]
+            for query_index, scores in zip(query_indices, list_scores):
+                scores_by_list_and_query[list_index, query_index] = scores
+
+        all_scores = np.empty((len(queries), k), dtype=np.float32)
+        all_indices = np.empty((len(queries), k), dtype=np.int64)
+        for query_index, probed_lists in enumerate(probed_lists_by_query):
+            scores = np.concatenate(
+                [scores_by_list_and_query[int(i), query_index] for i in probed_lists]
+            )
+            positions = np.concatenate(
+                [
+                    np.arange(self.list_offsets[i], self.list_offsets[i + 1])
+                    for i in probed_lists
+                ]
+            )
+            best = np.argpartition(-scores, k - 1)[:k]
+            # sort by decreasing score, then increasing index (for determinism)
+            indices = self.list_indices[positions[best]]
+            order = np.lexsort((indices, -scores[best]))
+            all_scores[query_index] = scores[best][order]
+            all_indices[query_index] = indices[order]
+        return all_scores, all_indices
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # memory-mapped embeddings are mapped again when unpickling rather
+        # than copied in the pickle
+        if self._embeddings_path is not None:
+            state["list_embeddings"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        if self._embeddings_path is not None:
+            self.list_embeddings = np.load(self._embeddings_path, mmap_mode="r")
+
+    @classmethod
+    def load(cls, dir: Union[str, Path], mmap: bool = True) -> IVFIndex:
+        """Load an index built in `dir` with :meth:`build`. If `mmap` is True,
+        the embeddings are memory-mapped rather than read in memory."""
+        dir = Path(dir)
+        with np.load(dir / _LISTS_FILENAME) as data:
+            centroids = data["centroids"]
+            list_offsets = data["list_offsets"]
+            list_indices = data["list_indices"]
+            list_scales = data["list_scales"] if "list_scales" in data.files else None
+        embeddings_path = dir / _EMBEDDINGS_FILENAME
+        list_embeddings = np.load(embeddings_path, mmap_mode="r" if mmap else None)
+        index = cls(centroids, list_offsets, list_indices, list_embeddings, list_scales)
+        if mmap:
+            index._embeddings_path = embeddings_path
+        return index
+
+    @staticmethod
+    def exists(dir: Union[str, Path]) -> bool:
+        """Whether an index was saved in `dir`"""
+        dir = Path(dir)
+        return (dir / _LISTS_FILENAME).exists() and (
+            dir / _EMBEDDINGS_FILENAME
+        ).exists()
+
+
+def _iter_blocks(
+    embeddings: Sequence[np.ndarray], block_size: int
+) -> Iterator[Tuple[int, np.ndarray]]:
+    for start in range(0, len(embeddings), block_size):
+        yield start, np.asarray(embeddings[start : start + block_size], np.float32)
+
+
+def _train_kmeans(
+    embeddings: np.ndarray,
+    nb_clusters: int,
+    nb_iterations: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Spherical k-means (clusters are assigned by inner product with
+    normalized centroids)"""
+
+    centroids = embeddings[rng.choice(len(embeddings), nb_clusters, replace=False)]
+    centroids = _normalize(centroids)
+    for _ in range(nb_iterations):
+        assignments = _assign(embeddings, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, embeddings)
+        counts = np.bincount(assignments, minlength=nb_clusters)
+        # reinitialize empty clusters with random embeddings
+        empty = counts == 0
+        sums[empty] = embeddings[rng.choice(len(embeddings), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def _assign(embeddings: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.argmax(embeddings @ centroids.T, axis=1)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
@@ -0,0 +1,174 @@
+"""
+Single-file storage of pre-computed UMLS embeddings, used by
+:class:`~medkit.text.ner.umls_coder_normalizer.UMLSCoderNormalizer`.
+
+The file starts with a fixed-size JSON header (describing the embeddings and
+the params used to compute them), followed by the embeddings matrix, possibly
+quantized to float16 or int8 (with one scale per row, stored after the
+matrix). The matrix is memory-mapped when loaded, so it is not copied in
+memory and can be shared by several processes through the page cache.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "UMLSEmbeddingsWriter",
+    "UMLSEmbeddingsMatrix",
+    "SUPPORTED_DTYPES",
+    "quantize_int8",
+]
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+_MAGIC = b"MEDKITUMLSEMB"
+_HEADER_SIZE = 4096
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize each row of `embeddings` to int8, with its own scale
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Quantized rows and their scales (rows are approximately equal to
+        `data * scales[:, None]`)
+    """
+    max_values = np.max(np.abs(embeddings), axis=1)
+    scales = np.where(max_values > 0, max_values / 127, 1.0).astype(np.float32)
+    data = np.round(embeddings / scales[:, None]).astype(np.int8)
+    return data, scales
+
+
+class UMLSEmbeddingsWriter:
+    """Write embeddings to a file chunk by chunk"""
+
+    def __init__(self, path: Union[str, Path], dtype: str, metadata: Dict[str, Any]):
+        """
+        Parameters
+        ----------
+        path:
+            Path of the file to write
+        dtype:
+            Type of the stored embeddings (`"float32"`, `"float16"` or `"int8"`)
+        metadata:
+            JSON-serializable metadata to store in the header of the file
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embeddings dtype: {dtype}")
+
+        self.path = Path(path)
+        self.dtype = dtype
+        self.metadata = metadata
+        self.nb_rows = 0
+        self.dim: Optional[int] = None
+        self._scales: List[np.ndarray] = []
+        self._file = open(self.path, mode="wb")
+        # header is written once all embeddings are known
+        self._file.write(b"\0" * _HEADER_SIZE)
+
+    def write(self, embeddings: np.ndarray):
+        """Append `embeddings` (float32 matrix) to the file"""
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+        assert embeddings.shape[1] == self.dim
+
+        if self.dtype == "int8":
+            data, scales = quantize_int8(embeddings)
+            self._scales.append(scales)
+        else:
+            data = embeddings.astype(self.dtype)
+        self._file.write(np.ascontiguousarray(data).tobytes())
+        self.nb_rows += len(embeddings)
+
+    def close(self):
+        """Write the header (and scales) and close the file"""
+        scales_offset = None
+        if self.dtype == "int8":
+            scales_offset = self._file.tell()
+            for scales in self._scales:
+                self._file.write(scales.tobytes())
+
+        header = dict(
+            nb_rows=self.nb_rows,
+            dim=self.dim if self.dim is not None else 0,
+            dtype=self.dtype,
+            scales_offset=scales_offset,
+            metadata=self.metadata,
+        )
+        header_bytes = _MAGIC + json.dumps(header).encode("utf-8")
+        if len(header_bytes) > _HEADER_SIZE:
+            raise ValueError("Embeddings metadata is too big")
+        self._file.seek(0)
+        self._file.write(header_bytes)
+        self._file.close()
+
+
+class UMLSEmbeddingsMatrix:
+    """Memory-mapped embeddings matrix read from a file written by
+    :class:`UMLSEmbeddingsWriter`. Rows are returned as float32 arrays."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Parameters
+        ----------
+        path:
+            Path of the file to read
+        """
+        self.path = Path(path)
+        self._open()
+
+    def _open(self):
+        with open(self.path, mode="rb") as fp:
+            header_bytes = fp.read(_HEADER_SIZE)
+        if not header_bytes.startswith(_MAGIC):
+            raise ValueError(f"{self.path} is not an UMLS embeddings file")
+        header_bytes = header_bytes[len(_MAGIC) :].rstrip(b"\0")
+        header = json.loads(header_bytes.decode("utf-8"))
+
+        self.nb_rows: int = header["nb_rows"]
+        self.dim: int = header["dim"]
+        self.dtype: str = header["dtype"]
+        self.metadata: Dict[str, Any] = header["metadata"]
+
+        self._data = np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="r",
+            offset=_HEADER_SIZE,
+            shape=(self.nb_rows, self.dim),
+        )
+        if header["scales_offset"] is not None:
+            self._scales = np.memmap(
+                self.path,
+                dtype=np.float32,
+                mode="r",
+                offset=header["scales_offset"],
+                shape=(self.nb_rows,),
+            )
+        else:
+            self._scales = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # only pickle the path, memory-mapped data would otherwise be copied
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.path = state["path"]
+        self._open()
+
+    def __len__(self) -> int:
+        return self.nb_rows
+
+    def __getitem__(self, key) -> np.ndarray:
+        """Return the rows selected by `key` (index, slice or array of indices)"""
+        # always copy rows, so they are writable (unlike memory-mapped data)
+        rows = np.array(self._data[key], dtype=np.float32)
+        if self._scales is not None:
+            rows *= np.asarray(self._scales[key])[..., None]
+        return rows
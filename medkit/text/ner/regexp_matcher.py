@@ -12,9 +12,8 @@ import logging
 from pathlib import Path
 import re
 from typing import Any, Iterator, List, Optional, Union
-from typing_extensions import TypedDict
+from typing_extensions import Literal, TypedDict
 
-import unidecode
 import yaml
 
 from medkit.core.text import (
@@ -24,6 +23,8 @@ from medkit.core.text import (
     EntityNormAttribute,
     span_utils,
 )
+from medkit.core.text._regexp_prefilter import RulesPrefilter
+from medkit.core.text.transliteration import get_ascii_text
 from medkit.text.ner.umls_norm_attribute import UMLSNormAttribute
 
 
@@ -60,10 +61,15 @@ class RegexpMatcherRule:
         An optional exclusion pattern. Note that this exclusion pattern will
         executed on the whole input annotation, so when relying on `exclusion_regexp`
         make sure the input annotations passed to `RegexpMatcher` are "local"-enough
-        (sentences or syntagmes) rather than the whole text or paragraphs
+        (sentences or syntagmes) rather than the whole text or paragraphs,
+        or use `exclusion_window`
     normalization:
         Optional list of normalization attributes that should be attached to
         the entities created
+    exclusion_window:
+        If set, `exclusion_regexp` is only searched in a window around each match,
+        extending the match range by `exclusion_window` characters on each side,
+        rather than in the whole input annotation
     """
 
     regexp: str
@@ -77,8 +83,12 @@ class RegexpMatcherRule:
     normalizations: List[RegexpMatcherNormalization] = dataclasses.field(
         default_factory=list
     )
+    exclusion_window: Optional[int] = None
 
     def __post_init__(self):
+        assert (
+            self.exclusion_window is None or self.exclusion_window >= 0
+        ), "RegexpMatcherRule exclusion_window must be greater or equal to 0"
         assert self.unicode_sensitive or (
             self.regexp.isascii()
             and (self.exclusion_regexp is None or self.exclusion_regexp.isascii())
@@ -138,12 +148,19 @@ class RegexpMatcher(NEROperation):
     (e.g., `n°` -> `number`). So, if the text lengths are different, we fall back on
     initial unicode text for detection even if rule is not unicode-sensitive.
     In this case, a warning is logged for recommending to pre-process data.
+
+    With the "multi_rule" engine, all rules are compiled together into a
+    prefilter looking up, in one go, the literal strings that each rule requires
+    (ex: "diab" for "diab[eé]te"). Only the rules that may match a segment are
+    then executed on it, which gives exactly the same entities as the
+    "per_rule" engine but is much faster with large sets of rules.
     """
 
     def __init__(
         self,
         rules: Optional[List[RegexpMatcherRule]] = None,
         attrs_to_copy: Optional[List[str]] = None,
+        engine: Literal["per_rule", "multi_rule"] = "per_rule",
         name: Optional[str] = None,
         uid: Optional[str] = None,
     ):
@@ -159,6 +176,10 @@ class RegexpMatcher(NEROperation):
             Labels of the attributes that should be copied from the source segment
             to the created entity. Useful for propagating context attributes
             (negation, antecendent, etc)
+        engine:
+            Engine used to run the rules. "per_rule" runs every rule on every
+            segment. "multi_rule" first looks up the literals required by all rules
+            to only run the rules that may match each segment.
         name:
             Name describing the matcher (defaults to the class name)
         uid:
@@ -174,10 +195,14 @@ class RegexpMatcher(NEROperation):
         if attrs_to_copy is None:
             attrs_to_copy = []
 
+        if engine not in ("per_rule", "multi_rule"):
+            raise ValueError(f"Unsupported engine: {engine}")
+
         self.check_rules_sanity(rules)
 
         self.rules = rules
         self.attrs_to_copy = attrs_to_copy
+        self.engine = engine
 
         # pre-compile patterns
         self._patterns = [
@@ -196,6 +221,13 @@ class RegexpMatcher(NEROperation):
             not r.unicode_sensitive for r in rules
         )
 
+        if self.engine == "multi_rule":
+            self._prefilter = RulesPrefilter(
+                regexps=[rule.regexp for rule in self.rules],
+                flags=[pattern.flags for pattern in self._patterns],
+                unicode_sensitive=[rule.unicode_sensitive for rule in self.rules],
+            )
+
     def run(self, segments: List[Segment]) -> List[Entity]:
         """
         Return entities (with optional normalization attributes) matched in `segments`
@@ -223,7 +255,7 @@ class RegexpMatcher(NEROperation):
 
         if self._has_non_unicode_sensitive_rule:
             # If there exists one rule which is not unicode-sensitive
-            text_ascii = unidecode.unidecode(segment.text)
+            text_ascii = get_ascii_text(segment)
             # Verify that text length is conserved
             if len(text_ascii) != len(
                 text_unicode
@@ -237,7 +269,12 @@ class RegexpMatcher(NEROperation):
                 # Fallback on unicode text
                 text_ascii = text_unicode
 
-        for rule_index in range(len(self.rules)):
+        if self.engine == "multi_rule":
+            rule_indices = self._prefilter.get_candidates(text_unicode, text_ascii)
+        else:
+            rule_indices = range(len(self.rules))
+
+        for rule_index in rule_indices:
             yield from self._find_matches_in_segment_for_rule(
                 rule_index, segment, text_ascii
             )
@@ -251,17 +288,31 @@ class RegexpMatcher(NEROperation):
 
         text_to_match = segment.text if rule.unicode_sensitive else text_ascii
 
+        # when applied to the whole segment, the result of exclusion_pattern
+        # doesn't depend on the match so it is only computed once (and only if
+        # there is a match)
+        is_excluded_in_segment = None
+
         for match in pattern.finditer(text_to_match):
-            # note that we apply exclusion_pattern to the whole segment,
-            # so we might have a match in a part of the text unrelated to the current
-            # match
-            # we could check if we have any exclude match overlapping with
-            # the current match but that wouldn't work for all cases
-            if (
-                exclusion_pattern is not None
-                and exclusion_pattern.search(text_to_match) is not None
-            ):
-                continue
+            if exclusion_pattern is not None:
+                if rule.exclusion_window is not None:
+                    # only look for exclusions close to the current match
+                    start = max(0, match.start() - rule.exclusion_window)
+                    end = match.end() + rule.exclusion_window
+                    if exclusion_pattern.search(text_to_match, start, end) is not None:
+                        continue
+                else:
+                    # note that we apply exclusion_pattern to the whole segment,
+                    # so we might have a match in a part of the text unrelated to
+                    # the current match
+                    # we could check if we have any exclude match overlapping with
+                    # the current match but that wouldn't work for all cases
+                    if is_excluded_in_segment is None:
+                        is_excluded_in_segment = (
+                            exclusion_pattern.search(text_to_match) is not None
+                        )
+                    if is_excluded_in_segment:
+                        return
 
             # extract raw span list from regex match range
             text, spans = span_utils.extract(
@@ -5,12 +5,18 @@ To install them, use `pip install medkit-lib[umls-coder-normalizer]`.
 
 __all__ = ["UMLSCoderNormalizer"]
 
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+import multiprocessing
+import os
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 from typing_extensions import Literal
 from pathlib import Path
+import shutil
+import time
 
+import numpy as np
 import pandas as pd
 import torch
+from tqdm import tqdm
 import transformers
 from transformers import PreTrainedModel, PreTrainedTokenizer, FeatureExtractionPipeline
 import yaml
@@ -18,6 +24,13 @@ import yaml
 from medkit.core import Operation
 from medkit.core.text import Entity
 import medkit.core.utils
+from medkit.text.ner._entity_cache import EntityCache, EntityCacheEntry
+from medkit.text.ner._ivf_index import IVFIndex
+from medkit.text.ner._umls_embeddings_file import (
+    SUPPORTED_DTYPES,
+    UMLSEmbeddingsMatrix,
+    UMLSEmbeddingsWriter,
+)
 from medkit.text.ner.umls_norm_attribute import UMLSNormAttribute
 from medkit.text.ner.umls_utils import (
     load_umls,
@@ -27,9 +40,16 @@ from medkit.text.ner.umls_utils import (
 
 
 _PARAMS_FILENAME = "params.yml"
+# params of an embeddings build in progress (removed once it is complete)
+_BUILD_PARAMS_FILENAME = "build_params.yml"
 _TERMS_FILENAME = "terms.feather"
 _UMLS_EMBEDDINGS_CHUNK_SIZE = 65536
 _UMLS_EMBEDDINGS_FILE_EXT = ".pt"
+_UMLS_EMBEDDINGS_MATRIX_FILENAME = "embeddings.bin"
+# checkpoints of embeddings chunks, before they are written to the matrix file
+_UMLS_EMBEDDINGS_CHUNKS_DIRNAME = "embeddings_chunks"
+_IVF_INDEX_DIRNAME = "ivf_index"
+_ENTITY_CACHE_FILENAME = "entity_cache.db"
 
 
 class _UMLSEmbeddingsParams(NamedTuple):
@@ -40,6 +60,8 @@ class _UMLSEmbeddingsParams(NamedTuple):
     normalize_embeddings: bool
     lowercase: bool
     normalize_unicode: bool
+    # None for embeddings stored in torch chunk files
+    embeddings_dtype: Optional[Literal["float32", "float16", "int8"]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return dict(
@@ -50,6 +72,7 @@ class _UMLSEmbeddingsParams(NamedTuple):
             normalize_embeddings=self.normalize_embeddings,
             lowercase=self.lowercase,
             normalize_unicode=self.normalize_unicode,
+            embeddings_dtype=self.embeddings_dtype,
         )
 
 
@@ -66,11 +89,30 @@ class UMLSCoderNormalizer(Operation):
     the embeddings of all umls terms are pre-computed (this can take a very long time)
     and stored in `embeddings_cache_dir`, so they can be reused next time.
 
+    The pre-computation is checkpointed after each chunk of embeddings: if it is
+    interrupted, it is resumed from the last complete chunk by the next
+    instantiation with the same params. It can be sped up on CPU-only machines by
+    computing chunks in several worker processes (cf `nb_build_workers`).
+
     If another `MRCONSO.RRF` file is used, or if a parameter impacting the computation
     of embeddings (`model`, `summary_method`, etc) is changed, then another `embeddings_cache_dir`
     must be used, or `embeddings_cache_dir` must be deleted so it can be created properly.
 
-    If the umls embeddings are too big to be held in memory, use `nb_umls_embeddings_chunks`.
+    If the umls embeddings are too big to be held in memory, use `nb_umls_embeddings_chunks`,
+    or `embeddings_dtype` to store them in a single memory-mapped file (possibly
+    quantized), which is not loaded in memory and is shared through the page cache
+    by all normalizers using it, including in other processes.
+
+    By default, the embedding of each entity is compared to the embeddings of
+    all UMLS terms. With `search_engine="ivf"`, an approximate nearest neighbour
+    index is used instead: UMLS embeddings are clustered (the first time, the
+    index is then stored in `embeddings_cache_dir`) and each entity is only
+    compared to the embeddings of the clusters closest to it. This is much
+    faster with large UMLS subsets, but a few best matches may be missed.
+
+    Entity texts often recur across documents. With `entity_cache_size` (or
+    `persist_entity_cache`), the embeddings and best matches of entity texts
+    are cached, so that each distinct text is only embedded and searched once.
     """
 
     def __init__(
@@ -88,6 +130,13 @@ class UMLSCoderNormalizer(Operation):
         device: int = -1,
         batch_size: int = 128,
         nb_umls_embeddings_chunks: Optional[int] = None,
+        embeddings_dtype: Optional[Literal["float32", "float16", "int8"]] = None,
+        search_engine: Literal["exact", "ivf"] = "exact",
+        ivf_nb_probes: int = 16,
+        entity_cache_size: int = 0,
+        persist_entity_cache: bool = False,
+        nb_build_workers: int = 1,
+        umls_columnar_cache_dir: Optional[Union[str, Path]] = None,
         hf_cache_dir: Optional[Union[str, Path]] = None,
         name: Optional[str] = None,
         uid: Optional[str] = None,
@@ -140,6 +189,43 @@ class UMLSCoderNormalizer(Operation):
             for each group.
             Use this when umls embeddings are too big to be fully loaded in memory.
             The higher this value, the more memory needed.
+        embeddings_dtype:
+            If set, pre-computed umls embeddings are stored in a single
+            memory-mapped file instead of torch files, with this type.
+            `"float16"` and `"int8"` (with one scale per embedding) divide the size
+            of the embeddings by 2 and 4, with a small loss of precision on
+            similarities. Similarities are then computed by groups of
+            `nb_umls_embeddings_chunks` (or 1) chunks read from the file.
+        search_engine:
+            How to find the UMLS embeddings most similar to entity embeddings.
+            `"exact"` computes similarities with all UMLS embeddings, `"ivf"`
+            uses an approximate nearest neighbour index, with its own
+            memory-mapped copy of the UMLS embeddings (which are then not
+            loaded in memory). When building the index, UMLS embeddings are
+            read by groups of `nb_umls_embeddings_chunks` (or 1) chunks.
+        ivf_nb_probes:
+            Number of clusters of UMLS embeddings compared to each entity with
+            the `"ivf"` search engine. The higher this value, the slower and
+            the more accurate the search.
+        entity_cache_size:
+            Maximum number of entity texts for which embeddings and best
+            matches are kept in memory. If `0`, no entity is kept in memory.
+        persist_entity_cache:
+            Whether to also store the embeddings and best matches of entity
+            texts in a database in `embeddings_cache_dir`, so they can be reused
+            by other normalizers using the same UMLS embeddings.
+        nb_build_workers:
+            Number of worker processes in which to pre-compute the embeddings of
+            UMLS terms, when they are not in `embeddings_cache_dir` yet. Each
+            worker loads its own copy of the model on the CPU (whatever
+            `device`), and the computing threads used by torch are evenly
+            shared by the workers.
+        umls_columnar_cache_dir:
+            Directory where to store a columnar copy of `umls_mrconso_file`,
+            from which UMLS terms are loaded faster when pre-computing embeddings
+            (cf :func:`~medkit.text.ner.umls_utils.load_umls`). Useful when
+            several normalizers with different params use the same
+            `MRCONSO.RRF` file.
         name:
             Name describing the normalizer (defaults to the class name).
         uid:
@@ -150,6 +236,15 @@ class UMLSCoderNormalizer(Operation):
         init_args.pop("self")
         super().__init__(**init_args)
 
+        if search_engine not in ("exact", "ivf"):
+            raise ValueError(f"Unsupported search engine: {search_engine}")
+        if embeddings_dtype is not None and embeddings_dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embeddings dtype: {embeddings_dtype}")
+        if entity_cache_size < 0:
+            raise ValueError("entity_cache_size must be greater or equal to 0")
+        if nb_build_workers < 1:
+            raise ValueError("nb_build_workers must be greater or equal to 1")
+
         self.umls_mrconso_file = Path(umls_mrconso_file)
         self.embeddings_cache_dir = Path(embeddings_cache_dir)
         self.language = language
@@ -162,36 +257,73 @@ class UMLSCoderNormalizer(Operation):
         self.max_nb_matches = max_nb_matches
         self.device = device
         self.nb_umls_embeddings_chunks = nb_umls_embeddings_chunks
-
-        self._pipeline: _EmbeddingsPipeline = transformers.pipeline(
-            "feature-extraction",
+        self.embeddings_dtype = embeddings_dtype
+        self.search_engine = search_engine
+        self.ivf_nb_probes = ivf_nb_probes
+        self.entity_cache_size = entity_cache_size
+        self.persist_entity_cache = persist_entity_cache
+        self.nb_build_workers = nb_build_workers
+        self.umls_columnar_cache_dir = umls_columnar_cache_dir
+
+        # kept to create the pipelines of build worker processes
+        self._pipeline_args = dict(
             model=self.model,
-            pipeline_class=_EmbeddingsPipeline,
             summary_method=summary_method,
             normalize=normalize_embeddings,
-            device=device,
             batch_size=batch_size,
-            model_kwargs={"cache_dir": hf_cache_dir},
+            hf_cache_dir=hf_cache_dir,
         )
+        # created by _build_umls_embeddings() only if embeddings are computed
+        # in this process, to avoid loading the model while workers use it
+        self._pipeline: Optional[_EmbeddingsPipeline] = None
 
         # guess UMLS version
         self._umls_version = guess_umls_version(umls_mrconso_file)
 
         # pre-compute embeddings of UMLS terms if necessary
         self._build_umls_embeddings()
+        if self._pipeline is None:
+            self._pipeline = _create_pipeline(device=device, **self._pipeline_args)
 
-        # preload all pre-computed UMLS embeddings if nb_umls_embeddings_chunks not set
-        if self.nb_umls_embeddings_chunks is None:
+        # load corresponding UMLS terms and associated CUIs
+        umls_terms_file = self.embeddings_cache_dir / _TERMS_FILENAME
+        self._umls_entries = pd.read_feather(umls_terms_file)
+
+        self._umls_embeddings = None
+        self._umls_matrix = None
+        self._ivf_index = None
+        if self.embeddings_dtype is not None:
+            # memory-map embeddings (nothing is read yet)
+            self._umls_matrix = UMLSEmbeddingsMatrix(
+                self.embeddings_cache_dir / _UMLS_EMBEDDINGS_MATRIX_FILENAME
+            )
+        if self.search_engine == "ivf":
+            self._ivf_index = self._load_ivf_index()
+        elif self._umls_matrix is None and self.nb_umls_embeddings_chunks is None:
+            # preload all pre-computed UMLS embeddings
             umls_embeddings_files = sorted(
                 self.embeddings_cache_dir.glob(f"*{_UMLS_EMBEDDINGS_FILE_EXT}")
             )
             self._umls_embeddings = self._load_umls_embeddings(umls_embeddings_files)
+
+        if self.entity_cache_size > 0 or self.persist_entity_cache:
+            entity_cache_file = (
+                self.embeddings_cache_dir / _ENTITY_CACHE_FILENAME
+                if self.persist_entity_cache
+                else None
+            )
+            self._entity_cache = EntityCache(self.entity_cache_size, entity_cache_file)
         else:
-            self._umls_embeddings = None
+            self._entity_cache = None
 
-        # load corresponding UMLS terms and associated CUIs
-        umls_terms_file = self.embeddings_cache_dir / _TERMS_FILENAME
-        self._umls_entries = pd.read_feather(umls_terms_file)
+    @property
+    def entity_cache_stats(self) -> Optional[Dict[str, Union[int, float]]]:
+        """Number of entity texts found (`"nb_hits"`) and not found
+        (`"nb_misses"`) in the entity cache, and ratio of texts found
+        (`"hit_rate"`), or `None` if the cache is disabled"""
+        if self._entity_cache is None:
+            return None
+        return self._entity_cache.stats()
 
     def run(self, entities: List[Entity]):
         """Add normalization attributes to each entity in `entities`.
@@ -219,8 +351,83 @@ class UMLSCoderNormalizer(Operation):
         self, entities: List[Entity]
     ) -> Tuple[List[List[int]], List[List[float]]]:
         entity_terms = [entity.text for entity in entities]
+        if self._entity_cache is not None:
+            return self._find_best_matches_with_cache(entity_terms)
+
         entity_embeddings = self._pipeline(entity_terms)
         entity_embeddings = torch.cat(entity_embeddings, dim=0)
+        return self._search(entity_embeddings)
+
+    def _find_best_matches_with_cache(
+        self, entity_terms: List[str]
+    ) -> Tuple[List[List[int]], List[List[float]]]:
+        """Find best matches of distinct entity terms, reusing cached embeddings
+        and matches when possible"""
+
+        assert self._entity_cache is not None
+        # matches depend on the search params, not only on the embeddings
+        search_key = f"{self.max_nb_matches}|{self.search_engine}|{self.ivf_nb_probes}"
+
+        matches_by_term = {}
+        embeddings_by_term = {}
+        terms_to_embed = []
+        for term in dict.fromkeys(entity_terms):
+            entry = self._entity_cache.get(term)
+            if entry is None:
+                terms_to_embed.append(term)
+            elif entry.search_key == search_key:
+                matches_by_term[term] = (entry.match_indices, entry.match_scores)
+            else:
+                embeddings_by_term[term] = entry.embedding
+
+        if terms_to_embed:
+            embeddings = torch.cat(self._pipeline(terms_to_embed), dim=0)
+            embeddings_by_term.update(zip(terms_to_embed, embeddings.cpu().numpy()))
+
+        if embeddings_by_term:
+            terms_to_search = list(embeddings_by_term)
+            torch_device = "cpu" if self.device < 0 else f"cuda:{self.device}"
+            embeddings = torch.from_numpy(
+                np.stack([embeddings_by_term[term] for term in terms_to_search])
+            ).to(torch_device)
+            all_match_indices, all_match_scores = self._search(embeddings)
+            for term, match_indices, match_scores in zip(
+                terms_to_search, all_match_indices, all_match_scores
+            ):
+                matches_by_term[term] = (match_indices, match_scores)
+                self._entity_cache.put(
+                    term,
+                    EntityCacheEntry(
+                        embedding=embeddings_by_term[term],
+                        search_key=search_key,
+                        match_indices=match_indices,
+                        match_scores=match_scores,
+                    ),
+                )
+            self._entity_cache.flush()
+
+        return (
+            [matches_by_term[term][0] for term in entity_terms],
+            [matches_by_term[term][1] for term in entity_terms],
+        )
+
+    def _search(
+        self, entity_embeddings: torch.Tensor
+    ) -> Tuple[List[List[int]], List[List[float]]]:
+        """Find best matches of entity embeddings in UMLS embeddings"""
+
+        if self._ivf_index is not None:
+            all_matches_scores, all_matches_indices = self._ivf_index.search(
+                entity_embeddings.cpu().numpy(),
+                k=self.max_nb_matches,
+                nb_probes=self.ivf_nb_probes,
+            )
+            # same rounding as below
+            all_matches_scores = np.round(all_matches_scores, decimals=4)
+            return all_matches_indices.tolist(), all_matches_scores.tolist()
+
+        if self._umls_matrix is not None:
+            return self._find_best_matches_in_matrix(entity_embeddings)
 
         if self.nb_umls_embeddings_chunks is not None:
             # compute similarities for each batch of pre-computed umls embeddings
@@ -249,6 +456,38 @@ class UMLSCoderNormalizer(Operation):
         all_matches_scores = torch.round(all_matches_scores, decimals=4)
         return all_matches_indices.tolist(), all_matches_scores.tolist()
 
+    def _find_best_matches_in_matrix(
+        self, entity_embeddings: torch.Tensor
+    ) -> Tuple[List[List[int]], List[List[float]]]:
+        """Find best matches in memory-mapped embeddings, keeping the best matches
+        of each block of embeddings read"""
+
+        assert self._umls_matrix is not None
+        block_size = _UMLS_EMBEDDINGS_CHUNK_SIZE * (self.nb_umls_embeddings_chunks or 1)
+        all_matches_scores = entity_embeddings.new_empty((len(entity_embeddings), 0))
+        all_matches_indices = torch.empty(
+            (len(entity_embeddings), 0),
+            dtype=torch.long,
+            device=entity_embeddings.device,
+        )
+        for start in range(0, len(self._umls_matrix), block_size):
+            block = torch.from_numpy(self._umls_matrix[start : start + block_size])
+            block = block.to(entity_embeddings.device)
+            similarities = torch.matmul(entity_embeddings, block.T)
+            block_scores, block_indices = torch.topk(
+                similarities, k=min(self.max_nb_matches, len(block))
+            )
+            scores = torch.cat((all_matches_scores, block_scores), dim=1)
+            indices = torch.cat((all_matches_indices, block_indices + start), dim=1)
+            all_matches_scores, best = torch.topk(
+                scores, k=min(self.max_nb_matches, scores.shape[1])
+            )
+            all_matches_indices = torch.gather(indices, 1, best)
+
+        # same rounding as _search()
+        all_matches_scores = torch.round(all_matches_scores, decimals=4)
+        return all_matches_indices.tolist(), all_matches_scores.tolist()
+
     def _load_umls_embeddings(self, files: List[Path]) -> torch.Tensor:
         torch_device = "cpu" if self.device < 0 else f"cuda:{self.device}"
         umls_embeddings = torch.cat(
@@ -256,6 +495,29 @@ class UMLSCoderNormalizer(Operation):
         )
         return umls_embeddings
 
+    def _load_ivf_index(self, show_progress=True) -> IVFIndex:
+        """Load the approximate nearest neighbour index of the UMLS embeddings,
+        building it if it doesn't exist yet"""
+
+        index_dir = self.embeddings_cache_dir / _IVF_INDEX_DIRNAME
+        if IVFIndex.exists(index_dir):
+            index = IVFIndex.load(index_dir)
+            if index.nb_embeddings == len(self._umls_entries):
+                return index
+
+        if show_progress:
+            print(f"Building UMLS embeddings index in {index_dir}")
+        if self._umls_matrix is not None:
+            umls_embeddings = self._umls_matrix
+        else:
+            umls_embeddings = _EmbeddingsChunkFiles(
+                sorted(self.embeddings_cache_dir.glob(f"*{_UMLS_EMBEDDINGS_FILE_EXT}")),
+                nb_embeddings=len(self._umls_entries),
+            )
+        # read as many embeddings at once as when searching without index
+        block_size = _UMLS_EMBEDDINGS_CHUNK_SIZE * (self.nb_umls_embeddings_chunks or 1)
+        return IVFIndex.build(umls_embeddings, index_dir, block_size=block_size)
+
     def _normalize_entity(
         self, entity: Entity, match_indices: List[int], match_scores: List[float]
     ):
@@ -287,6 +549,7 @@ class UMLSCoderNormalizer(Operation):
             normalize_embeddings=self.normalize_embeddings,
             lowercase=self.lowercase,
             normalize_unicode=self.normalize_unicode,
+            embeddings_dtype=self.embeddings_dtype,
         )
 
         # check if embeddings have already been computed
@@ -305,81 +568,218 @@ class UMLSCoderNormalizer(Operation):
             # nothing to do, embeddings have already been computed
             return
 
-        if show_progress:
-            print(
-                "No pre-existing UMLS embeddings found in cache directory"
-                f" {self.embeddings_cache_dir}, pre-computing them right now"
+        # check if a build with the same params was interrupted
+        build_params_file = self.embeddings_cache_dir / _BUILD_PARAMS_FILENAME
+        terms_file = self.embeddings_cache_dir / _TERMS_FILENAME
+        resume = False
+        if build_params_file.exists() and terms_file.exists():
+            with open(build_params_file) as fp:
+                resume = _UMLSEmbeddingsParams(**yaml.safe_load(fp)) == params
+
+        if resume:
+            if show_progress:
+                print(
+                    "Resuming pre-computation of UMLS embeddings in cache directory"
+                    f" {self.embeddings_cache_dir}"
+                )
+            entries_df = pd.read_feather(terms_file)
+            terms_to_match = [
+                preprocess_term_to_match(term, self.lowercase, self.normalize_unicode)
+                for term in entries_df.term
+            ]
+        else:
+            if show_progress:
+                print(
+                    "No pre-existing UMLS embeddings found in cache directory"
+                    f" {self.embeddings_cache_dir}, pre-computing them right now"
+                )
+            self.embeddings_cache_dir.mkdir(exist_ok=True)
+            # remove all previous files for safety
+            self._remove_umls_embeddings()
+
+            entries_df, terms_to_match = self._load_umls_entries(show_progress)
+            # store entries in feather file (faster than csv and yaml)
+            if show_progress:
+                print("Writing UMLS terms... ", end="")
+            entries_df.to_feather(terms_file)
+            if show_progress:
+                print("Done")
+            # written last, so an interrupted build is only resumed if the
+            # terms file is complete
+            _save_params(params, build_params_file)
+
+        chunk_files = self._compute_umls_embeddings(terms_to_match, show_progress)
+        if self.embeddings_dtype is not None:
+            if show_progress:
+                print("Writing UMLS embeddings... ", end="")
+            matrix_writer = UMLSEmbeddingsWriter(
+                self.embeddings_cache_dir / _UMLS_EMBEDDINGS_MATRIX_FILENAME,
+                self.embeddings_dtype,
+                metadata=params.to_dict(),
             )
+            for chunk_file in chunk_files:
+                matrix_writer.write(np.load(chunk_file))
+            matrix_writer.close()
+            shutil.rmtree(self.embeddings_cache_dir / _UMLS_EMBEDDINGS_CHUNKS_DIRNAME)
+            if show_progress:
+                print("Done")
 
-        self.embeddings_cache_dir.mkdir(exist_ok=True)
+        # store params into yaml
+        _save_params(params, params_file)
+        build_params_file.unlink()
+
+    def _remove_umls_embeddings(self):
+        """Remove files of previously computed embeddings (and of anything
+        depending on them)"""
+
+        for pattern in (f"*{_UMLS_EMBEDDINGS_FILE_EXT}", "*.tmp"):
+            for file in self.embeddings_cache_dir.glob(pattern):
+                file.unlink()
+        for filename in (
+            _UMLS_EMBEDDINGS_MATRIX_FILENAME,
+            _ENTITY_CACHE_FILENAME,
+            # write-ahead log of the entity cache database
+            _ENTITY_CACHE_FILENAME + "-wal",
+            _ENTITY_CACHE_FILENAME + "-shm",
+            _BUILD_PARAMS_FILENAME,
+        ):
+            file = self.embeddings_cache_dir / filename
+            if file.exists():
+                file.unlink()
+        for dirname in (_UMLS_EMBEDDINGS_CHUNKS_DIRNAME, _IVF_INDEX_DIRNAME):
+            shutil.rmtree(self.embeddings_cache_dir / dirname, ignore_errors=True)
 
-        # remove all previous embedding files for safety
-        [
-            f.unlink()
-            for f in self.embeddings_cache_dir.glob(f"*{_UMLS_EMBEDDINGS_FILE_EXT}")
-        ]
+    def _load_umls_entries(self, show_progress: bool) -> Tuple[pd.DataFrame, List[str]]:
+        """Load UMLS entries with distinct terms to match, and their terms to
+        match"""
 
-        # get iterator to all UMLS entries
         entries_iter = load_umls(
             self.umls_mrconso_file,
             languages=[self.language],
             show_progress=show_progress,
+            columnar_cache_dir=self.umls_columnar_cache_dir,
         )
-
-        entries_by_term_to_match = {}
-        # iterate over chunks of umls entries
         if show_progress:
-            print("Loading UMLS entries and computing embeddings...")
-        for i, chunk_entries in enumerate(
-            medkit.core.utils.batch_iter(entries_iter, _UMLS_EMBEDDINGS_CHUNK_SIZE)
-        ):
+            print("Loading UMLS entries...")
+        entries_by_term_to_match = {}
+        for entry in entries_iter:
             # get preprocess version of each term for matching
-            terms_to_match = [
-                preprocess_term_to_match(e.term, self.lowercase, self.normalize_unicode)
-                for e in chunk_entries
-            ]
-
-            # skip entry with duplicate terms to match
-            chunk_entries_by_term_to_match = {
-                term_to_match: entry
-                for term_to_match, entry in zip(terms_to_match, chunk_entries)
-                if term_to_match not in entries_by_term_to_match
-            }
-            if not chunk_entries_by_term_to_match:
-                continue
-            entries_by_term_to_match.update(chunk_entries_by_term_to_match)
-
-            # compute embedding for each term
-            chunk_embeddings_iter = self._pipeline(
-                term_to_match for term_to_match in chunk_entries_by_term_to_match
+            term_to_match = preprocess_term_to_match(
+                entry.term, self.lowercase, self.normalize_unicode
             )
-            chunk_embeddings = torch.cat(list(chunk_embeddings_iter), dim=0)
-            chunk_embeddings_file = (
-                self.embeddings_cache_dir / f"{i:010d}{_UMLS_EMBEDDINGS_FILE_EXT}"
-            )
-            # save chunk embeddings
-            torch.save(chunk_embeddings, chunk_embeddings_file)
+            # skip entry with duplicate terms to match
+            if term_to_match not in entries_by_term_to_match:
+                entries_by_term_to_match[term_to_match] = entry
 
-        # store entries in feather file (faster than csv and yaml)
         entries_df = pd.DataFrame.from_records(
             [e.to_dict() for e in entries_by_term_to_match.values()]
         )
-        terms_file = self.embeddings_cache_dir / _TERMS_FILENAME
-        if show_progress:
-            print("Writing UMLS terms... ", end="")
-        entries_df.to_feather(terms_file)
+        return entries_df, list(entries_by_term_to_match)
+
+    def _compute_umls_embeddings(
+        self, terms_to_match: List[str], show_progress: bool
+    ) -> List[Path]:
+        """Compute embeddings of `terms_to_match` by chunks, skipping the chunks
+        already saved by an interrupted build, and return the chunk files"""
+
+        if self.embeddings_dtype is None:
+            chunks_dir = self.embeddings_cache_dir
+            chunk_file_ext = _UMLS_EMBEDDINGS_FILE_EXT
+        else:
+            chunks_dir = self.embeddings_cache_dir / _UMLS_EMBEDDINGS_CHUNKS_DIRNAME
+            chunks_dir.mkdir(exist_ok=True)
+            chunk_file_ext = ".npy"
+
+        chunks = list(
+            medkit.core.utils.batch_list(terms_to_match, _UMLS_EMBEDDINGS_CHUNK_SIZE)
+        )
+        chunk_files = [
+            chunks_dir / f"{i:010d}{chunk_file_ext}" for i in range(len(chunks))
+        ]
+        chunk_indices = [i for i, f in enumerate(chunk_files) if not f.exists()]
+        nb_terms = sum(len(chunks[i]) for i in chunk_indices)
+        if nb_terms == 0:
+            return chunk_files
+
         if show_progress:
-            print("Done")
+            print("Computing embeddings...")
+        progress_bar = tqdm(
+            total=len(terms_to_match),
+            initial=len(terms_to_match) - nb_terms,
+            unit="term",
+            disable=not show_progress,
+        )
+        start_time = time.perf_counter()
+        if self.nb_build_workers > 1 and len(chunk_indices) > 1:
+            chunk_embeddings_iter = self._iter_chunk_embeddings_in_pool(
+                chunks, chunk_indices
+            )
+        else:
+            if self._pipeline is None:
+                self._pipeline = _create_pipeline(
+                    device=self.device, **self._pipeline_args
+                )
+            chunk_embeddings_iter = (
+                (i, _compute_embeddings(self._pipeline, chunks[i]))
+                for i in chunk_indices
+            )
+        for i, chunk_embeddings in chunk_embeddings_iter:
+            _save_chunk_embeddings(chunk_embeddings, chunk_files[i])
+            progress_bar.update(len(chunk_embeddings))
+        progress_bar.close()
 
-        # store params into yaml
-        with open(params_file, mode="w") as fp:
-            yaml.safe_dump(
-                params.to_dict(),
-                fp,
-                encoding="utf-8",
-                allow_unicode=True,
-                sort_keys=False,
+        if show_progress:
+            duration = time.perf_counter() - start_time
+            print(
+                f"Computed embeddings of {nb_terms} UMLS terms in {duration:.1f}s"
+                f" ({nb_terms / duration:.1f} terms/s)"
             )
+        return chunk_files
+
+    def _iter_chunk_embeddings_in_pool(
+        self, chunks: List[List[str]], chunk_indices: List[int]
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        nb_workers = min(self.nb_build_workers, len(chunk_indices))
+        # share computing threads between workers rather than having each of
+        # them use all the cores
+        nb_threads = max(1, (os.cpu_count() or 1) // nb_workers)
+        # spawn rather than fork, which is unsafe with the threads of torch
+        # and tokenizers
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(
+            nb_workers,
+            initializer=_init_build_worker,
+            initargs=(self._pipeline_args, nb_threads),
+        ) as pool:
+            tasks = ((i, chunks[i]) for i in chunk_indices)
+            # chunks are saved as soon as they are computed, in any order
+            yield from pool.imap_unordered(_compute_chunk_embeddings_in_worker, tasks)
+
+
+class _EmbeddingsChunkFiles:
+    """Embeddings saved in chunk files, read only when sliced (only the chunk
+    files covering the requested rows are loaded)"""
+
+    def __init__(self, files: List[Path], nb_embeddings: int):
+        self.files = files
+        self.nb_embeddings = nb_embeddings
+
+    def __len__(self) -> int:
+        return self.nb_embeddings
+
+    def __getitem__(self, key: slice) -> np.ndarray:
+        start, stop, step = key.indices(self.nb_embeddings)
+        assert step == 1 and start < stop
+        first_file = start // _UMLS_EMBEDDINGS_CHUNK_SIZE
+        last_file = (stop - 1) // _UMLS_EMBEDDINGS_CHUNK_SIZE
+        embeddings = torch.cat(
+            [
+                torch.load(file, map_location="cpu")
+                for file in self.files[first_file : last_file + 1]
+            ]
+        ).numpy()
+        offset = first_file * _UMLS_EMBEDDINGS_CHUNK_SIZE
+        return embeddings[start - offset : stop - offset]
 
 
 class _EmbeddingsPipeline(FeatureExtractionPipeline):
@@ -421,3 +821,68 @@ class _EmbeddingsPipeline(FeatureExtractionPipeline):
             norm = torch.norm(embeddings, p=2, dim=1, keepdim=True).clamp(min=self._EPS)
             embeddings = embeddings / norm
         return embeddings
+
+
+def _save_params(params: _UMLSEmbeddingsParams, file: Path):
+    with open(file, mode="w") as fp:
+        yaml.safe_dump(
+            params.to_dict(),
+            fp,
+            encoding="utf-8",
+            allow_unicode=True,
+            sort_keys=False,
+        )
+
+
+def _save_chunk_embeddings(embeddings: np.ndarray, file: Path):
+    # write to a temporary file first, so that a chunk file is always complete
+    tmp_file = file.with_name(file.name + ".tmp")
+    with open(tmp_file, mode="wb") as fp:
+        if file.suffix == _UMLS_EMBEDDINGS_FILE_EXT:
+            torch.save(torch.from_numpy(embeddings), fp)
+        else:
+            np.save(fp, embeddings)
+    os.replace(tmp_file, file)
+
+
+def _create_pipeline(
+    model: Union[str, Path],
+    summary_method: Literal["mean", "cls"],
+    normalize: bool,
+    device: int,
+    batch_size: int,
+    hf_cache_dir: Optional[Union[str, Path]],
+) -> _EmbeddingsPipeline:
+    return transformers.pipeline(
+        "feature-extraction",
+        model=model,
+        pipeline_class=_EmbeddingsPipeline,
+        summary_method=summary_method,
+        normalize=normalize,
+        device=device,
+        batch_size=batch_size,
+        model_kwargs={"cache_dir": hf_cache_dir},
+    )
+
+
+def _compute_embeddings(pipeline: _EmbeddingsPipeline, terms: List[str]) -> np.ndarray:
+    embeddings_iter = pipeline(term for term in terms)
+    return torch.cat(list(embeddings_iter), dim=0).cpu().numpy()
+
+
+# pipeline of the current build worker process
+_worker_pipeline: Optional[_EmbeddingsPipeline] = None
+
+
+def _init_build_worker(pipeline_args: Dict[str, Any], nb_threads: int):
+    global _worker_pipeline
+    torch.set_num_threads(nb_threads)
+    _worker_pipeline = _create_pipeline(device=-1, **pipeline_args)
+
+
+def _compute_chunk_embeddings_in_worker(
+    task: Tuple[int, List[str]]
+) -> Tuple[int, np.ndarray]:
+    assert _worker_pipeline is not None
+    chunk_index, terms = task
+    return chunk_index, _compute_embeddings(_worker_pipeline, terms)
@@ -8,6 +8,8 @@ import re
 
 import unidecode
 
+from medkit.text.ner._columnar_mrconso import ColumnarMRCONSO, convert_mrconso
+
 
 # based on https://github.com/GanjinZero/CODER/blob/master/coderpp/test/load_umls.py
 
@@ -36,9 +38,15 @@ def load_umls(
     sources: Optional[List[str]] = None,
     languages: Optional[List[str]] = None,
     show_progress: bool = False,
+    columnar_cache_dir: Optional[Union[str, Path]] = None,
 ) -> Iterator[UMLSEntry]:
     """Load all terms and associated CUIs found in a UMLS MRCONSO.RRF file
 
+    Parsing the whole MRCONSO.RRF file takes a long time. When it is loaded
+    several times (for instance with different `sources` or `languages`), use
+    `columnar_cache_dir`: the file is then converted once into a compact
+    columnar copy, from which entries are loaded much faster.
+
     Parameters
     ----------
     mrconso_file:
@@ -51,6 +59,10 @@ def load_umls(
         will be taken into account
     show_progress:
         Whether to show a progressbar
+    columnar_cache_dir:
+        Directory where to store a columnar copy of `mrconso_file`. It is
+        created the first time (or when `mrconso_file` was modified since),
+        and used to load entries instead of `mrconso_file`.
 
     Returns
     -------
@@ -58,6 +70,15 @@ def load_umls(
         Iterator over all term entries found in UMLS install
     """
     mrconso_file = Path(mrconso_file)
+
+    if columnar_cache_dir is not None:
+        if not ColumnarMRCONSO.is_copy_of(columnar_cache_dir, mrconso_file):
+            convert_mrconso(mrconso_file, columnar_cache_dir, show_progress)
+        mrconso = ColumnarMRCONSO(columnar_cache_dir)
+        for cui, term in mrconso.iter_entries(sources, languages):
+            yield UMLSEntry(cui, term)
+        return
+
     file_size = mrconso_file.stat().st_size
     luis_seen = set()
 
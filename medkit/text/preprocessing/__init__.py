@@ -1,4 +1,5 @@
 __all__ = [
+    "ASCIITransliterator",
     "CharReplacer",
     "DuplicateFinder",
     "DuplicationAttribute",
@@ -14,6 +15,7 @@ __all__ = [
     "SPACE_RULES",
 ]
 
+from .ascii_transliterator import ASCIITransliterator
 from .char_replacer import CharReplacer
 from .duplicate_finder import DuplicateFinder, DuplicationAttribute
 from .normalizer import Normalizer, NormalizerRule
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+__all__ = ["ASCIITransliterator"]
+
+from typing import List, Optional
+
+from medkit.core.operation import Operation
+from medkit.core.text import Segment
+from medkit.core.text.transliteration import (
+    has_ascii_text,
+    set_ascii_text,
+    transliterate,
+)
+
+
+class ASCIITransliterator(Operation):
+    """
+    Pre-processing module computing once the closest ASCII representation of
+    segment texts
+
+    The ASCII text of each segment is kept internally (cf.
+    :func:`~medkit.core.text.transliteration.set_ascii_text`), not as an
+    attribute, and is reused by all the rule-based operations that are not
+    sensitive to unicode (:class:`~medkit.text.ner.RegexpMatcher`,
+    :class:`~medkit.text.context.NegationDetector`,
+    :class:`~medkit.text.context.HypothesisDetector` and
+    :class:`~medkit.text.context.FamilyDetector`) instead of transliterating
+    the text again.
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        uid: Optional[str] = None,
+    ):
+        """
+        Parameters
+        ----------
+        name:
+            Name describing the pre-processing module (defaults to the class name)
+        uid:
+            Identifier of the pre-processing module
+        """
+        # Pass all arguments to super (remove self)
+        init_args = locals()
+        init_args.pop("self")
+        super().__init__(**init_args)
+
+    def run(self, segments: List[Segment]):
+        """
+        Precompute the ASCII text of each segment not having one yet
+
+        Parameters
+        ----------
+        segments:
+            List of segments to process
+        """
+        for segment in segments:
+            if not has_ascii_text(segment):
+                set_ascii_text(segment, transliterate(segment.text))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 __all__ = ["CharReplacer"]
 
+import re
 from typing import List, Optional, Tuple
 
 from medkit.core.operation import Operation
@@ -53,6 +54,14 @@ class CharReplacer(Operation):
             len(key) != 1 for key in self.rules.keys()
         ), "CharReplacer can only contain rules that replace 1-char string."
 
+        # pattern matching all characters to replace, to find them without
+        # iterating over each character in python
+        if self.rules:
+            chars = "".join(re.escape(c) for c in self.rules)
+            self._pattern = re.compile(f"[{chars}]")
+        else:
+            self._pattern = None
+
     def run(self, segments: List[Segment]) -> List[Segment]:
         """
         Run the module on a list of segments provided as input
@@ -78,11 +87,10 @@ class CharReplacer(Operation):
         ranges = []
         replacement_texts = []
 
-        for ind, c in enumerate(segment.text):
-            nc = self.rules.get(c)
-            if nc is not None:
-                ranges.append((ind, ind + 1))
-                replacement_texts.append(nc)
+        if self._pattern is not None:
+            for match in self._pattern.finditer(segment.text):
+                ranges.append(match.span())
+                replacement_texts.append(self.rules[match.group()])
 
         new_text, new_spans = span_utils.replace(
             text=segment.text,
@@ -1,10 +1,20 @@
 __all__ = ["EDSCleaner"]
 
 import dataclasses
-from typing import List
+import re
+from typing import List, Tuple, Union
+
+from typing_extensions import Literal
 
 from medkit.core import Operation
-from medkit.core.text import Segment, utils
+from medkit.core.text import AnySpan, Segment, utils
+import medkit.core.text._span_pieces as span_pieces
+from medkit.core.text.utils import (
+    _LOWERCASE_CHARS,
+    _NUMERIC_CHARS,
+    _PUNCT_CHARS,
+    _UPPERCASE_CHARS,
+)
 
 # predefined configuration for french documents
 _FR_CIVIL_TITLES = ["M", "Mme", "Mlle", "Mr", "Pr", "Dr", "Mde"]
@@ -41,6 +51,11 @@ class EDSCleaner(Operation):
     and newlines characters. It respects the span modification by creating a new
     text-bound annotation containing the span modification information from input text.
 
+    With the "fused" engine, the spans of the cleaned segment are only built
+    once, after all cleaning rules have been applied to the text. Rules only
+    update a lightweight description of which parts of the original spans make
+    up the text, which gives exactly the same spans as the "sequential" engine
+    but is much faster for segments with many spans or parentheses.
     """
 
     def __init__(
@@ -49,6 +64,7 @@ class EDSCleaner(Operation):
         keep_endlines: bool = DefaultConfig.keep_endlines,
         handle_parentheses_eds: bool = DefaultConfig.handle_parentheses_eds,
         handle_points_eds: bool = DefaultConfig.handle_points_eds,
+        engine: Literal["sequential", "fused"] = "sequential",
         uid: str = None,
     ):
         """
@@ -70,6 +86,9 @@ class EDSCleaner(Operation):
             Modify points near to predefined keywords for french documents
             If True (default), modify the points near to keywords
             If False, the points near to keywords is not modified
+        engine:
+            Engine used to update spans. "sequential" rewrites the spans after
+            each cleaning rule, "fused" builds them once after all rules.
         uid
             Identifier of the pre-processing module
         """
@@ -78,10 +97,14 @@ class EDSCleaner(Operation):
         init_args.pop("self")
         super().__init__(**init_args)
 
+        if engine not in ("sequential", "fused"):
+            raise ValueError(f"Unsupported engine: {engine}")
+
         self.output_label = output_label
         self.keep_endlines = keep_endlines
         self.handle_parentheses_eds = handle_parentheses_eds
         self.handle_points_eds = handle_points_eds
+        self.engine = engine
 
     def run(self, segments: List[Segment]) -> List[Segment]:
         """
@@ -110,9 +133,28 @@ class EDSCleaner(Operation):
         Then remove multiple whitespaces or newline characters.
         Finally, modify parentheses or point after keywords if necessary.
         """
-        text = segment.text
-        spans = segment.spans
+        if self.engine == "fused":
+            text, spans = _clean_text_fused(
+                segment.text,
+                segment.spans,
+                keep_endlines=self.keep_endlines,
+                handle_parentheses_eds=self.handle_parentheses_eds,
+                handle_points_eds=self.handle_points_eds,
+            )
+        else:
+            text, spans = self._clean_text(segment.text, segment.spans)
+
+        # create ann with the clean text
+        clean_text = Segment(label=self.output_label, spans=spans, text=text)
+
+        if self._prov_tracer is not None:
+            self._prov_tracer.add_prov(
+                clean_text, self.description, source_data_items=[segment]
+            )
 
+        yield clean_text
+
+    def _clean_text(self, text: str, spans: List[AnySpan]) -> Tuple[str, List[AnySpan]]:
         # modify points characters
         text, spans = utils.replace_point_in_uppercase(text, spans)
         text, spans = utils.replace_point_in_numbers(text, spans)
@@ -148,13 +190,127 @@ class EDSCleaner(Operation):
             text, spans = utils.replace_point_before_keywords(
                 text=text, spans=spans, keywords=_FR_KEYWORDS_BEFORE
             )
+        return text, spans
 
-        # create ann with the clean text
-        clean_text = Segment(label=self.output_label, spans=spans, text=text)
 
-        if self._prov_tracer is not None:
-            self._prov_tracer.add_prov(
-                clean_text, self.description, source_data_items=[segment]
+# The functions below apply the same rules as the cleaning functions of
+# medkit.core.text.utils used by the "sequential" engine (with the same
+# patterns), but update span pieces instead of spans
+
+
+def _clean_text_fused(
+    text: str,
+    spans: List[AnySpan],
+    keep_endlines: bool,
+    handle_parentheses_eds: bool,
+    handle_points_eds: bool,
+) -> Tuple[str, List[AnySpan]]:
+    pieces = span_pieces.from_spans(spans)
+
+    # replace_point_in_uppercase()
+    pattern = rf"[{_UPPERCASE_CHARS}](\.)[{_UPPERCASE_CHARS}]"
+    text, pieces = _replace_text(text, pieces, pattern, " ", group=1)
+    # replace_point_in_numbers()
+    pattern = rf"[{_NUMERIC_CHARS}](\.)[{_NUMERIC_CHARS}]"
+    text, pieces = _replace_text(text, pieces, pattern, ",", group=1)
+
+    # clean_newline_character()
+    pattern = rf"(?P<blanks>\r?\n[\r\n]*)[\t\s]*[{_NUMERIC_CHARS}{_UPPERCASE_CHARS}]"
+    text, pieces = _replace_text(text, pieces, pattern, "\n", group="blanks")
+    pattern = rf"(?P<blanks>\r?\n[\r\n]*)[\t\s]*[{_LOWERCASE_CHARS}{_PUNCT_CHARS}]"
+    text, pieces = _replace_text(text, pieces, pattern, " ", group="blanks")
+    repl = ".\n" if keep_endlines else ". "
+    text, pieces = _replace_text(text, pieces, "\n+", repl, group=0)
+
+    # clean_multiple_whitespaces_in_sentence()
+    text, pieces = _replace_text(text, pieces, r"([ \t]{2,})", " ", group=0)
+
+    if handle_parentheses_eds:
+        # clean_parentheses_eds()
+        text, pieces = _replace_text(text, pieces, r"\(-\)", " negatif ", group=0)
+        text, pieces = _replace_text(text, pieces, r"\(\+\)", " positif ", group=0)
+        text, pieces = _replace_big_parentheses(text, pieces)
+        text, pieces = _replace_small_parentheses(text, pieces)
+
+    if handle_points_eds:
+        # replace_point_after_keywords()
+        keywords_regexp = "|".join(rf"\b{keyword}" for keyword in _FR_CIVIL_TITLES)
+        pattern = rf"(?:{keywords_regexp})(\.)"
+        text, pieces = _replace_text(text, pieces, pattern, " ", group=1)
+        keywords_regexp = "|".join(
+            rf"\b{keyword}" for keyword in _FR_PREPOSITIONS_AFTER
+        )
+        pattern = rf"(?:{keywords_regexp})(\s*\.)"
+        text, pieces = _replace_text(text, pieces, pattern, " ", group=1)
+        # replace_point_before_keywords()
+        keywords_regexp = "|".join(rf"{keyword}\b" for keyword in _FR_KEYWORDS_BEFORE)
+        pattern = rf"(\s\.\s*)(?:{keywords_regexp})"
+        text, pieces = _replace_text(text, pieces, pattern, " ", group=1)
+
+    return text, span_pieces.to_spans(pieces)
+
+
+def _replace_text(
+    text: str,
+    pieces: span_pieces.SpanPieces,
+    pattern: str,
+    repl: str,
+    group: Union[str, int],
+) -> Tuple[str, span_pieces.SpanPieces]:
+    ranges = [match.span(group) for match in re.finditer(pattern, text)]
+    return span_pieces.replace(text, pieces, ranges, [repl] * len(ranges))
+
+
+def _replace_big_parentheses(
+    text: str, pieces: span_pieces.SpanPieces
+) -> Tuple[str, span_pieces.SpanPieces]:
+    pattern = re.compile(
+        r"(\s*)\((?P<txt_inside>[^)(]{30,5000})\)(\s*)(?P<txt_after>[^.]*)\."
+    )
+
+    while True:
+        match = pattern.search(text)
+        if match is None:
+            break
+
+        txt_in, pcs_in = span_pieces.extract(text, pieces, [match.span("txt_inside")])
+        txt_af, pcs_af = span_pieces.extract(text, pieces, [match.span("txt_after")])
+
+        if pcs_af:
+            txt_in, pcs_in = span_pieces.insert(txt_in, pcs_in, [len(txt_in)], ["."])
+            txt_af, pcs_af = span_pieces.insert(
+                txt_af, pcs_af, [0, len(txt_af)], [" ", " ; "]
+            )
+            txt_new, pcs_new = span_pieces.concatenate(
+                [txt_af, txt_in], [pcs_af, pcs_in]
+            )
+        else:
+            txt_new, pcs_new = span_pieces.insert(
+                txt_in, pcs_in, [0, len(txt_in)], [" ; ", "."]
             )
 
-        yield clean_text
+        txt_before, pcs_before = span_pieces.extract(
+            text, pieces, [(0, match.start(0))]
+        )
+        txt_after, pcs_after = span_pieces.extract(
+            text, pieces, [(match.end(0), len(text))]
+        )
+        text, pieces = span_pieces.concatenate(
+            [txt_before, txt_new, txt_after], [pcs_before, pcs_new, pcs_after]
+        )
+    return text, pieces
+
+
+def _replace_small_parentheses(
+    text: str, pieces: span_pieces.SpanPieces
+) -> Tuple[str, span_pieces.SpanPieces]:
+    pattern = r"(\()(?:[^)(]{1,29})(\))"
+    ranges = sorted(
+        [
+            span
+            for match in re.finditer(pattern, text)
+            for span in (match.span(1), match.span(2))
+        ],
+        key=lambda sp: sp[0],
+    )
+    return span_pieces.replace(text, pieces, ranges, [","] * len(ranges))
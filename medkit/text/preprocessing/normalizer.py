@@ -58,6 +58,15 @@ class Normalizer(Operation):
 
         self._pattern = re.compile(regex_rule)
 
+        # index of the enclosing group of each rule in the pattern (rules may
+        # contain groups themselves). The enclosing group of the matched rule is
+        # the last group closed, so it is given by `match.lastindex`
+        self._new_texts_by_group_index = {}
+        group_index = 1
+        for rule in self.rules:
+            self._new_texts_by_group_index[group_index] = rule.new_text
+            group_index += re.compile(rule.pattern_to_replace).groups + 1
+
     def run(self, segments: List[Segment]) -> List[Segment]:
         """
         Run the module on a list of segments provided as input
@@ -85,10 +94,7 @@ class Normalizer(Operation):
 
         for match in self._pattern.finditer(segment.text):
             ranges.append(match.span())
-            for index in range(len(self.rules)):
-                if match.groups()[index] is not None:
-                    replacement_texts.append(self.rules[index].new_text)
-                    break
+            replacement_texts.append(self._new_texts_by_group_index[match.lastindex])
 
         new_text, new_spans = span_utils.replace(
             text=segment.text,
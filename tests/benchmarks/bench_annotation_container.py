@@ -0,0 +1,74 @@
+"""Measure the time needed to add many annotations to a text document, to
+retrieve them by type, label and key, and to retrieve them by position (compared
+to a linear scan)"""
+
+import timeit
+
+from medkit.core.text import Entity, Segment, Span, TextDocument, span_utils
+
+_NB_ANNS = 100_000
+_NB_QUERIES = 10
+
+
+def _get_anns():
+    anns = []
+    for i in range(_NB_ANNS):
+        if i % 2:
+            span = Span(i, i + 7)
+            ann = Entity(label="disease", spans=[span], text="Diabète")
+        else:
+            span = Span(i, i + 17)
+            ann = Segment(label="sentence", spans=[span], text="Diabète de type 2")
+        if i % 10 == 0:
+            ann.keys.add("sentences")
+        anns.append(ann)
+    return anns
+
+
+def main():
+    anns = _get_anns()
+    doc = TextDocument(text="Diabète de type 2")
+
+    def add():
+        for ann in anns:
+            doc.anns.add(ann)
+
+    duration = timeit.timeit(add, number=1)
+    print(f"add {_NB_ANNS} annotations: {duration * 1000:.0f} ms")
+
+    for name, func in [
+        ("get_segments()", doc.anns.get_segments),
+        ("get_entities()", doc.anns.get_entities),
+        ("get_entities(label)", lambda: doc.anns.get_entities(label="disease")),
+        ("get_segments(key)", lambda: doc.anns.get_segments(key="sentences")),
+    ]:
+        duration = timeit.timeit(func, number=1)
+        print(f"{name}: {duration * 1000:.0f} ms")
+
+    def scan_overlapping(start, end):
+        overlapping = []
+        for ann in doc.anns.get_segments() + doc.anns.get_entities():
+            spans = span_utils.normalize_spans(ann.spans)
+            if any(s.start < end and s.end > start for s in spans):
+                overlapping.append(ann)
+        return overlapping
+
+    duration = timeit.timeit(
+        lambda: [scan_overlapping(i * 100, i * 100 + 50) for i in range(_NB_QUERIES)],
+        number=1,
+    )
+    print(f"{_NB_QUERIES} queries with linear scan: {duration * 1000:.0f} ms")
+
+    duration = timeit.timeit(doc.anns._update_span_tree, number=1)
+    print(f"build interval index: {duration * 1000:.0f} ms")
+    duration = timeit.timeit(
+        lambda: [
+            doc.anns.get_overlapping(i * 100, i * 100 + 50) for i in range(_NB_QUERIES)
+        ],
+        number=1,
+    )
+    print(f"{_NB_QUERIES} queries with get_overlapping(): {duration * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare loading UMLS entries with `load_umls()` from a MRCONSO.RRF file and
+from its columnar copy, on a random MRCONSO file with several filters"""
+
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+from medkit.text.ner.umls_utils import load_umls
+
+_NB_ROWS = 1_000_000
+_LANGUAGES = ["ENG", "FRE", "GER", "SPA", "DUT"]
+_SOURCES = [f"SRC{i}" for i in range(100)]
+_FILTERS = [
+    (None, ["ENG"]),
+    (None, ["FRE"]),
+    (_SOURCES[:10], ["ENG", "FRE"]),
+]
+_NB_RUNS = 3
+
+
+def _write_mrconso(path):
+    rng = random.Random(0)
+    with open(path, mode="w", encoding="utf-8") as fp:
+        for i in range(_NB_ROWS):
+            cui = f"C{i // 4:07d}"
+            language = rng.choice(_LANGUAGES)
+            # some terms share their LUI
+            lui = f"L{rng.randrange(_NB_ROWS // 2):07d}"
+            source = rng.choice(_SOURCES)
+            term = f"term {i} {'é' * rng.randrange(3)}"
+            fp.write(
+                f"{cui}|{language}|P|{lui}|PF|S{i:07d}|Y|A{i:08d}||||{source}|PT|"
+                f"{i}|{term}|0|N||\n"
+            )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mrconso_file = Path(tmp_dir) / "MRCONSO.RRF"
+        _write_mrconso(mrconso_file)
+        columnar_cache_dir = Path(tmp_dir) / "mrconso"
+        print(f"{_NB_ROWS} rows, {_NB_RUNS} runs")
+
+        start = timeit.default_timer()
+        list(load_umls(mrconso_file, columnar_cache_dir=columnar_cache_dir))
+        print(f"conversion (with 1st load): {timeit.default_timer() - start:.1f} s")
+
+        for sources, languages in _FILTERS:
+            print(f"sources={sources}, languages={languages}")
+            duration = timeit.timeit(
+                lambda: list(load_umls(mrconso_file, sources, languages)),
+                number=_NB_RUNS,
+            )
+            print(f"  text: {duration / _NB_RUNS * 1000:.1f} ms/run")
+            duration = timeit.timeit(
+                lambda: list(
+                    load_umls(
+                        mrconso_file,
+                        sources,
+                        languages,
+                        columnar_cache_dir=columnar_cache_dir,
+                    )
+                ),
+                number=_NB_RUNS,
+            )
+            print(f"  columnar: {duration / _NB_RUNS * 1000:.1f} ms/run")
+
+            entries = list(load_umls(mrconso_file, sources, languages))
+            columnar_entries = list(
+                load_umls(
+                    mrconso_file,
+                    sources,
+                    languages,
+                    columnar_cache_dir=columnar_cache_dir,
+                )
+            )
+            assert columnar_entries == entries
+
+
+if __name__ == "__main__":
+    main()
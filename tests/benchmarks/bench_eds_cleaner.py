@@ -0,0 +1,41 @@
+"""Compare the "sequential" and "fused" engines of EDSCleaner, on the EDS test
+documents concatenated into one long segment, after CharReplacer"""
+
+from pathlib import Path
+import timeit
+
+from medkit.core.text import Segment, Span
+from medkit.text.preprocessing import CharReplacer, EDSCleaner
+
+_PATH_TO_EDS_DOCS = Path(__file__).parent / ".." / "data" / "text" / "eds"
+_NB_DOCS_COPIES = 20
+_NB_RUNS = 3
+
+
+def _get_segment():
+    text = "\n\n".join(
+        path.read_text(encoding="utf-8")
+        for path in sorted(_PATH_TO_EDS_DOCS.glob("*.txt"))
+    )
+    text = "\n\n".join([text] * _NB_DOCS_COPIES)
+    segment = Segment(label="raw_text", spans=[Span(0, len(text))], text=text)
+    return CharReplacer(output_label="replaced").run([segment])[0]
+
+
+def main():
+    segment = _get_segment()
+    print(f"{len(segment.text)} chars, {len(segment.spans)} spans, {_NB_RUNS} runs")
+
+    results = {}
+    for engine in ("sequential", "fused"):
+        cleaner = EDSCleaner(engine=engine)
+        duration = timeit.timeit(lambda: cleaner.run([segment]), number=_NB_RUNS)
+        print(f"{engine}: {duration / _NB_RUNS * 1000:.1f} ms/run")
+        clean_segment = cleaner.run([segment])[0]
+        results[engine] = (clean_segment.text, clean_segment.spans)
+
+    assert results["sequential"] == results["fused"]
+
+
+if __name__ == "__main__":
+    main()
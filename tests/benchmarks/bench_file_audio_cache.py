@@ -0,0 +1,58 @@
+"""Compare reads of many short segments of a FLAC file by FileAudioBuffer, with
+the decoded audio cache disabled, in memory or memory-mapped, as done when
+processing the segments found by a voice detector"""
+
+from pathlib import Path
+import tempfile
+import timeit
+
+import numpy as np
+import soundfile as sf
+
+from medkit.core.audio import FileAudioBuffer, set_file_audio_cache
+from tests.audio_utils import generate_sin_signal
+
+_DURATION = 600.0
+_SAMPLE_RATE = 16000
+_SEGMENT_DURATION = 0.5
+_NB_RUNS = 3
+
+
+def _read_segments(audio, segment_size):
+    return [
+        audio.trim(start, start + segment_size).read()
+        for start in range(0, audio.nb_samples - segment_size, segment_size)
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "audio.flac"
+        signal = generate_sin_signal(_DURATION, _SAMPLE_RATE, nb_channels=1)
+        sf.write(path, signal.T, _SAMPLE_RATE, subtype="PCM_16")
+        audio = FileAudioBuffer(path)
+        segment_size = int(_SEGMENT_DURATION * _SAMPLE_RATE)
+        print(f"{_DURATION}s file, {audio.nb_samples // segment_size} segments")
+
+        results = {}
+        for cache_name, cache_params in [
+            ("no cache", dict(max_size=0)),
+            ("memory cache", dict()),
+            ("mmap cache", dict(cache_dir=Path(tmp_dir) / "cache")),
+        ]:
+            set_file_audio_cache(**cache_params)
+            duration = timeit.timeit(
+                lambda: _read_segments(audio, segment_size), number=_NB_RUNS
+            )
+            print(f"{cache_name}: {duration / _NB_RUNS * 1000:.1f} ms/run")
+            results[cache_name] = _read_segments(audio, segment_size)
+        set_file_audio_cache()
+
+    for name, segments in results.items():
+        assert all(
+            np.array_equal(s, e) for s, e in zip(segments, results["no cache"])
+        ), name
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Compare the "uuid" and "compact" id generators: generation time, memory used
+by identifiers, and time to add annotations to a document"""
+
+import sys
+import timeit
+
+from medkit.core import generate_id, set_id_generator
+from medkit.core.text import Entity, Span, TextDocument
+
+_NB_IDS = 100_000
+_NB_ANNS = 5_000
+
+
+def _add_entities():
+    doc = TextDocument(text="Diabète de type 2")
+    for _ in range(_NB_ANNS):
+        doc.anns.add(Entity(label="disease", spans=[Span(0, 7)], text="Diabète"))
+
+
+def main():
+    for generator in ("uuid", "compact"):
+        set_id_generator(generator)
+        duration = timeit.timeit(generate_id, number=_NB_IDS)
+        ids = [generate_id() for _ in range(_NB_IDS)]
+        memory = sum(sys.getsizeof(uid) for uid in ids) / len(ids)
+        add_duration = timeit.timeit(_add_entities, number=1)
+        print(
+            f"{generator}: {duration / _NB_IDS * 1e9:.0f} ns/id,"
+            f" {memory:.0f} bytes/id,"
+            f" {add_duration * 1000:.0f} ms to create and add {_NB_ANNS} entities"
+        )
+    set_id_generator("uuid")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare exact search and approximate search with IVFIndex (used by
+UMLSCoderNormalizer) on random clustered embeddings of the size of a UMLS
+subset, for a batch of entity embeddings"""
+
+import timeit
+
+import numpy as np
+
+from medkit.text.ner._ivf_index import IVFIndex
+
+_NB_EMBEDDINGS = 200_000
+_DIM = 768
+_NB_CLUSTERS = 2000
+_NB_QUERIES = 16
+_K = 1
+_NB_PROBES = 16
+_NB_RUNS = 3
+
+
+def _normalize(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _exact_search(embeddings, queries, k):
+    scores = queries @ embeddings.T
+    indices = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, indices, axis=1), indices
+
+
+def main():
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((_NB_CLUSTERS, _DIM), dtype=np.float32)
+    embeddings = centers[rng.integers(0, _NB_CLUSTERS, _NB_EMBEDDINGS)]
+    embeddings += 0.5 * rng.standard_normal(embeddings.shape, dtype=np.float32)
+    embeddings = _normalize(embeddings)
+    queries = embeddings[rng.integers(0, _NB_EMBEDDINGS, _NB_QUERIES)]
+    queries = _normalize(queries + 0.1 * rng.normal(size=queries.shape))
+    print(f"{_NB_EMBEDDINGS} embeddings, {_NB_QUERIES} queries, {_NB_RUNS} runs")
+
+    start = timeit.default_timer()
+    index = IVFIndex.build(embeddings)
+    print(f"index build: {timeit.default_timer() - start:.1f} s")
+
+    duration = timeit.timeit(
+        lambda: _exact_search(embeddings, queries, _K), number=_NB_RUNS
+    )
+    print(f"exact: {duration / _NB_RUNS * 1000:.1f} ms/run")
+    duration = timeit.timeit(
+        lambda: index.search(queries, _K, _NB_PROBES), number=_NB_RUNS
+    )
+    print(f"ivf: {duration / _NB_RUNS * 1000:.1f} ms/run")
+
+    _, exact_indices = _exact_search(embeddings, queries, _K)
+    _, ivf_indices = index.search(queries, _K, _NB_PROBES)
+    recall = np.mean(exact_indices[:, 0] == ivf_indices[:, 0])
+    print(f"ivf recall@1: {recall:.3f}")
+    assert recall >= 0.9
+
+
+if __name__ == "__main__":
+    main()
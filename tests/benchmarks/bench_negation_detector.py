@@ -0,0 +1,53 @@
+"""Compare the "per_rule" and "multi_rule" engines of NegationDetector with the
+default rules, on the syntagmas of the EDS test documents"""
+
+import logging
+from pathlib import Path
+import re
+import timeit
+
+from medkit.core.text import Segment, Span
+from medkit.text.context import NegationDetector
+
+_PATH_TO_EDS_DOCS = Path(__file__).parent / ".." / "data" / "text" / "eds" / "clean"
+_NB_RUNS = 10
+
+
+def _get_syntagmas():
+    syntagmas = []
+    for path in sorted(_PATH_TO_EDS_DOCS.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        for match in re.finditer(r"[^\n.,;:]+", text):
+            syntagmas.append(
+                Segment(
+                    label="syntagma",
+                    spans=[Span(match.start(), match.end())],
+                    text=match.group(),
+                )
+            )
+    return syntagmas
+
+
+def main():
+    # don't report texts not preprocessed for ascii conversion
+    logging.getLogger("medkit").setLevel(logging.ERROR)
+
+    syntagmas = _get_syntagmas()
+    print(f"{len(syntagmas)} syntagmas, {_NB_RUNS} runs")
+
+    results = {}
+    for engine in ("per_rule", "multi_rule"):
+        detector = NegationDetector(output_label=engine, engine=engine)
+        duration = timeit.timeit(lambda: detector.run(syntagmas), number=_NB_RUNS)
+        print(f"{engine}: {duration / _NB_RUNS * 1000:.1f} ms/run")
+        results[engine] = [
+            (attr.value, attr.metadata)
+            for s in syntagmas
+            for attr in s.attrs.get(label=engine)
+        ]
+
+    assert results["per_rule"] == results["multi_rule"]
+
+
+if __name__ == "__main__":
+    main()
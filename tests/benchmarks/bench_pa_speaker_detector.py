@@ -0,0 +1,101 @@
+"""Compare the CPU diarization time of PASpeakerDetector on synthetic
+multi-speaker recordings, when processing segments sequentially or in several
+worker processes, and with the default or a larger segmentation step.
+
+Requires the pyannote segmentation model and the speechbrain embedding model,
+downloaded from the HuggingFace hub (or given as paths with the
+MEDKIT_BENCH_SEGMENTATION_MODEL and MEDKIT_BENCH_EMBEDDING_MODEL environment
+variables)"""
+
+import os
+import timeit
+
+import numpy as np
+import torch
+
+from medkit.core.audio import MemoryAudioBuffer, Segment, Span
+from medkit.audio.segmentation.pa_speaker_detector import PASpeakerDetector
+
+_SEGMENTATION_MODEL = os.environ.get(
+    "MEDKIT_BENCH_SEGMENTATION_MODEL", "pyannote/segmentation"
+)
+_EMBEDDING_MODEL = os.environ.get(
+    "MEDKIT_BENCH_EMBEDDING_MODEL", "speechbrain/spkrec-ecapa-voxceleb"
+)
+_SAMPLE_RATE = 16000
+_NB_RECORDINGS = 8
+_RECORDING_DURATION = 120.0
+_TURN_DURATION = 4.0
+# fundamental frequencies of synthetic speakers
+_SPEAKER_FREQS = [110.0, 165.0, 220.0]
+
+
+def _generate_recording(rng):
+    """Alternate turns of synthetic speakers (harmonic tones modulated at a
+    syllabic rate, with pauses between turns)"""
+    turn_length = int(_TURN_DURATION * _SAMPLE_RATE)
+    time = np.arange(turn_length, dtype=np.float32) / _SAMPLE_RATE
+    turns = []
+    for _ in range(int(_RECORDING_DURATION / _TURN_DURATION)):
+        freq = rng.choice(_SPEAKER_FREQS)
+        signal = sum(
+            np.sin(2 * np.pi * freq * harmonic * time) / harmonic
+            for harmonic in range(1, 6)
+        )
+        syllables = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * time))
+        signal = 0.3 * signal * syllables
+        # pause at end of turn
+        signal[-turn_length // 8 :] = 0.0
+        turns.append(signal)
+    signal = np.concatenate(turns).astype(np.float32)
+    signal += rng.normal(0, 0.01, signal.shape).astype(np.float32)
+    return signal.reshape(1, -1)
+
+
+def _get_segments():
+    rng = np.random.default_rng(0)
+    segments = []
+    for _ in range(_NB_RECORDINGS):
+        audio = MemoryAudioBuffer(_generate_recording(rng), _SAMPLE_RATE)
+        segment = Segment(label="raw", span=Span(0.0, audio.duration), audio=audio)
+        segments.append(segment)
+    return segments
+
+
+def main():
+    torch.manual_seed(0)
+    segments = _get_segments()
+    nb_cpus = os.cpu_count() or 1
+    nb_workers = max(2, nb_cpus // 2)
+    print(f"{_NB_RECORDINGS} recordings of {_RECORDING_DURATION}s, {nb_cpus} CPUs")
+
+    results = {}
+    for name, params in [
+        ("sequential", dict(nb_workers=1)),
+        (f"{nb_workers} workers", dict(nb_workers=nb_workers)),
+        ("sequential, step 0.5", dict(nb_workers=1, segmentation_step=0.5)),
+    ]:
+        detector = PASpeakerDetector(
+            segmentation_model=_SEGMENTATION_MODEL,
+            embedding_model=_EMBEDDING_MODEL,
+            clustering="AgglomerativeClustering",
+            output_label="turn",
+            segmentation_batch_size=32,
+            embedding_batch_size=32,
+            **params,
+        )
+        start = timeit.default_timer()
+        turn_segs = detector.run(segments)
+        duration = timeit.default_timer() - start
+        print(f"{name}: {duration:.1f} s, {len(turn_segs)} turns")
+        results[name] = [
+            (seg.span, seg.attrs.get(label="speaker")[0].value) for seg in turn_segs
+        ]
+
+    # workers give the same turns as sequential processing (the larger
+    # segmentation step is expected to give slightly different ones)
+    assert results[f"{nb_workers} workers"] == results["sequential"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure the memory used by a provenance graph and the time needed to build
+it and to retrieve provenance information from it (compared to a graph storing
+nodes as objects indexed by id, as medkit did before)"""
+
+import timeit
+import tracemalloc
+from typing import Dict, List, Optional
+
+from medkit.core import generate_id
+from medkit.core._prov_graph import ProvGraph
+
+_NB_SOURCES = 1_000
+_NB_ITEMS = 100_000
+_NB_OPS = 10
+
+
+class _Node:
+    def __init__(
+        self,
+        data_item_id: str,
+        operation_id: Optional[str],
+        source_ids: List[str],
+        derived_ids: List[str],
+    ):
+        self.data_item_id = data_item_id
+        self.operation_id = operation_id
+        self.source_ids = source_ids
+        self.derived_ids = derived_ids
+
+
+class _DictProvGraph:
+    """Previous implementation of the graph (nodes were dataclasses without
+    __slots__, which is equivalent to this class), limited to what is measured"""
+
+    def __init__(self):
+        self._nodes_by_id: Dict[str, _Node] = {}
+
+    def get_node(self, data_item_id: str) -> _Node:
+        return self._nodes_by_id[data_item_id]
+
+    def add_node(self, data_item_id: str, operation_id: str, source_ids: List[str]):
+        node = self._nodes_by_id.get(data_item_id)
+        if node is None:
+            node = _Node(data_item_id, operation_id, source_ids, [])
+            self._nodes_by_id[data_item_id] = node
+        else:
+            node.operation_id = operation_id
+            node.source_ids = source_ids
+
+        for source_id in source_ids:
+            source_node = self._nodes_by_id.get(source_id)
+            if source_node is None:
+                source_node = _Node(source_id, None, [], [])
+                self._nodes_by_id[source_id] = source_node
+            source_node.derived_ids.append(data_item_id)
+
+
+def main():
+    source_ids = [generate_id() for _ in range(_NB_SOURCES)]
+    item_ids = [generate_id() for _ in range(_NB_ITEMS)]
+    op_ids = [generate_id() for _ in range(_NB_OPS)]
+    nb_nodes = _NB_SOURCES + _NB_ITEMS
+
+    for name, graph_class in [("dict of nodes", _DictProvGraph), ("arrays", ProvGraph)]:
+
+        def build():
+            graph = graph_class()
+            for i, item_id in enumerate(item_ids):
+                graph.add_node(
+                    item_id,
+                    op_ids[i % _NB_OPS],
+                    source_ids=[source_ids[i % _NB_SOURCES]],
+                )
+            return graph
+
+        # ids are allocated before measuring memory, so that only the memory of
+        # the graph structure is measured
+        tracemalloc.start()
+        graph = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(
+            f"{name}: {nb_nodes} nodes: {memory / 1e6:.1f} MB"
+            f" ({memory / nb_nodes:.0f} bytes/node)"
+        )
+
+        duration = timeit.timeit(build, number=1)
+        print(f"{name}: build: {duration * 1000:.0f} ms")
+        duration = timeit.timeit(
+            lambda: [graph.get_node(uid) for uid in item_ids], number=1
+        )
+        print(f"{name}: get_node() for all items: {duration * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare the "per_rule" and "multi_rule" engines of RegexpMatcher with the
+default rules, on the sentences of the EDS test documents"""
+
+from pathlib import Path
+import re
+import timeit
+
+from medkit.core.text import Segment, Span
+from medkit.text.ner import RegexpMatcher
+
+_PATH_TO_EDS_DOCS = Path(__file__).parent / ".." / "data" / "text" / "eds" / "clean"
+_NB_RUNS = 10
+
+
+def _get_sentences():
+    sentences = []
+    for path in sorted(_PATH_TO_EDS_DOCS.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        for match in re.finditer(r"[^\n.]+", text):
+            sentences.append(
+                Segment(
+                    label="sentence",
+                    spans=[Span(match.start(), match.end())],
+                    text=match.group(),
+                )
+            )
+    return sentences
+
+
+def main():
+    sentences = _get_sentences()
+    print(f"{len(sentences)} sentences, {_NB_RUNS} runs")
+
+    results = {}
+    for engine in ("per_rule", "multi_rule"):
+        matcher = RegexpMatcher(engine=engine)
+        entities = matcher.run(sentences)
+        results[engine] = [(e.label, e.spans, e.metadata) for e in entities]
+        duration = timeit.timeit(lambda: matcher.run(sentences), number=_NB_RUNS)
+        print(f"{engine}: {duration / _NB_RUNS * 1000:.1f} ms/run")
+
+    assert results["per_rule"] == results["multi_rule"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare the iterative and vectorized implementations of span_utils
+operations, on segments with thousands of spans produced by CharReplacer and
+EDSCleaner on the (concatenated) EDS test documents"""
+
+from pathlib import Path
+import timeit
+
+from medkit.core.text import Segment, Span, span_utils
+from medkit.text.preprocessing import CharReplacer, EDSCleaner
+
+_PATH_TO_EDS_DOCS = Path(__file__).parent / ".." / "data" / "text" / "eds"
+_NB_DOCS_COPIES = 20
+_NB_RUNS = 5
+
+
+def _get_segment():
+    text = "\n\n".join(
+        path.read_text(encoding="utf-8")
+        for path in sorted(_PATH_TO_EDS_DOCS.glob("*.txt"))
+    )
+    text = "\n\n".join([text] * _NB_DOCS_COPIES)
+    segment = Segment(label="raw_text", spans=[Span(0, len(text))], text=text)
+    segment = CharReplacer(output_label="replaced").run([segment])[0]
+    return EDSCleaner(output_label="clean").run([segment])[0]
+
+
+def main():
+    segment = _get_segment()
+    text, spans = segment.text, segment.spans
+    print(f"{len(text)} chars, {len(spans)} spans, {_NB_RUNS} runs")
+
+    # replace every comma, remove every other space, extract the first half of
+    # the text and insert a character at each new line
+    commas = [(i, i + 1) for i, c in enumerate(text) if c == ","]
+    spaces = [(i, i + 1) for i, c in enumerate(text) if c == " "][::2]
+    new_lines = [i for i, c in enumerate(text) if c == "\n"]
+    operations = [
+        (
+            "replace()",
+            lambda: span_utils.replace(text, spans, commas, [" ,"] * len(commas)),
+        ),
+        ("remove()", lambda: span_utils.remove(text, spans, spaces)),
+        ("extract()", lambda: span_utils.extract(text, spans, [(0, len(text) // 2)])),
+        (
+            "insert()",
+            lambda: span_utils.insert(text, spans, new_lines, ["-"] * len(new_lines)),
+        ),
+        ("normalize_spans()", lambda: span_utils.normalize_spans(spans)),
+    ]
+
+    for op_name, op in operations:
+        results = {}
+        for impl_name, threshold in [("iterative", float("inf")), ("vectorized", 0)]:
+            span_utils._VECTORIZATION_THRESHOLD = threshold
+            duration = timeit.timeit(op, number=_NB_RUNS)
+            print(f"{op_name} {impl_name}: {duration / _NB_RUNS * 1000:.1f} ms/run")
+            results[impl_name] = op()
+        assert results["iterative"] == results["vectorized"]
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ pytest.importorskip(
 pytest.importorskip(modname="pyannote.audio", reason="pyannote.audio is not installed")
 
 import math  # noqa: E402
+import pickle  # noqa: E402
 from typing import NamedTuple  # noqa: E402
 
 from medkit.core import ProvTracer  # noqa: E402
@@ -227,3 +228,65 @@ def test_prov():
     turn_seg_4 = turn_segs[3]
     prov_4 = prov_tracer.get_prov(turn_seg_4.uid)
     assert prov_4.source_data_items == [input_seg_2]
+
+
+class _InProcessWorkerPool:
+    """Mock of WorkerPool running tasks in the current process, since the mocked
+    pyannote pipeline is not available in spawned worker processes (cf
+    tests/unit/core/test_worker_pool.py for the actual pool)"""
+
+    def __init__(self, nb_workers, initializer, initargs):
+        self.nb_tasks = 0
+        self._initializer = initializer
+        self._initargs = initargs
+
+    def imap(self, func, tasks):
+        self._initializer(*self._initargs)
+        for task in tasks:
+            self.nb_tasks += 1
+            # tasks are sent to workers
+            yield func(pickle.loads(pickle.dumps(task)))
+
+
+def test_nb_workers(mocker):
+    """Segments processed in several worker processes"""
+    mocker.patch(
+        "medkit.audio.segmentation.pa_speaker_detector.WorkerPool",
+        _InProcessWorkerPool,
+    )
+
+    def _create_detector(nb_workers):
+        return PASpeakerDetector(
+            segmentation_model="mock-segmentation-model",
+            embedding_model="mock-segmentation-model",
+            clustering="MockClusteringMethod",
+            pipeline_params={},
+            output_label=_OUTPUT_LABEL,
+            min_nb_speakers=2,
+            max_nb_speakers=2,
+            nb_workers=nb_workers,
+        )
+
+    input_segs = [_get_segment(duration=d) for d in (1.0, 2.0, 3.0, 4.0)]
+    turn_segs = _create_detector(nb_workers=1).run(input_segs)
+    speaker_detector = _create_detector(nb_workers=2)
+    prov_tracer = ProvTracer()
+    speaker_detector.set_prov_tracer(prov_tracer)
+    parallel_turn_segs = speaker_detector.run(input_segs)
+
+    assert len(parallel_turn_segs) == len(turn_segs) == 8
+    for parallel_turn_seg, turn_seg in zip(parallel_turn_segs, turn_segs):
+        assert parallel_turn_seg.span == turn_seg.span
+        assert parallel_turn_seg.attrs.get()[0].value == turn_seg.attrs.get()[0].value
+        assert signals_are_equal(parallel_turn_seg.audio.read(), turn_seg.audio.read())
+
+    # provenance is recorded in main process
+    prov = prov_tracer.get_prov(parallel_turn_segs[2].uid)
+    assert prov.source_data_items == [input_segs[1]]
+
+    # single segments are also processed by workers
+    speaker_detector.run(input_segs[:1])
+    assert speaker_detector._worker_pool.nb_tasks == 5
+
+    with pytest.raises(ValueError, match="nb_workers"):
+        _create_detector(nb_workers=0)
@@ -152,3 +152,36 @@ def test_prov():
     voice_seg_4 = voice_segs[3]
     prov_4 = prov_tracer.get_prov(voice_seg_4.uid)
     assert prov_4.source_data_items == [seg_2]
+
+
+@pytest.mark.parametrize("block_duration", [0.0, 0.37, 1.0, 100.0])
+def test_block_duration(block_duration):
+    """Reading audio by blocks gives the same segments"""
+    voice_signal, sample_rate = sf.read(
+        _PATH_TO_VOICE_FILE, always_2d=True, dtype=np.float32
+    )
+    voice_signal = voice_signal.T
+    seg = _get_segment(voice_signal, sample_rate, silence_duration=3.0)
+
+    detector = WebRTCVoiceDetector(output_label=_OUTPUT_LABEL)
+    voice_segs = detector.run([seg])
+    block_detector = WebRTCVoiceDetector(
+        output_label=_OUTPUT_LABEL, block_duration=block_duration
+    )
+    block_voice_segs = block_detector.run([seg])
+
+    assert len(block_voice_segs) == len(voice_segs) == 2
+    for block_voice_seg, voice_seg in zip(block_voice_segs, voice_segs):
+        assert block_voice_seg.span == voice_seg.span
+        assert signals_are_equal(block_voice_seg.audio.read(), voice_seg.audio.read())
+
+
+@pytest.mark.parametrize("block_duration", [None, 1.0])
+def test_empty_segment(block_duration):
+    """No voice segment is found in empty audio"""
+    audio = MemoryAudioBuffer(np.zeros((1, 0), dtype=np.float32), 16000)
+    seg = Segment(label="raw", span=Span(0.0, 0.0), audio=audio)
+    detector = WebRTCVoiceDetector(
+        output_label=_OUTPUT_LABEL, block_duration=block_duration
+    )
+    assert detector.run([seg]) == []
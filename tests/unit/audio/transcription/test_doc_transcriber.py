@@ -227,3 +227,67 @@ def test_custom_full_text():
         " text number 2."
     )
     assert text_doc.text == expected_text
+
+
+class _DurationTranscriberFunction(TranscriberFunction):
+    """Mock transcriber function returning the duration of each audio, and
+    recording the durations of each batch"""
+
+    def __init__(self) -> None:
+        self.batch_durations = []
+
+    def transcribe(self, audios):
+        durations = [audio.duration for audio in audios]
+        self.batch_durations.append(durations)
+        return [f"Duration {d}." for d in durations]
+
+    def description(self):
+        return TranscriberFunctionDescription("TranscriberFunc")
+
+
+def test_batch_size():
+    """Segments of all docs transcribed by batches sorted by duration"""
+
+    audio_docs = [
+        _get_audio_doc([AudioSpan(0.0, 2.0), AudioSpan(2.0, 2.5)]),
+        _get_audio_doc([]),
+        _get_audio_doc(
+            [AudioSpan(0.0, 1.0), AudioSpan(1.5, 1.75), AudioSpan(2.0, 3.5)]
+        ),
+    ]
+
+    transcriber_func = _DurationTranscriberFunction()
+    doc_transcriber = DocTranscriber(
+        input_label=_AUDIO_LABEL,
+        output_label=_TEXT_LABEL,
+        transcriber_func=transcriber_func,
+    )
+    expected_text_docs = doc_transcriber.run(audio_docs)
+
+    batch_transcriber_func = _DurationTranscriberFunction()
+    batch_doc_transcriber = DocTranscriber(
+        input_label=_AUDIO_LABEL,
+        output_label=_TEXT_LABEL,
+        transcriber_func=batch_transcriber_func,
+        batch_size=2,
+    )
+    text_docs = batch_doc_transcriber.run(audio_docs)
+
+    # same docs as without batches
+    assert len(text_docs) == len(expected_text_docs)
+    for text_doc, expected_text_doc, audio_doc in zip(
+        text_docs, expected_text_docs, audio_docs
+    ):
+        assert text_doc.text == expected_text_doc.text
+        assert text_doc.audio_doc_id == audio_doc.uid
+        assert (
+            text_doc.text_spans_to_audio_spans
+            == expected_text_doc.text_spans_to_audio_spans
+        )
+
+    # batches contain segments of all docs, sorted by duration
+    assert batch_transcriber_func.batch_durations == [
+        [0.25, 0.5],
+        [1.0, 1.5],
+        [2.0],
+    ]
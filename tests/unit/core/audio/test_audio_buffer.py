@@ -1,6 +1,10 @@
+import os
+
 import pytest
 import soundfile as sf
 
+from medkit.core.audio import set_file_audio_cache
+from medkit.core.audio._file_cache import get_file_audio_cache
 from medkit.core.audio.audio_buffer import FileAudioBuffer, MemoryAudioBuffer
 from tests.audio_utils import generate_sin_signal, signals_are_equal
 
@@ -130,3 +134,94 @@ def test_file_buffer_trim(tmp_path):
 
     _test_trim(audio)
     _test_trim_duration(audio)
+
+
+@pytest.fixture()
+def small_cache():
+    # small blocks to test reads across several blocks, and small max size to
+    # test eviction
+    set_file_audio_cache(max_size=3 * 100 * 2 * 4, block_size=100)
+    yield
+    set_file_audio_cache()
+
+
+@pytest.mark.parametrize("subtype", ["FLOAT", "PCM_16"])
+def test_file_buffer_cache(tmp_path, small_cache, subtype):
+    """Cached reads of FileAudioBuffer (spanning several blocks)"""
+    sample_rate = 4000
+    signal = generate_sin_signal(duration=0.25, sample_rate=sample_rate, nb_channels=2)
+    path = tmp_path / "audio.wav"
+    sf.write(path, signal.T, sample_rate, subtype=subtype)
+    expected_signal, _ = sf.read(path, always_2d=True, dtype="float32")
+    expected_signal = expected_signal.T
+    audio = FileAudioBuffer(path)
+
+    for start, end in [(0, 50), (20, 250), (150, 180), (0, 1000), (950, 1000)]:
+        for _ in range(2):
+            assert signals_are_equal(
+                audio.trim(start, end).read(), expected_signal[:, start:end]
+            )
+    _test_read(audio, expected_signal)
+
+
+def test_file_buffer_cache_large_read(tmp_path, small_cache):
+    """Reads larger than the cache bypass it, and small reads can be returned
+    without copy"""
+    sample_rate = 4000
+    signal = generate_sin_signal(duration=0.25, sample_rate=sample_rate, nb_channels=2)
+    path = tmp_path / "audio.wav"
+    sf.write(path, signal.T, sample_rate, subtype="FLOAT")
+    audio = FileAudioBuffer(path)
+    cache = get_file_audio_cache()
+
+    assert signals_are_equal(audio.trim(0, 150).read(), signal[:, :150])
+    assert len(cache._blocks) == 2
+    # previously cached blocks are not evicted by a large read
+    assert signals_are_equal(audio.read(), signal)
+    assert len(cache._blocks) == 2
+
+    # samples of cached blocks can't be modified by readers
+    view = audio.trim(10, 20).read()
+    assert not view.flags.writeable
+    copy = audio.trim(10, 20).read(copy=True)
+    assert copy.flags.writeable
+    copy[:] = 0.0
+    assert signals_are_equal(audio.trim(10, 20).read(), signal[:, 10:20])
+
+
+def test_file_buffer_cache_modified_file(tmp_path, small_cache):
+    """Modified files are not read from the cache"""
+    sample_rate = 4000
+    path = tmp_path / "audio.wav"
+    signal = generate_sin_signal(duration=0.25, sample_rate=sample_rate, nb_channels=2)
+    sf.write(path, signal.T, sample_rate, subtype="FLOAT")
+    assert signals_are_equal(FileAudioBuffer(path).read(), signal)
+
+    other_signal = signal * 0.5
+    sf.write(path, other_signal.T, sample_rate, subtype="FLOAT")
+    # make sure modification time is different
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert signals_are_equal(FileAudioBuffer(path).read(), other_signal)
+
+
+def test_file_buffer_mmap_cache(tmp_path):
+    """Reads of FileAudioBuffer through memory-mapped cache files"""
+    cache_dir = tmp_path / "cache"
+    set_file_audio_cache(cache_dir=cache_dir)
+    try:
+        sample_rate = 4000
+        signal = generate_sin_signal(
+            duration=0.25, sample_rate=sample_rate, nb_channels=2
+        )
+        path = tmp_path / "audio.flac"
+        sf.write(path, signal.T, sample_rate, subtype="PCM_24")
+        expected_signal, _ = sf.read(path, always_2d=True, dtype="float32")
+        expected_signal = expected_signal.T
+        audio = FileAudioBuffer(path)
+
+        _test_read(audio, expected_signal)
+        _test_trim(audio)
+        assert len(list(cache_dir.glob("*.npy"))) == 1
+    finally:
+        set_file_audio_cache()
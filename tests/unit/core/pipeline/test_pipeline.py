@@ -494,3 +494,32 @@ def test_input_aggregation():
     assert [a.text.upper() for a in sentence_segs_1 + sentence_segs_2] == [
         a.text for a in uppercased_segs
     ]
+
+
+def test_run_iter():
+    """Pipeline run on successive batches of input data"""
+    uppercaser = _Uppercaser()
+    step = PipelineStep(uppercaser, input_keys=["SENTENCE"], output_keys=["UPPERCASE"])
+    pipeline = Pipeline(
+        steps=[step],
+        input_keys=step.input_keys,
+        output_keys=step.output_keys,
+    )
+
+    # input segments are consumed lazily
+    sentence_segs = (_Segment(text) for text in _SENTENCES)
+    all_uppercased_segs = list(pipeline.run_iter(sentence_segs, batch_size=2))
+
+    assert [[s.text for s in segs] for segs in all_uppercased_segs] == [
+        [_SENTENCES[0].upper(), _SENTENCES[1].upper()],
+        [_SENTENCES[2].upper()],
+    ]
+
+    # several input keys are not supported
+    pipeline = Pipeline(
+        steps=[step],
+        input_keys=["SENTENCE", "OTHER"],
+        output_keys=step.output_keys,
+    )
+    with pytest.raises(ValueError, match="single input key"):
+        next(pipeline.run_iter(_get_sentence_segments()))
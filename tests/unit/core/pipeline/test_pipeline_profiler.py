@@ -0,0 +1,146 @@
+import json
+import tracemalloc
+
+from medkit.core.pipeline import Pipeline, PipelineStep
+from medkit.core.pipeline_profiler import PipelineProfiler
+
+
+class _Segment:
+    """Mock text segment"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+_SENTENCES = [
+    "This is a sentence",
+    "This is another sentence",
+    "This is the last sentence",
+]
+
+
+def _get_sentence_segments():
+    return [_Segment(text) for text in _SENTENCES]
+
+
+class _Splitter:
+    """Mock processing operation splitting segments in words"""
+
+    def run(self, segments):
+        return [_Segment(word) for segment in segments for word in segment.text.split()]
+
+
+class _Filter:
+    """Mock processing operation keeping long segments and allocating memory"""
+
+    def run(self, segments):
+        self.buffer = bytearray(100_000)
+        del self.buffer
+        return [segment for segment in segments if len(segment.text) > 4]
+
+
+def _get_pipeline():
+    splitter_step = PipelineStep(_Splitter(), input_keys=["SENT"], output_keys=["WORD"])
+    filter_step = PipelineStep(_Filter(), input_keys=["WORD"], output_keys=["LONG"])
+    return Pipeline(
+        steps=[splitter_step, filter_step],
+        input_keys=["SENT"],
+        output_keys=["LONG"],
+    )
+
+
+def test_basic():
+    pipeline = _get_pipeline()
+    profiler = PipelineProfiler()
+    pipeline.set_profiler(profiler)
+
+    pipeline.run(_get_sentence_segments())
+    pipeline.run(_get_sentence_segments())
+
+    splitter_profile, filter_profile = profiler.get_report()
+    assert splitter_profile.operation_name == "_Splitter"
+    assert splitter_profile.operation_id is None
+    assert splitter_profile.input_keys == ["SENT"]
+    assert splitter_profile.output_keys == ["WORD"]
+    assert splitter_profile.nb_calls == 2
+    assert splitter_profile.nb_input_items == 6
+    assert splitter_profile.nb_output_items == 26
+    assert splitter_profile.wall_time > 0.0
+    assert splitter_profile.cpu_time >= 0.0
+    assert splitter_profile.peak_memory is None
+
+    assert filter_profile.operation_name == "_Filter"
+    assert filter_profile.nb_input_items == 26
+    assert filter_profile.nb_output_items == 8
+
+    # disable profiling
+    pipeline.set_profiler(None)
+    pipeline.run(_get_sentence_segments())
+    assert profiler.get_report()[0].nb_calls == 2
+
+    profiler.reset()
+    assert profiler.get_report() == []
+
+
+def test_trace_memory():
+    pipeline = _get_pipeline()
+    profiler = PipelineProfiler(trace_memory=True)
+    pipeline.set_profiler(profiler)
+    pipeline.run(_get_sentence_segments())
+
+    _, filter_profile = profiler.get_report()
+    assert filter_profile.peak_memory >= 100_000
+
+
+def test_nested_pipeline(tmp_path):
+    sub_pipeline = _get_pipeline()
+    step = PipelineStep(sub_pipeline, input_keys=["SENT"], output_keys=["LONG"])
+    pipeline = Pipeline(steps=[step], input_keys=["SENT"], output_keys=["LONG"])
+
+    profiler = PipelineProfiler(trace_memory=True)
+    pipeline.set_profiler(profiler)
+    pipeline.run(_get_sentence_segments())
+
+    report = profiler.get_report()
+    assert len(report) == 1
+    pipeline_profile = report[0]
+    assert pipeline_profile.operation_name == "Pipeline"
+    assert pipeline_profile.operation_id == sub_pipeline.uid
+    assert pipeline_profile.nb_input_items == 3
+    assert pipeline_profile.nb_output_items == 4
+    # peak memory of nested steps is included in peak memory of outer step
+    assert pipeline_profile.peak_memory >= 100_000
+
+    splitter_profile, filter_profile = pipeline_profile.sub_steps
+    assert splitter_profile.nb_output_items == 13
+    assert filter_profile.nb_output_items == 4
+    assert pipeline_profile.wall_time >= (
+        splitter_profile.wall_time + filter_profile.wall_time
+    )
+
+    # export to json
+    output_file = tmp_path / "profile.json"
+    profiler.save_json(output_file)
+    with open(output_file) as fp:
+        data = json.load(fp)
+    assert data == profiler.to_dict()
+    assert data["steps"][0]["sub_steps"][1]["nb_output_items"] == 4
+
+
+def test_trace_memory_without_reset_peak(monkeypatch):
+    """Peak memory is measured on python < 3.9, which has no
+    tracemalloc.reset_peak()"""
+    monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+
+    sub_pipeline = _get_pipeline()
+    step = PipelineStep(sub_pipeline, input_keys=["SENT"], output_keys=["LONG"])
+    pipeline = Pipeline(steps=[step], input_keys=["SENT"], output_keys=["LONG"])
+    profiler = PipelineProfiler(trace_memory=True)
+    pipeline.set_profiler(profiler)
+    pipeline.run(_get_sentence_segments())
+
+    pipeline_profile = profiler.get_report()[0]
+    assert pipeline_profile.peak_memory >= 100_000
+    _, filter_profile = pipeline_profile.sub_steps
+    assert filter_profile.peak_memory >= 100_000
+    assert not tracemalloc.is_tracing()
@@ -1,3 +1,5 @@
+import pytest
+
 from medkit.core import generate_id
 from medkit.core import AnnotationContainer
 
@@ -47,3 +49,53 @@ def test_basic():
     assert list(iter(anns)) == anns.get()  # __iter__()
 
     assert anns.get_by_id(ann_1.uid) == ann_1
+
+
+def test_duplicate():
+    anns = AnnotationContainer(doc_id="id")
+    ann = _MockAnnotation("name", "Bob")
+    anns.add(ann)
+    with pytest.raises(ValueError, match="already exists"):
+        anns.add(ann)
+    assert len(anns) == 1
+
+
+def test_insertion_order():
+    """Filtered annotations are returned in insertion order"""
+
+    anns = AnnotationContainer(doc_id="id")
+    added_anns = [
+        _MockAnnotation(
+            label="topic" if i % 2 else "name",
+            value=i,
+            keys={"entities"} if i % 3 else set(),
+        )
+        for i in range(20)
+    ]
+    for ann in added_anns:
+        anns.add(ann)
+
+    assert anns.get() == added_anns
+    assert anns.get(label="topic") == [a for a in added_anns if a.label == "topic"]
+    assert anns.get(key="entities") == [a for a in added_anns if a.keys]
+    assert anns.get(label="topic", key="entities") == [
+        a for a in added_anns if a.label == "topic" and a.keys
+    ]
+
+
+def test_add_while_iterating():
+    """Annotations can be added while iterating over annotation ids"""
+
+    anns = AnnotationContainer(doc_id="id")
+    ann = _MockAnnotation("name", "Bob", keys={"entities"})
+    anns.add(ann)
+
+    for uids in (
+        anns.get_ids(),
+        anns.get_ids(label="name"),
+        anns.get_ids(key="entities"),
+        anns.get_ids(label="name", key="entities"),
+    ):
+        for uid in uids:
+            anns.add(_MockAnnotation("name", "Alice", keys={"entities"}))
+        assert uid == ann.uid
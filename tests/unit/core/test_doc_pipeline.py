@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 from medkit.core import (
     generate_id,
     AnnotationContainer,
@@ -7,8 +9,12 @@ from medkit.core import (
     AttributeContainer,
     Pipeline,
     PipelineStep,
+    ProvTracer,
 )
 from medkit.core.doc_pipeline import DocPipeline
+from medkit.core.store import GlobalStore, create_store
+from medkit.core.text import TextDocument
+from medkit.text.ner import RegexpMatcher, RegexpMatcherRule
 
 
 _SENTENCES = [
@@ -400,3 +406,148 @@ def test_key_group():
     uppercased_anns = doc.anns.get(label="uppercased_sentence")
     for ann in uppercased_anns:
         assert ann.keys == {"UPPERCASE"}
+
+
+def _get_multi_step_pipeline():
+    uppercaser = _Uppercaser(output_label="uppercased_sentence")
+    step_1 = PipelineStep(
+        operation=uppercaser,
+        input_keys=["SENTENCE"],
+        output_keys=["UPPERCASE"],
+    )
+    prefixer = _Prefixer(output_label="prefixed_entity", prefix="Hello! ")
+    step_2 = PipelineStep(
+        operation=prefixer,
+        input_keys=["ENTITY"],
+        output_keys=["PREFIX"],
+    )
+    attribute_adder = _AttributeAdder(output_label="validated")
+    step_3 = PipelineStep(
+        operation=attribute_adder,
+        input_keys=["SENTENCE"],
+        output_keys=[],
+    )
+    return Pipeline(
+        steps=[step_1, step_2, step_3],
+        input_keys=["SENTENCE", "ENTITY"],
+        output_keys=["UPPERCASE", "PREFIX"],
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3])
+def test_multiprocess(chunk_size):
+    """Doc pipeline running in several worker processes"""
+    pipeline = _get_multi_step_pipeline()
+    labels_by_input_key = {"SENTENCE": ["sentence"], "ENTITY": ["entity"]}
+    doc_pipeline = DocPipeline(pipeline, labels_by_input_key)
+    mp_doc_pipeline = DocPipeline(
+        pipeline, labels_by_input_key, nb_workers=2, chunk_size=chunk_size
+    )
+
+    docs = [_get_doc() for _ in range(5)]
+    mp_docs = [_get_doc() for _ in range(5)]
+    doc_pipeline.run(docs)
+    mp_doc_pipeline.run(mp_docs)
+
+    for doc, mp_doc in zip(docs, mp_docs):
+        # same output annotations added in same order
+        assert [(a.label, a.text) for a in mp_doc.anns] == [
+            (a.label, a.text) for a in doc.anns
+        ]
+        # attributes added to original input annotations
+        for ann in mp_doc.anns.get(label="sentence"):
+            attrs = ann.attrs.get(label="validated")
+            assert len(attrs) == 1 and attrs[0].value is True
+
+
+def test_multiprocess_prov():
+    """Provenance of a doc pipeline running in several worker processes"""
+    rule = RegexpMatcherRule(regexp="sentence", label="word")
+    matcher = RegexpMatcher(rules=[rule])
+    step = PipelineStep(matcher, input_keys=["RAW"], output_keys=["ENTITY"])
+    pipeline = Pipeline(steps=[step], input_keys=["RAW"], output_keys=["ENTITY"])
+    labels_by_input_key = {"RAW": [TextDocument.RAW_LABEL]}
+    doc_pipeline = DocPipeline(pipeline, labels_by_input_key, nb_workers=2)
+
+    prov_tracer = ProvTracer()
+    doc_pipeline.set_prov_tracer(prov_tracer)
+    docs = [TextDocument(text=text) for text in _SENTENCES]
+    doc_pipeline.run(docs)
+
+    for doc in docs:
+        entity = doc.anns.get_entities()[0]
+        assert entity.text == "sentence"
+        prov = prov_tracer.get_prov(entity.uid)
+        assert prov.data_item is entity
+        assert prov.op_desc.uid == pipeline.uid
+        assert prov.source_data_items == [doc.raw_segment]
+
+        sub_tracer = prov_tracer.get_sub_prov_tracer(pipeline.uid)
+        sub_prov = sub_tracer.get_prov(entity.uid)
+        assert sub_prov.op_desc == matcher.description
+        assert sub_prov.source_data_items == [doc.raw_segment]
+
+
+def test_invalid_nb_workers():
+    pipeline = _get_multi_step_pipeline()
+    with pytest.raises(ValueError, match="nb_workers"):
+        DocPipeline(pipeline, {"SENTENCE": ["sentence"]}, nb_workers=0)
+
+
+@pytest.mark.parametrize("nb_workers", [1, 2])
+def test_run_iter(nb_workers):
+    """Doc pipeline run on documents returned by a generator"""
+    pipeline = _get_multi_step_pipeline()
+    labels_by_input_key = {"SENTENCE": ["sentence"], "ENTITY": ["entity"]}
+    doc_pipeline = DocPipeline(pipeline, labels_by_input_key, nb_workers=nb_workers)
+
+    nb_docs_loaded = 0
+
+    def load_docs():
+        nonlocal nb_docs_loaded
+        for _ in range(5):
+            nb_docs_loaded += 1
+            yield _get_doc()
+
+    docs_iter = doc_pipeline.run_iter(load_docs(), batch_size=2)
+    # only the first batch was loaded
+    doc = next(docs_iter)
+    assert nb_docs_loaded == 2
+    docs = [doc] + list(docs_iter)
+    assert nb_docs_loaded == 5
+    assert len(docs) == 5
+
+    for doc in docs:
+        sentence_anns = doc.anns.get(label="sentence")
+        uppercased_anns = doc.anns.get(label="uppercased_sentence")
+        expected_texts = [a.text.upper() for a in sentence_anns]
+        assert [a.text for a in uppercased_anns] == expected_texts
+
+
+@pytest.mark.parametrize("nb_workers", [1, 2])
+def test_run_iter_release(nb_workers):
+    """Annotations of documents returned by run_iter() are released from the
+    store"""
+    GlobalStore.del_store()
+    store = create_store("disk", cache_size=10)
+    GlobalStore.init_store(store)
+
+    pipeline = _get_multi_step_pipeline()
+    labels_by_input_key = {"SENTENCE": ["sentence"], "ENTITY": ["entity"]}
+    doc_pipeline = DocPipeline(pipeline, labels_by_input_key, nb_workers=nb_workers)
+
+    docs = (_get_doc() for _ in range(5))
+    nb_docs = 0
+    for doc in doc_pipeline.run_iter(docs, batch_size=2, release=True):
+        # returned document can be used until the next one is requested
+        assert len(doc.anns.get(label="uppercased_sentence")) == len(_SENTENCES)
+        nb_docs += 1
+    assert nb_docs == 5
+
+    # nothing left in the store
+    assert len(store._cache) == 0
+    nb_rows = store._conn.execute("SELECT COUNT(*) FROM data_items").fetchone()
+    assert nb_rows[0] == 0
+
+    GlobalStore.del_store()
+    store.close()
@@ -0,0 +1,60 @@
+import multiprocessing
+import uuid
+
+import pytest
+
+from medkit.core.id import (
+    generate_compact_id,
+    generate_id,
+    generate_uuid,
+    set_id_generator,
+)
+
+
+@pytest.fixture(autouse=True)
+def _restore_generator():
+    yield
+    set_id_generator("uuid")
+
+
+def test_default():
+    uid = generate_id()
+    assert uuid.UUID(uid)
+
+
+def test_compact():
+    set_id_generator("compact")
+    uids = [generate_id() for _ in range(1000)]
+    assert len(set(uids)) == 1000
+    assert all(isinstance(uid, str) and len(uid) < 24 for uid in uids)
+    # same process prefix
+    assert len({uid.split("-")[0] for uid in uids}) == 1
+
+
+def test_compact_forked_processes():
+    context = multiprocessing.get_context("fork")
+    with context.Pool(2) as pool:
+        uids = pool.map(_generate_compact_ids, range(4))
+    uids = [uid for process_uids in uids for uid in process_uids]
+    uids += _generate_compact_ids()
+    assert len(set(uids)) == len(uids)
+
+
+def _generate_compact_ids(_=None):
+    return [generate_compact_id() for _ in range(10)]
+
+
+def test_custom():
+    counter = iter(range(10))
+    set_id_generator(lambda: f"id-{next(counter)}")
+    assert generate_id() == "id-0"
+    assert generate_id() == "id-1"
+
+    set_id_generator("uuid")
+    assert uuid.UUID(generate_id())
+    assert uuid.UUID(generate_uuid())
+
+
+def test_unsupported():
+    with pytest.raises(ValueError, match="Unsupported id generator"):
+        set_id_generator("uuid4")
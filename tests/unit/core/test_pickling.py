@@ -0,0 +1,44 @@
+from medkit.core import Attribute, GlobalStore
+from medkit.core._pickling import dumps, loads
+from medkit.core.text import Entity, Span, TextDocument
+
+
+def _get_entity():
+    entity = Entity(label="disease", spans=[Span(0, 7)], text="Diabète")
+    entity.attrs.add(Attribute(label="is_negated", value=False))
+    return entity
+
+
+def test_unpickle_annotation():
+    """Unpickling an annotation doesn't modify the global store"""
+
+    entity = _get_entity()
+    attr = entity.attrs.get()[0]
+    entity_copy = loads(dumps(entity))
+    attr_copy = entity_copy.attrs.get()[0]
+    assert attr_copy == attr and attr_copy is not attr
+
+    # original attribute is still the one in the store
+    store = GlobalStore.get_store()
+    assert store.get_data_item(attr.uid) is attr
+    assert entity.attrs.get()[0] is attr
+
+    # attributes are added to the store with the annotation
+    doc = TextDocument(text="Diabète")
+    doc.anns.add(entity_copy)
+    assert store.get_data_item(attr.uid) is attr_copy
+    assert entity_copy.attrs.get()[0] is attr_copy
+
+
+def test_unpickle_document():
+    doc = TextDocument(text="Diabète")
+    doc.anns.add(_get_entity())
+    doc_copy = loads(dumps(doc))
+    assert doc_copy.anns.get_entities() == doc.anns.get_entities()
+
+    # annotations of unpickled documents and their attributes are in the store
+    store = GlobalStore.get_store()
+    entity_copy = doc_copy.anns.get_entities()[0]
+    attr_copy = entity_copy.attrs.get()[0]
+    assert store.get_data_item(entity_copy.uid) is entity_copy
+    assert store.get_data_item(attr_copy.uid) is attr_copy
@@ -206,6 +206,10 @@ def test_sub_graph_basic():
     assert graph.get_sub_graphs() == [sub_graph_1, sub_graph_2]
     assert graph.has_sub_graph(node_2.operation_id)
     assert graph.get_sub_graph(node_2.operation_id) == sub_graph_2
+    assert list(graph.iter_sub_graphs()) == [
+        (node_1.operation_id, sub_graph_1),
+        (node_2.operation_id, sub_graph_2),
+    ]
 
     # add a sub graph for an operation not in the main graph
     sub_graph_3 = _gen_simple_graph()
@@ -354,3 +358,57 @@ def test_sanity_check():
         Exception, match="Source identifier .* has no corresponding node"
     ):
         graph_6.check_sanity()
+
+
+def test_node_accessors(mocker):
+    """Operation and source ids can be retrieved without building nodes"""
+    graph = _gen_simple_graph()
+    node_1, node_2, _ = graph.get_nodes()
+    build_node_spy = mocker.spy(graph, "_build_node")
+    assert graph.get_operation_id(node_2.data_item_id) == node_2.operation_id
+    assert graph.get_source_ids(node_2.data_item_id) == [node_1.data_item_id]
+    assert build_node_spy.call_count == 0
+
+    with pytest.raises(KeyError):
+        graph.get_node(generate_id())
+    with pytest.raises(KeyError):
+        graph.get_operation_id(generate_id())
+
+
+def test_init_from_nodes_order():
+    """Nodes order is preserved when they reference each other (indices of
+    referenced ids must not be allocated before the ids of the nodes)"""
+    ids = [generate_id() for _ in range(3)]
+    op_id = generate_id()
+    nodes = [
+        ProvNode(ids[0], op_id, source_ids=[ids[2]], derived_ids=[]),
+        ProvNode(ids[1], op_id, source_ids=[], derived_ids=[]),
+        ProvNode(ids[2], None, source_ids=[], derived_ids=[ids[0]]),
+    ]
+    graph = ProvGraph(nodes=nodes)
+    assert graph.get_nodes() == nodes
+    graph.check_sanity()
+
+
+def test_update():
+    """Merge nodes of a graph built separately"""
+    graph = ProvGraph()
+    input_id = generate_id()
+    op_id = generate_id()
+    output_id_1 = generate_id()
+    graph.add_node(output_id_1, op_id, source_ids=[input_id])
+
+    other_graph = ProvGraph()
+    output_id_2 = generate_id()
+    other_graph.add_node(output_id_2, op_id, source_ids=[input_id])
+    sub_graph = _gen_simple_graph()
+    other_graph.add_sub_graph(op_id, sub_graph)
+
+    graph.update(other_graph)
+    graph.check_sanity()
+
+    input_node = graph.get_node(input_id)
+    assert input_node.operation_id is None
+    assert input_node.derived_ids == [output_id_1, output_id_2]
+    assert graph.get_node(output_id_2).source_ids == [input_id]
+    assert graph.get_sub_graph(op_id).get_nodes() == sub_graph.get_nodes()
@@ -0,0 +1,105 @@
+import pytest
+
+from medkit.core import (
+    generate_id,
+    Attribute,
+    OperationDescription,
+    ProvTracer,
+    create_prov_store,
+)
+from medkit.core._prov_graph import ProvGraph
+from medkit.core.text import Entity, Span
+from tests.unit.core.prov_tracer._common import Generator, Prefixer
+
+
+def test_create_unknown_store():
+    with pytest.raises(ValueError, match="Unsupported store type"):
+        create_prov_store("unknown")
+
+
+def test_sqlite_store(tmp_path):
+    store = create_prov_store("sqlite", path=tmp_path / "prov.db", batch_size=2)
+
+    entities = []
+    for i in range(3):
+        entity = Entity(label="disease", spans=[Span(0, 7)], text="Diabète")
+        entity.attrs.add(Attribute(label="negated", value=bool(i % 2)))
+        store.store_data_item(entity)
+        entities.append(entity)
+    op_desc = OperationDescription(uid="op", name="Matcher")
+    store.store_op_desc(op_desc)
+
+    # first 2 entities were written, last one is still pending
+    assert store.get_data_item(entities[2].uid) is entities[2]
+    entity = store.get_data_item(entities[0].uid)
+    assert entity is not entities[0]
+    assert entity == entities[0]
+    assert entity.attrs.get() == entities[0].attrs.get()
+    assert store.get_op_desc("op") == op_desc
+
+    with pytest.raises(KeyError):
+        store.get_data_item("unknown")
+
+    # data is available from another store using the same database
+    store.close()
+    other_store = create_prov_store("sqlite", path=tmp_path / "prov.db")
+    assert other_store.get_data_item(entities[2].uid) == entities[2]
+    assert other_store.get_op_desc("op") == op_desc
+    other_store.close()
+
+
+def test_save_and_load_tracer(tmp_path):
+    store = create_prov_store("sqlite", path=tmp_path / "prov.db", batch_size=2)
+    tracer = ProvTracer(store)
+    generator = Generator(tracer)
+    prefixer = Prefixer(tracer)
+    items = generator.generate(3)
+    prefixed_items = prefixer.prefix(items)
+    tracer.save_graph()
+    store.close()
+
+    store = create_prov_store("sqlite", path=tmp_path / "prov.db")
+    loaded_tracer = ProvTracer.load(store)
+    loaded_tracer._graph.check_sanity()
+    assert len(loaded_tracer.get_provs()) == len(items) + len(prefixed_items)
+    for item, prefixed_item in zip(items, prefixed_items):
+        prov = loaded_tracer.get_prov(prefixed_item.uid)
+        assert prov.data_item.text == prefixed_item.text
+        assert prov.op_desc == prefixer.description
+        assert [i.uid for i in prov.source_data_items] == [item.uid]
+    store.close()
+
+
+def test_save_graph_unsupported_store(tmp_path):
+    tracer = ProvTracer()
+    with pytest.raises(TypeError):
+        tracer.save_graph()
+
+    store = create_prov_store("sqlite", path=tmp_path / "prov.db")
+    with pytest.raises(ValueError, match="No provenance graph"):
+        ProvTracer.load(store)
+    store.close()
+
+
+def test_save_graph_with_sub_graphs(tmp_path):
+    store = create_prov_store("sqlite", path=tmp_path / "prov.db")
+    ids = [generate_id() for _ in range(4)]
+    op_id, sub_op_id, sub_sub_op_id = (generate_id() for _ in range(3))
+    sub_sub_graph = ProvGraph()
+    sub_sub_graph.add_node(ids[3], sub_sub_op_id, source_ids=[ids[0]])
+    sub_graph = ProvGraph()
+    sub_graph.add_node(ids[2], sub_op_id, source_ids=[ids[0]])
+    sub_graph.add_sub_graph(sub_op_id, sub_sub_graph)
+    graph = ProvGraph()
+    graph.add_node(ids[1], op_id, source_ids=[ids[0]])
+    graph.add_sub_graph(op_id, sub_graph)
+
+    # empty graph
+    store.save_graph(ProvGraph())
+    assert store.load_graph().to_dict() == ProvGraph().to_dict()
+
+    store.save_graph(graph)
+    loaded_graph = store.load_graph()
+    assert loaded_graph.to_dict() == graph.to_dict()
+    loaded_graph.check_sanity()
+    store.close()
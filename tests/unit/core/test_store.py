@@ -1,6 +1,10 @@
+import gc
+
 import pytest
 
-from medkit.core.store import _DictStore, GlobalStore
+from medkit.core import Attribute
+from medkit.core.store import _DictStore, GlobalStore, create_store
+from medkit.core.text import Entity, Span, TextDocument
 
 
 class SubStore(_DictStore):
@@ -19,3 +23,101 @@ def test_global_store_init_store_error():
     assert isinstance(store, _DictStore)
     with pytest.raises(RuntimeError):
         GlobalStore.init_store(SubStore())
+
+
+@pytest.fixture()
+def disk_store():
+    GlobalStore.del_store()
+    store = create_store("disk", cache_size=10)
+    GlobalStore.init_store(store)
+    yield store
+    GlobalStore.del_store()
+    store.close()
+
+
+def _get_doc(nb_entities):
+    doc = TextDocument(text="Diabète de type 2")
+    for i in range(nb_entities):
+        entity = Entity(label="disease", spans=[Span(0, 7)], text="Diabète")
+        entity.attrs.add(Attribute(label="index", value=i))
+        doc.anns.add(entity)
+    return doc
+
+
+def test_create_unknown_store():
+    with pytest.raises(ValueError, match="Unsupported store type"):
+        create_store("unknown")
+
+
+def test_dict_store_release_unsupported():
+    store = _DictStore()
+    GlobalStore.del_store()
+    GlobalStore.init_store(store)
+    doc = _get_doc(3)
+    with pytest.raises(TypeError, match="can't release data items"):
+        doc.anns.release()
+    assert len(doc.anns.get_entities()) == 3
+    GlobalStore.del_store()
+
+
+def test_release_moved_annotation(disk_store):
+    doc = _get_doc(1)
+    entity = doc.anns.get_entities()[0]
+    other_doc = TextDocument(text="Diabète de type 2")
+    other_doc.anns.add(entity)
+
+    # annotation now belongs to other_doc and is not released with doc
+    doc.anns.release()
+    assert other_doc.anns.get_entities() == [entity]
+
+
+def test_disk_store(disk_store):
+    doc = _get_doc(20)
+    entities = doc.anns.get_entities()
+    # only the most recently used items are kept in memory
+    assert len(disk_store._cache) <= 10
+
+    # evicted items still in use are returned as is
+    assert doc.anns.get_entities() == entities
+    assert all(a is b for a, b in zip(doc.anns.get_entities(), entities))
+
+    # other evicted items are loaded from the database
+    uids = [e.uid for e in entities]
+    del entities
+    gc.collect()
+    disk_store._evicted_items.clear()
+    entities = doc.anns.get_entities()
+    assert [e.uid for e in entities] == uids
+    assert [e.attrs.get()[0].value for e in entities] == list(range(20))
+    assert entities[0].attrs._store is disk_store
+
+
+def test_disk_store_release(disk_store):
+    doc = _get_doc(20)
+    other_doc = _get_doc(2)
+    doc.anns.release()
+    assert len(doc.anns) == 0
+    nb_rows = disk_store._conn.execute("SELECT COUNT(*) FROM data_items").fetchone()
+    assert nb_rows[0] == 0
+    assert [e.attrs.get()[0].value for e in other_doc.anns.get_entities()] == [0, 1]
+    with pytest.raises(KeyError):
+        disk_store.get_data_item("unknown")
+
+
+def test_disk_store_modify_evicted(disk_store):
+    doc = _get_doc(20)
+    entity = doc.anns.get_entities()[0]
+    # entity was evicted but is still in use, add an attribute to it
+    assert entity.uid not in disk_store._cache
+    entity.attrs.add(Attribute(label="is_negated", value=True))
+
+    # evict it again, drop it and reload it from the database
+    for _ in range(20):
+        doc.anns.add(Entity(label="disease", spans=[Span(0, 7)], text="Diabète"))
+    uid = entity.uid
+    del entity
+    gc.collect()
+    # not held by the document's annotation container
+    assert uid not in disk_store._cache and uid not in disk_store._evicted_items
+    entity = doc.anns.get_by_id(uid)
+    assert [a.label for a in entity.attrs] == ["index", "is_negated"]
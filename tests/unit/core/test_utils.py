@@ -0,0 +1,14 @@
+import pytest
+
+from medkit.core.utils import batch_iter
+
+
+@pytest.mark.parametrize(
+    "nb_items,expected_sizes", [(0, []), (5, [2, 2, 1]), (6, [2, 2, 2])]
+)
+def test_batch_iter(nb_items, expected_sizes):
+    items = list(range(nb_items))
+    batches = list(batch_iter(iter(items), batch_size=2))
+    # no empty batch, even when nb_items is a multiple of batch_size
+    assert [len(b) for b in batches] == expected_sizes
+    assert [item for batch in batches for item in batch] == items
@@ -0,0 +1,44 @@
+import os
+import pickle
+
+import pytest
+
+from medkit.core._worker_pool import WorkerPool
+
+# set in worker processes by _init_worker()
+_offset = None
+
+
+def _init_worker(offset):
+    global _offset
+    _offset = offset
+
+
+def _add_offset(value):
+    return value + _offset, os.getpid()
+
+
+def test_worker_pool():
+    pool = WorkerPool(nb_workers=2, initializer=_init_worker, initargs=(10,))
+    assert pool._pool is None
+
+    # workers are started on first use and kept for next calls
+    results = list(pool.imap(_add_offset, range(4)))
+    assert [r for r, _ in results] == [10, 11, 12, 13]
+    pids = {pid for _, pid in results}
+    assert os.getpid() not in pids
+    results = list(pool.imap(_add_offset, [0]))
+    assert results[0][1] in {p.pid for p in pool._pool._pool}
+    assert pids <= {p.pid for p in pool._pool._pool}
+
+    # pool is not pickled
+    pool_copy = pickle.loads(pickle.dumps(pool))
+    assert pool_copy._pool is None and pool_copy.nb_workers == 2
+
+    pool.close()
+    assert pool._pool is None
+
+
+def test_invalid_nb_workers():
+    with pytest.raises(ValueError, match="nb_workers"):
+        WorkerPool(nb_workers=0)
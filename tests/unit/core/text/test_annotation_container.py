@@ -0,0 +1,84 @@
+from medkit.core.text import Entity, Relation, Segment, Span, TextDocument
+
+
+def _get_doc():
+    doc = TextDocument(text="Le patient a de la fièvre depuis deux jours.")
+    for i in range(10):
+        if i % 2:
+            ann = Entity(label="symptom", spans=[Span(19, 25)], text="fièvre")
+        else:
+            ann = Segment(label="sentence", spans=[Span(0, 44)], text=doc.text)
+        if i % 3:
+            ann.keys.add("key")
+        doc.anns.add(ann)
+    return doc
+
+
+def test_get_segments_and_entities():
+    doc = _get_doc()
+    anns = doc.anns.get()
+    segments = [a for a in anns if not isinstance(a, Entity)]
+    entities = [a for a in anns if isinstance(a, Entity)]
+
+    assert doc.anns.get_segments() == segments
+    assert doc.anns.get_segments(label="sentence") == segments
+    assert doc.anns.get_segments(label="symptom") == []
+    assert doc.anns.get_segments(key="key") == [s for s in segments if s.keys]
+    assert doc.anns.get_entities() == entities
+    assert doc.anns.get_entities(label="symptom", key="key") == [
+        e for e in entities if e.keys
+    ]
+    assert doc.anns.get_entities(label="sentence") == []
+
+
+def test_get_relations():
+    doc = _get_doc()
+    entity_1, entity_2 = doc.anns.get_entities()[:2]
+    relation_1 = Relation(label="same", source_id=entity_1.uid, target_id=entity_2.uid)
+    relation_2 = Relation(label="other", source_id=entity_2.uid, target_id=entity_1.uid)
+    relation_3 = Relation(label="same", source_id=entity_1.uid, target_id=entity_1.uid)
+    for relation in (relation_1, relation_2, relation_3):
+        doc.anns.add(relation)
+
+    assert doc.anns.get_relations() == [relation_1, relation_2, relation_3]
+    assert doc.anns.get_relations(label="same") == [relation_1, relation_3]
+    assert doc.anns.get_relations(source_id=entity_1.uid) == [relation_1, relation_3]
+    assert doc.anns.get_relations(label="other", source_id=entity_1.uid) == []
+    assert doc.anns.get_relations(source_id="unknown") == []
+
+
+def test_positional_queries():
+    doc = TextDocument(text="Le patient a de la fièvre depuis deux jours.")
+    sentence = Segment(label="sentence", spans=[Span(0, 44)], text=doc.text)
+    patient = Entity(label="person", spans=[Span(3, 10)], text="patient")
+    fever = Entity(label="symptom", spans=[Span(19, 25)], text="fièvre")
+    # discontinuous entity
+    fever_days = Entity(
+        label="symptom",
+        spans=[Span(19, 25), Span(33, 43)],
+        text="fièvre deux jours",
+    )
+    for ann in (sentence, patient, fever, fever_days):
+        doc.anns.add(ann)
+
+    assert doc.anns.get_overlapping(0, 5) == [sentence, patient]
+    assert doc.anns.get_overlapping(20, 21) == [sentence, fever, fever_days]
+    assert doc.anns.get_overlapping(26, 30) == [sentence]
+    assert doc.anns.get_overlapping(20, 21, label="symptom") == [fever, fever_days]
+
+    assert doc.anns.get_contained(0, 44) == [sentence, patient, fever, fever_days]
+    assert doc.anns.get_contained(0, 30) == [patient, fever]
+    assert doc.anns.get_contained(19, 25) == [fever]
+    assert doc.anns.get_contained(0, 30, label="person") == [patient]
+
+    assert doc.anns.get_containing(19, 25) == [sentence, fever, fever_days]
+    assert doc.anns.get_containing(3, 25) == [sentence]
+    # range in gap between spans of discontinuous entity
+    assert doc.anns.get_containing(26, 30) == [sentence]
+    assert doc.anns.get_containing(21, 21) == [sentence, fever, fever_days]
+
+    # index is updated with new annotations
+    days = Entity(label="duration", spans=[Span(33, 43)], text="deux jours")
+    doc.anns.add(days)
+    assert doc.anns.get_overlapping(40, 41) == [sentence, fever_days, days]
+    assert doc.anns.get_containing(33, 43, key="missing") == []
@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from medkit.core.text._regexp_prefilter import LiteralPrefilter, RulesPrefilter
+
+
+@pytest.mark.parametrize(
+    "regexp,flags,text,is_candidate",
+    [
+        ("diab[eé]te", re.IGNORECASE, "Le patient est DIABETIQUE", True),
+        ("diab[eé]te", re.IGNORECASE, "Le patient est asthmatique", False),
+        ("diab[eé]te", 0, "Le patient est DIABETIQUE", False),
+        ("(?i)diab[eé]te", 0, "Le patient est DIABETIQUE", True),
+        ("asthme|diab[eé]te", re.IGNORECASE, "asthme", True),
+        ("asthme|diab[eé]te", re.IGNORECASE, "diabete", True),
+        ("asthme|diab[eé]te", re.IGNORECASE, "tumeur", False),
+        ("fibril{1,}ation", re.IGNORECASE, "fibrillation", True),
+        ("fibril{1,}ation", re.IGNORECASE, "fibrose", False),
+        # no required literal
+        ("[0-9]+", 0, "tumeur", True),
+        ("(?:diab[eé]te)?", 0, "tumeur", True),
+        ("(?i:diab[eé]te)", 0, "DIABETE", True),
+        # non-ascii variants equivalent to ascii chars when ignoring case
+        ("diabete", re.IGNORECASE, "DıABETE", True),
+        ("sida", re.IGNORECASE, "ſIDA", True),
+        ("kawasaki", re.IGNORECASE, "KAWASAKI", True),
+        ("µ", re.IGNORECASE, "Μ", True),
+    ],
+)
+def test_get_candidates(regexp, flags, text, is_candidate):
+    # sanity check on the test data itself
+    assert (re.search(regexp, text, flags) is not None) <= is_candidate
+
+    prefilter = LiteralPrefilter([regexp], [flags])
+    assert (prefilter.get_candidates(text) == [0]) == is_candidate
+
+
+def test_get_candidates_order():
+    regexps = ["tumeur", "[0-9]+", "diab[eé]te", "asthme"]
+    prefilter = LiteralPrefilter(regexps, [re.IGNORECASE] * len(regexps))
+    assert prefilter.nb_prefiltered == 3
+    assert prefilter.get_candidates("asthme et diabete") == [1, 2, 3]
+
+
+def test_rules_prefilter():
+    """Rules are prefiltered on the unicode or ascii text depending on their
+    unicode sensitivity, and returned in rule order"""
+
+    regexps = ["diabète", "diabete", "asthme", "fièvre"]
+    prefilter = RulesPrefilter(
+        regexps=regexps,
+        flags=[0] * len(regexps),
+        unicode_sensitive=[True, False, False, True],
+    )
+    text_unicode = "fièvre, asthme et diabète"
+    text_ascii = "fievre, asthme et diabete"
+    assert prefilter.get_candidates(text_unicode, text_ascii) == [0, 1, 2, 3]
+    assert prefilter.get_candidates(text_ascii, text_ascii) == [1, 2]
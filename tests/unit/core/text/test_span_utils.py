@@ -1,5 +1,8 @@
+import random
+
 import pytest
 
+from medkit.core.text import span_utils
 from medkit.core.text.span import Span, ModifiedSpan
 from medkit.core.text.span_utils import (
     replace,
@@ -8,6 +11,8 @@ from medkit.core.text.span_utils import (
     insert,
     move,
     _replace_in_spans,
+    _replace_in_spans_iteratively,
+    _replace_in_spans_vectorized,
     _remove_in_spans,
     _extract_in_spans,
     _insert_in_spans,
@@ -491,3 +496,57 @@ def test_concatenate():
     texts, spans = concatenate(texts, spans)
     assert texts == "The first and second."
     assert spans == [Span(0, 3), Span(5, 10), Span(12, 23)]
+
+
+def _get_random_spans(rng, nb_spans):
+    spans = []
+    start = 0
+    for _ in range(nb_spans):
+        if rng.random() < 0.3:
+            spans.append(ModifiedSpan(rng.randint(0, 4), [Span(start, start + 1)]))
+        else:
+            length = rng.randint(0, 5)
+            spans.append(Span(start, start + length))
+            start += length + rng.randint(0, 2)
+    return spans
+
+
+def test_vectorized_replace_in_spans():
+    """Vectorized and iterative implementations must give the same results"""
+    rng = random.Random(0)
+    for _ in range(500):
+        spans = _get_random_spans(rng, rng.randint(1, 30))
+        total_length = sum(s.length for s in spans)
+        bounds = sorted(
+            rng.randint(0, total_length) for _ in range(rng.randint(1, 8) * 2)
+        )
+        ranges = list(zip(bounds[::2], bounds[1::2]))
+        replacement_lengths = [rng.randint(0, 3) for _ in ranges]
+        assert _replace_in_spans_vectorized(
+            spans, ranges, replacement_lengths
+        ) == _replace_in_spans_iteratively(spans, ranges, replacement_lengths)
+
+
+def test_vectorized_normalize_spans(monkeypatch):
+    rng = random.Random(0)
+    for _ in range(500):
+        spans = _get_random_spans(rng, rng.randint(1, 30))
+        monkeypatch.setattr(span_utils, "_VECTORIZATION_THRESHOLD", 10**9)
+        expected_spans = normalize_spans(spans)
+        monkeypatch.setattr(span_utils, "_VECTORIZATION_THRESHOLD", 0)
+        assert normalize_spans(spans) == expected_spans
+
+
+def test_replace_many_ranges():
+    text = "a b " * 1000
+    spans = [Span(0, len(text))]
+    ranges = [(i, i + 1) for i in range(1, len(text), 2)]
+    text, spans = replace(text, spans, ranges, ["_"] * len(ranges))
+    assert text == "a_b_" * 1000
+    assert len(spans) == 4000
+    assert spans[:2] == [Span(0, 1), ModifiedSpan(1, [Span(1, 2)])]
+    assert normalize_spans(spans) == [Span(0, len(text))]
+
+    text, spans = remove(text, spans, [(i, i + 1) for i in range(1, len(text), 2)])
+    assert text == "ab" * 1000
+    assert normalize_spans(spans) == [Span(i, i + 1) for i in range(0, 4000, 2)]
@@ -0,0 +1,66 @@
+import gc
+
+from medkit.core.text import Segment, Span
+from medkit.core.text.transliteration import (
+    clear_transliteration_cache,
+    get_ascii_text,
+    get_transliteration_cache_info,
+    has_ascii_text,
+    set_ascii_text,
+    set_transliteration_cache_size,
+    transliterate,
+)
+from medkit.core.text import transliteration
+
+
+def _get_segment(text):
+    return Segment(label="sentence", spans=[Span(0, len(text))], text=text)
+
+
+def test_transliterate():
+    clear_transliteration_cache()
+
+    assert transliterate("Le patient fait du diabète") == "Le patient fait du diabete"
+    assert transliterate("Le patient fait du diabète") == "Le patient fait du diabete"
+    cache_info = get_transliteration_cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+
+def test_cache_size():
+    set_transliteration_cache_size(2)
+    try:
+        transliterate("fièvre")
+        transliterate("diabète")
+        transliterate("hépatite")
+        assert get_transliteration_cache_info().currsize == 2
+
+        # least recently used text was evicted
+        transliterate("fièvre")
+        assert get_transliteration_cache_info().hits == 0
+    finally:
+        set_transliteration_cache_size(4096)
+
+
+def test_get_ascii_text():
+    segment = _get_segment("Le patient fait du diabète")
+    assert get_ascii_text(segment) == "Le patient fait du diabete"
+
+    # precomputed ascii text is used when available
+    assert not has_ascii_text(segment)
+    set_ascii_text(segment, "precomputed")
+    assert has_ascii_text(segment)
+    assert get_ascii_text(segment) == "precomputed"
+
+
+def test_precomputed_ascii_text_released():
+    """Precomputed ascii texts are forgotten with their segments"""
+
+    segment = _get_segment("Le patient fait du diabète")
+    set_ascii_text(segment, "precomputed")
+    uid = segment.uid
+    assert uid in transliteration._ascii_texts_by_segment_id
+
+    del segment
+    gc.collect()
+    assert uid not in transliteration._ascii_texts_by_segment_id
@@ -1,4 +1,7 @@
 import logging
+from pathlib import Path
+import re
+
 import pytest
 
 from medkit.core import ProvTracer
@@ -11,6 +14,9 @@ from medkit.text.context.negation_detector import (
 
 
 _OUTPUT_LABEL = "negation"
+_PATH_TO_EDS_DOCS = (
+    Path(__file__).parent / ".." / ".." / ".." / "data" / "text" / "eds" / "clean"
+)
 
 
 def _get_syntagma_segments(syntagma_texts):
@@ -302,11 +308,12 @@ _TEST_DATA = [
 # fmt: on
 
 
-def test_default_rules():
+@pytest.mark.parametrize("engine", ["per_rule", "multi_rule"])
+def test_default_rules(engine):
     syntagma_texts = [d[0] for d in _TEST_DATA]
     syntagmas = _get_syntagma_segments(syntagma_texts)
 
-    detector = NegationDetector(output_label=_OUTPUT_LABEL)
+    detector = NegationDetector(output_label=_OUTPUT_LABEL, engine=engine)
     detector.run(syntagmas)
 
     for i in range(len(_TEST_DATA)):
@@ -330,6 +337,37 @@ def test_default_rules():
             )
 
 
+def test_multi_rule_engine():
+    """Make sure the multi-rule engine returns the same results as trying each rule
+    in order"""
+
+    text = (_PATH_TO_EDS_DOCS / "cas1.txt").read_text(encoding="utf-8")
+    syntagma_texts = [d[0] for d in _TEST_DATA] + re.split(r"[\n.,;:]", text)
+    rules = NegationDetector.load_rules(_PATH_TO_DEFAULT_RULES, encoding="utf-8")
+    # rule without any required literal and case sensitive rule
+    rules.append(NegationDetectorRule(id="id_neg_n_word", regexp=r"^n\w+$"))
+    rules.append(
+        NegationDetectorRule(
+            id="id_neg_neg_upper", regexp=r"\bNEG\b", case_sensitive=True
+        )
+    )
+    syntagma_texts += ["Non", "NEG", "neg"]
+
+    syntagmas = _get_syntagma_segments(syntagma_texts)
+    detector = NegationDetector(output_label="per_rule", rules=rules)
+    detector.run(syntagmas)
+    multi_rule_detector = NegationDetector(
+        output_label="multi_rule", rules=rules, engine="multi_rule"
+    )
+    multi_rule_detector.run(syntagmas)
+
+    for syntagma in syntagmas:
+        attr = syntagma.attrs.get(label="per_rule")[0]
+        multi_rule_attr = syntagma.attrs.get(label="multi_rule")[0]
+        assert multi_rule_attr.value == attr.value
+        assert multi_rule_attr.metadata == attr.metadata
+
+
 def test_rules_file_encoding_error():
     with pytest.raises(UnicodeError):
         NegationDetector.load_rules(
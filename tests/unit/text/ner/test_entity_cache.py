@@ -0,0 +1,102 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from medkit.text.ner._entity_cache import EntityCache, EntityCacheEntry
+
+_SEARCH_KEY = "1|exact|16"
+
+
+def _get_entry(value):
+    return EntityCacheEntry(
+        embedding=np.full(4, value, dtype=np.float32),
+        search_key=_SEARCH_KEY,
+        match_indices=[int(value)],
+        match_scores=[0.5],
+    )
+
+
+def test_basic():
+    cache = EntityCache(max_size=10)
+    assert cache.get("asthma") is None
+    cache.put("asthma", _get_entry(1))
+
+    entry = cache.get("asthma")
+    assert entry is not None
+    assert np.array_equal(entry.embedding, np.full(4, 1, dtype=np.float32))
+    assert entry.match_indices == [1]
+    assert cache.stats() == dict(nb_hits=1, nb_misses=1, hit_rate=0.5)
+
+
+def test_lru_eviction():
+    cache = EntityCache(max_size=2)
+    cache.put("asthma", _get_entry(1))
+    cache.put("diabetes", _get_entry(2))
+    # access 1st entry so 2d entry is the least recently used
+    assert cache.get("asthma") is not None
+    cache.put("fever", _get_entry(3))
+
+    assert cache.get("diabetes") is None
+    assert cache.get("asthma") is not None
+    assert cache.get("fever") is not None
+
+
+def test_persistence(tmp_path):
+    path = tmp_path / "entity_cache.db"
+    cache = EntityCache(max_size=1, path=path)
+    cache.put("asthma", _get_entry(1))
+    cache.put("diabetes", _get_entry(2))
+    # evicted from memory but not written yet
+    assert cache.get("asthma") is not None
+    cache.close()
+
+    # entries are reloaded from database, even if not kept in memory
+    cache = EntityCache(max_size=0, path=path)
+    for term, value in [("asthma", 1), ("diabetes", 2)]:
+        entry = cache.get(term)
+        assert entry is not None
+        assert np.array_equal(entry.embedding, _get_entry(value).embedding)
+        assert entry.search_key == _SEARCH_KEY
+        assert entry.match_indices == [value]
+        assert entry.match_scores == [0.5]
+    assert cache.get("fever") is None
+    assert cache.stats() == dict(nb_hits=2, nb_misses=1, hit_rate=2 / 3)
+    cache.close()
+
+
+def test_invalid_max_size():
+    with pytest.raises(ValueError, match="max_size"):
+        EntityCache(max_size=-1)
+
+
+def test_pickle(tmp_path):
+    path = tmp_path / "entity_cache.db"
+    cache = EntityCache(max_size=10, path=path)
+    cache.put("asthma", _get_entry(1))
+    cache.flush()
+    cache.put("diabetes", _get_entry(2))
+
+    unpickled_cache = pickle.loads(pickle.dumps(cache))
+    # database is reopened when needed
+    unpickled_cache.close()
+    cache.close()
+    cache = EntityCache(max_size=0, path=path)
+    assert cache.get("asthma") is not None
+    assert cache.get("diabetes") is not None
+    cache.close()
+
+
+def test_concurrent_connections(tmp_path):
+    path = tmp_path / "entity_cache.db"
+    cache_1 = EntityCache(max_size=0, path=path)
+    cache_2 = EntityCache(max_size=0, path=path)
+    cache_1.put("asthma", _get_entry(1))
+    cache_1.flush()
+    # entries written by a connection are seen by the other one
+    assert cache_2.get("asthma") is not None
+    cache_2.put("diabetes", _get_entry(2))
+    cache_2.flush()
+    assert cache_1.get("diabetes") is not None
+    cache_1.close()
+    cache_2.close()
@@ -0,0 +1,142 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from medkit.text.ner._ivf_index import IVFIndex
+from medkit.text.ner._umls_embeddings_file import (
+    UMLSEmbeddingsMatrix,
+    UMLSEmbeddingsWriter,
+)
+
+
+def _get_embeddings(nb_embeddings, dim=16, nb_clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(nb_clusters, dim))
+    embeddings = centers[rng.integers(0, nb_clusters, nb_embeddings)]
+    embeddings += 0.3 * rng.normal(size=embeddings.shape)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings.astype(np.float32)
+
+
+def _exact_search(embeddings, queries, k):
+    scores = queries @ embeddings.T
+    indices = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(scores, indices, axis=1), indices
+
+
+def test_build(tmp_path):
+    embeddings = _get_embeddings(1000)
+    index = IVFIndex.build(embeddings, tmp_path / "index", nb_lists=10)
+    assert index.nb_lists == 10
+    assert index.nb_embeddings == 1000
+    # each embedding is in exactly one list
+    assert sorted(index.list_indices.tolist()) == list(range(1000))
+    assert index.list_offsets[0] == 0 and index.list_offsets[-1] == 1000
+
+    # embeddings are memory-mapped
+    assert isinstance(index.list_embeddings, np.memmap)
+    assert index.list_embeddings.dtype == np.float32
+    assert np.array_equal(index.list_embeddings, embeddings[index.list_indices])
+
+    with pytest.raises(ValueError):
+        IVFIndex.build(embeddings[:0], tmp_path / "empty_index")
+
+
+def test_search(tmp_path):
+    embeddings = _get_embeddings(2000)
+    queries = _get_embeddings(50, seed=1)
+    index = IVFIndex.build(embeddings, tmp_path / "index")
+    expected_scores, expected_indices = _exact_search(embeddings, queries, k=3)
+
+    # probing all lists gives exact results
+    scores, indices = index.search(queries, k=3, nb_probes=index.nb_lists)
+    assert np.array_equal(indices, expected_indices)
+    assert np.allclose(scores, expected_scores, atol=1e-5)
+
+    # probing a few lists finds most of them
+    scores, indices = index.search(queries, k=3, nb_probes=8)
+    assert np.mean(indices[:, 0] == expected_indices[:, 0]) >= 0.9
+    # returned scores are exact similarities
+    assert np.allclose(
+        scores, np.sum(queries[:, None] * embeddings[indices], axis=2), atol=1e-5
+    )
+
+
+def test_search_small_lists(tmp_path):
+    """More lists than requested are probed when they are too small"""
+    embeddings = _get_embeddings(100)
+    index = IVFIndex.build(embeddings, tmp_path / "index", nb_lists=50)
+    scores, indices = index.search(embeddings[:5], k=10, nb_probes=1)
+    assert indices.shape == (5, 10)
+    assert len(set(indices[0].tolist())) == 10
+    # each query is its own nearest neighbour
+    assert indices[:, 0].tolist() == list(range(5))
+
+
+def test_build_by_blocks(tmp_path):
+    """Reading embeddings by blocks doesn't change the index"""
+    embeddings = _get_embeddings(500)
+    index = IVFIndex.build(embeddings, tmp_path / "index")
+    block_index = IVFIndex.build(embeddings, tmp_path / "block_index", block_size=64)
+    assert np.array_equal(block_index.centroids, index.centroids)
+    assert np.array_equal(block_index.list_indices, index.list_indices)
+    assert np.array_equal(block_index.list_embeddings, index.list_embeddings)
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+def test_build_from_matrix(tmp_path, dtype, tolerance):
+    """Embeddings of the index have the same dtype as the indexed embeddings"""
+    embeddings = _get_embeddings(500)
+    writer = UMLSEmbeddingsWriter(tmp_path / "embeddings.bin", dtype, metadata={})
+    writer.write(embeddings)
+    writer.close()
+    matrix = UMLSEmbeddingsMatrix(tmp_path / "embeddings.bin")
+
+    index = IVFIndex.build(matrix, tmp_path / "index", block_size=64)
+    assert index.list_embeddings.dtype == dtype
+    assert (index.list_scales is not None) == (dtype == "int8")
+
+    queries = _get_embeddings(20, seed=1)
+    expected_scores, expected_indices = _exact_search(matrix[:], queries, k=3)
+    scores, indices = index.search(queries, k=3, nb_probes=index.nb_lists)
+    assert np.array_equal(indices, expected_indices)
+    assert np.allclose(scores, expected_scores, atol=tolerance)
+
+
+def test_load(tmp_path):
+    embeddings = _get_embeddings(500)
+    assert not IVFIndex.exists(tmp_path / "index")
+    index = IVFIndex.build(embeddings, tmp_path / "index")
+    assert IVFIndex.exists(tmp_path / "index")
+
+    loaded_index = IVFIndex.load(tmp_path / "index", mmap=False)
+    assert np.array_equal(loaded_index.centroids, index.centroids)
+    assert np.array_equal(loaded_index.list_offsets, index.list_offsets)
+    assert np.array_equal(loaded_index.list_indices, index.list_indices)
+    assert not isinstance(loaded_index.list_embeddings, np.memmap)
+    assert np.array_equal(loaded_index.list_embeddings, index.list_embeddings)
+    queries = embeddings[:5]
+    for result, loaded_result in zip(
+        index.search(queries, k=2, nb_probes=2),
+        loaded_index.search(queries, k=2, nb_probes=2),
+    ):
+        assert np.array_equal(result, loaded_result)
+
+
+def test_pickle(tmp_path):
+    embeddings = _get_embeddings(500)
+    index = IVFIndex.build(embeddings, tmp_path / "index")
+
+    data = pickle.dumps(index)
+    # memory-mapped embeddings are not copied in the pickle
+    assert len(data) < embeddings.nbytes // 2
+    unpickled_index = pickle.loads(data)
+    assert isinstance(unpickled_index.list_embeddings, np.memmap)
+    assert np.array_equal(unpickled_index.list_embeddings, index.list_embeddings)
+    queries = embeddings[:5]
+    for result, unpickled_result in zip(
+        index.search(queries, k=2, nb_probes=2),
+        unpickled_index.search(queries, k=2, nb_probes=2),
+    ):
+        assert np.array_equal(result, unpickled_result)
@@ -1,5 +1,7 @@
+import dataclasses
 import logging
 import pytest
+from unidecode import unidecode
 
 from medkit.core import Attribute, ProvTracer
 from medkit.core.text import Segment, Span, EntityNormAttribute
@@ -142,6 +144,39 @@ def test_exclusion_regex():
     assert len(entities) == 0
 
 
+def test_exclusion_regex_multiple_matches():
+    sentence = _get_sentence_segment(
+        "Diabetes type 1 diabetes. Gestational diabetes. No diabetes."
+    )
+
+    rule = RegexpMatcherRule(
+        label="Diabetes", regexp="diabetes", exclusion_regexp="type 1 diabetes"
+    )
+    matcher = RegexpMatcher(rules=[rule])
+    entities = matcher.run([sentence])
+
+    # exclusion applies to all matches in the segment
+    assert len(entities) == 0
+
+
+def test_exclusion_window():
+    sentence = _get_sentence_segment(
+        "Diabetes type 1 diabetes. Gestational diabetes. No diabetes."
+    )
+
+    rule = RegexpMatcherRule(
+        label="Diabetes",
+        regexp="diabetes",
+        exclusion_regexp="type 1 diabetes|gestational",
+        exclusion_window=12,
+    )
+    matcher = RegexpMatcher(rules=[rule])
+    entities = matcher.run([sentence])
+
+    # only matches with no exclusion close to them are kept
+    assert [e.spans for e in entities] == [[Span(0, 8)], [Span(51, 59)]]
+
+
 def test_case_sensitivity_off():
     sentence = _get_sentence_segment()
 
@@ -292,3 +327,65 @@ def test_prov():
 def test_rules_file_encoding_error():
     with pytest.raises(UnicodeError):
         RegexpMatcher.load_rules(path_to_rules=_PATH_TO_DEFAULT_RULES, encoding="ascii")
+
+
+_TEXT_MULTI_RULE = (
+    "Patient diabétique (DID) sous insuline depuis 2010, HTA traitée. Pas"
+    " d'infarctus du myocarde. IGS2 à 24h : 35. Ancien fumeur, 20 paquets-année."
+)
+
+
+@pytest.mark.parametrize("unicode_sensitive", [True, False])
+def test_multi_rule_engine(unicode_sensitive):
+    text = _TEXT_MULTI_RULE if unicode_sensitive else unidecode(_TEXT_MULTI_RULE)
+    sentence = _get_sentence_segment(text)
+
+    rules = [
+        dataclasses.replace(rule, unicode_sensitive=unicode_sensitive)
+        for rule in RegexpMatcher.load_rules(_PATH_TO_DEFAULT_RULES, encoding="utf-8")
+        if unicode_sensitive or rule.regexp.isascii()
+    ]
+    # rules without any required literal are always run
+    rules.append(RegexpMatcherRule(id="number", label="number", regexp="[0-9]+"))
+    # case sensitive rules
+    rules.append(
+        RegexpMatcherRule(id="HTA", label="HTA", regexp="HTA", case_sensitive=True)
+    )
+    rules.append(
+        RegexpMatcherRule(id="hta", label="hta", regexp="hta", case_sensitive=True)
+    )
+
+    matcher = RegexpMatcher(rules=rules, engine="per_rule")
+    entities = matcher.run([sentence])
+    assert len(entities) > 5
+
+    multi_rule_matcher = RegexpMatcher(rules=rules, engine="multi_rule")
+    multi_rule_entities = multi_rule_matcher.run([sentence])
+
+    assert [(e.label, e.spans, e.metadata) for e in multi_rule_entities] == [
+        (e.label, e.spans, e.metadata) for e in entities
+    ]
+
+
+def test_multi_rule_engine_case_variants():
+    """Make sure the multi-rule engine doesn't miss case variants
+    matched by the regexp engine"""
+
+    # DOTLESS I, LONG S and KELVIN SIGN are equivalent
+    # to "i", "s" and "k" when ignoring case
+    sentence = _get_sentence_segment("DıABETE, ſIDA, KAWASAKI")
+
+    rules = [
+        RegexpMatcherRule(label="diabetes", regexp="diabete", unicode_sensitive=True),
+        RegexpMatcherRule(label="sida", regexp="sida", unicode_sensitive=True),
+        RegexpMatcherRule(label="kawasaki", regexp="kawasaki", unicode_sensitive=True),
+    ]
+    matcher = RegexpMatcher(rules=rules, engine="multi_rule")
+    entities = matcher.run([sentence])
+    assert [e.label for e in entities] == ["diabetes", "sida", "kawasaki"]
+
+
+def test_unsupported_engine():
+    rule = RegexpMatcherRule(label="Diabetes", regexp="diabetes")
+    with pytest.raises(ValueError, match="Unsupported engine"):
+        RegexpMatcher(rules=[rule], engine="automaton")
@@ -6,10 +6,16 @@ pytest.importorskip(modname="pandas", reason="pandas is not installed")
 pytest.importorskip(modname="torch", reason="torch is not installed")
 pytest.importorskip(modname="transformers", reason="transformers is not installed")
 
+import torch
+
 from medkit.core import ProvTracer
 from medkit.core.text import Entity, Span
 from medkit.text.ner import UMLSNormAttribute
-from medkit.text.ner.umls_coder_normalizer import UMLSCoderNormalizer
+from medkit.text.ner.umls_coder_normalizer import (
+    UMLSCoderNormalizer,
+    _compute_embeddings,
+    _create_pipeline,
+)
 
 
 _PATH_TO_MR_CONSO_FILE = Path(__file__).parent / "sample_umls_data" / "MRCONSO.RRF"
@@ -261,3 +267,259 @@ def test_prov(normalizer):
     attr_2 = entity_2.attrs.get_norms()[0]
     prov_2 = prov_tracer.get_prov(attr_2.uid)
     assert prov_2.source_data_items == [entity_2]
+
+
+def test_ivf_search_engine(embeddings_cache_dir):
+    """Approximate search gives the same results as exact search on small data"""
+
+    entities = [
+        _get_entity(label="disease", text="asthma"),
+        _get_entity(label="disease", text="type 1 diabts"),
+    ]
+    normalizer = UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=embeddings_cache_dir,
+        max_nb_matches=2,
+        search_engine="ivf",
+    )
+    normalizer.run(entities)
+    assert (embeddings_cache_dir / "ivf_index").exists()
+
+    ref_entities = [
+        _get_entity(label="disease", text="asthma"),
+        _get_entity(label="disease", text="type 1 diabts"),
+    ]
+    ref_normalizer = UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=embeddings_cache_dir,
+        max_nb_matches=2,
+    )
+    ref_normalizer.run(ref_entities)
+
+    for entity, ref_entity in zip(entities, ref_entities):
+        norm_attrs = entity.attrs.get_norms()
+        ref_norm_attrs = ref_entity.attrs.get_norms()
+        assert [a.cui for a in norm_attrs] == [a.cui for a in ref_norm_attrs]
+        assert [a.score for a in norm_attrs] == [a.score for a in ref_norm_attrs]
+
+
+def test_unsupported_search_engine(embeddings_cache_dir):
+    with pytest.raises(ValueError, match="Unsupported search engine"):
+        UMLSCoderNormalizer(
+            umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+            language=_LANGUAGE,
+            model=_MODEL,
+            embeddings_cache_dir=embeddings_cache_dir,
+            search_engine="unknown",
+        )
+
+
+@pytest.mark.parametrize("embeddings_dtype", ["float32", "float16", "int8"])
+def test_embeddings_dtype(module_tmp_dir, embeddings_dtype):
+    """Embeddings stored in a memory-mapped file"""
+
+    embeddings_cache_dir = module_tmp_dir / f"umls_coder_cache_{embeddings_dtype}"
+    normalizer = UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=embeddings_cache_dir,
+        embeddings_dtype=embeddings_dtype,
+        max_nb_matches=2,
+    )
+    assert (embeddings_cache_dir / "embeddings.bin").exists()
+    assert not list(embeddings_cache_dir.glob("*.pt"))
+
+    entity = _get_entity(label="disease", text="type 1 diabts")
+    normalizer.run([entity])
+    norm_attrs = entity.attrs.get_norms()
+    assert len(norm_attrs) == 2
+    assert norm_attrs[0].cui == _DIABETES_CUI
+    assert norm_attrs[0].score >= norm_attrs[1].score
+
+    # embeddings can't be reused with another dtype
+    with pytest.raises(Exception, match="different params"):
+        UMLSCoderNormalizer(
+            umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+            language=_LANGUAGE,
+            model=_MODEL,
+            embeddings_cache_dir=embeddings_cache_dir,
+        )
+
+
+@pytest.mark.parametrize("persist_entity_cache", [False, True])
+def test_entity_cache(embeddings_cache_dir, persist_entity_cache):
+    """Embeddings and matches of recurring entity texts are reused"""
+
+    normalizer = UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=embeddings_cache_dir,
+        max_nb_matches=2,
+        entity_cache_size=10,
+        persist_entity_cache=persist_entity_cache,
+    )
+    ref_normalizer = UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=embeddings_cache_dir,
+        max_nb_matches=2,
+    )
+    assert ref_normalizer.entity_cache_stats is None
+
+    # record texts embedded by the normalizer
+    embedded_texts = []
+    pipeline = normalizer._pipeline
+
+    def _recording_pipeline(texts):
+        embedded_texts.append(list(texts))
+        return pipeline(texts)
+
+    normalizer._pipeline = _recording_pipeline
+    texts = ["asthma", "type 1 diabts", "asthma"]
+    for _ in range(2):
+        entities = [_get_entity(label="disease", text=text) for text in texts]
+        normalizer.run(entities)
+        ref_entities = [_get_entity(label="disease", text=text) for text in texts]
+        ref_normalizer.run(ref_entities)
+
+        for entity, ref_entity in zip(entities, ref_entities):
+            norm_attrs = entity.attrs.get_norms()
+            ref_norm_attrs = ref_entity.attrs.get_norms()
+            assert [a.cui for a in norm_attrs] == [a.cui for a in ref_norm_attrs]
+            assert [a.score for a in norm_attrs] == [a.score for a in ref_norm_attrs]
+
+    # distinct texts were embedded only once
+    assert embedded_texts == [["asthma", "type 1 diabts"]]
+    assert normalizer.entity_cache_stats == dict(nb_hits=2, nb_misses=2, hit_rate=0.5)
+
+    if persist_entity_cache:
+        assert (embeddings_cache_dir / "entity_cache.db").exists()
+        # cached entries are reused by another normalizer
+        other_normalizer = UMLSCoderNormalizer(
+            umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+            language=_LANGUAGE,
+            model=_MODEL,
+            embeddings_cache_dir=embeddings_cache_dir,
+            max_nb_matches=2,
+            persist_entity_cache=True,
+        )
+        entity = _get_entity(label="disease", text="asthma")
+        other_normalizer.run([entity])
+        assert other_normalizer.entity_cache_stats["nb_hits"] == 1
+        assert entity.attrs.get_norms()[0].cui == _ASTHMA_CUI
+
+
+def _get_embeddings_files(embeddings_cache_dir):
+    return sorted(embeddings_cache_dir.glob("*.pt"))
+
+
+def test_resume_interrupted_build(module_tmp_dir, embeddings_cache_dir, mocker):
+    """Pre-computation of embeddings resumed from last complete chunk"""
+
+    ref_normalizer = UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=embeddings_cache_dir,
+    )
+    nb_chunks = len(_get_embeddings_files(embeddings_cache_dir))
+    assert nb_chunks > 3
+
+    # interrupt build after 2 chunks
+    nb_calls = 0
+
+    def _interrupted_compute_embeddings(pipeline, terms):
+        nonlocal nb_calls
+        nb_calls += 1
+        if nb_calls > 2:
+            raise RuntimeError("Interrupted")
+        return _compute_embeddings(pipeline, terms)
+
+    mocker.patch(
+        "medkit.text.ner.umls_coder_normalizer._compute_embeddings",
+        _interrupted_compute_embeddings,
+    )
+    resumed_cache_dir = module_tmp_dir / "umls_coder_cache_resumed"
+    with pytest.raises(RuntimeError, match="Interrupted"):
+        UMLSCoderNormalizer(
+            umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+            language=_LANGUAGE,
+            model=_MODEL,
+            embeddings_cache_dir=resumed_cache_dir,
+        )
+    assert len(_get_embeddings_files(resumed_cache_dir)) == 2
+    assert not (resumed_cache_dir / "params.yml").exists()
+
+    # only remaining chunks are computed
+    compute_spy = mocker.patch(
+        "medkit.text.ner.umls_coder_normalizer._compute_embeddings",
+        wraps=_compute_embeddings,
+    )
+    normalizer = UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=resumed_cache_dir,
+    )
+    assert compute_spy.call_count == nb_chunks - 2
+    assert (resumed_cache_dir / "params.yml").exists()
+    assert not (resumed_cache_dir / "build_params.yml").exists()
+
+    entity = _get_entity(label="disease", text="type 1 diabts")
+    normalizer.run([entity])
+    ref_entity = _get_entity(label="disease", text="type 1 diabts")
+    ref_normalizer.run([ref_entity])
+    assert entity.attrs.get_norms()[0].cui == ref_entity.attrs.get_norms()[0].cui
+    assert entity.attrs.get_norms()[0].score == ref_entity.attrs.get_norms()[0].score
+
+
+def test_nb_build_workers(module_tmp_dir, embeddings_cache_dir, mocker):
+    """Pre-computation of embeddings in several worker processes"""
+
+    UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=embeddings_cache_dir,
+    )
+
+    create_pipeline_spy = mocker.patch(
+        "medkit.text.ner.umls_coder_normalizer._create_pipeline",
+        wraps=_create_pipeline,
+    )
+    iter_chunk_embeddings_in_pool = UMLSCoderNormalizer._iter_chunk_embeddings_in_pool
+
+    def _check_iter_chunk_embeddings_in_pool(self, *args):
+        # the pipeline of the main process isn't created while workers compute
+        # embeddings
+        assert create_pipeline_spy.call_count == 0
+        return iter_chunk_embeddings_in_pool(self, *args)
+
+    mocker.patch.object(
+        UMLSCoderNormalizer,
+        "_iter_chunk_embeddings_in_pool",
+        _check_iter_chunk_embeddings_in_pool,
+    )
+    parallel_cache_dir = module_tmp_dir / "umls_coder_cache_parallel"
+    UMLSCoderNormalizer(
+        umls_mrconso_file=_PATH_TO_MR_CONSO_FILE,
+        language=_LANGUAGE,
+        model=_MODEL,
+        embeddings_cache_dir=parallel_cache_dir,
+        nb_build_workers=2,
+    )
+    assert create_pipeline_spy.call_count == 1
+
+    # same embeddings as when computed in main process
+    ref_files = _get_embeddings_files(embeddings_cache_dir)
+    files = _get_embeddings_files(parallel_cache_dir)
+    assert [f.name for f in files] == [f.name for f in ref_files]
+    for file, ref_file in zip(files, ref_files):
+        assert torch.allclose(torch.load(file), torch.load(ref_file), atol=1e-6)
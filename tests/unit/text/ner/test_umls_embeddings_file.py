@@ -0,0 +1,77 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from medkit.text.ner._umls_embeddings_file import (
+    UMLSEmbeddingsMatrix,
+    UMLSEmbeddingsWriter,
+)
+
+_METADATA = {"model": "GanjinZero/UMLSBert_ENG", "lowercase": False}
+
+
+def _get_embeddings(nb_embeddings=100, dim=16):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(nb_embeddings, dim))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings.astype(np.float32)
+
+
+@pytest.mark.parametrize(
+    "dtype,tolerance", [("float32", 0.0), ("float16", 1e-3), ("int8", 1e-2)]
+)
+def test_write_and_read(tmp_path, dtype, tolerance):
+    embeddings = _get_embeddings()
+    path = tmp_path / "embeddings.bin"
+    writer = UMLSEmbeddingsWriter(path, dtype, _METADATA)
+    # write by chunks
+    for start in range(0, len(embeddings), 30):
+        writer.write(embeddings[start : start + 30])
+    writer.close()
+
+    matrix = UMLSEmbeddingsMatrix(path)
+    assert len(matrix) == len(embeddings)
+    assert matrix.dim == embeddings.shape[1]
+    assert matrix.dtype == dtype
+    assert matrix.metadata == _METADATA
+
+    # slices, indices and single rows
+    rows = matrix[10:50]
+    assert rows.dtype == np.float32
+    assert np.allclose(rows, embeddings[10:50], atol=tolerance, rtol=0)
+    indices = np.array([3, 7, 99])
+    assert np.allclose(matrix[indices], embeddings[indices], atol=tolerance, rtol=0)
+    assert np.allclose(matrix[5], embeddings[5], atol=tolerance, rtol=0)
+    # returned rows are writable copies
+    rows[0, 0] = 2.0
+    assert matrix[10][0] != 2.0
+
+
+def test_unsupported_dtype(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported embeddings dtype"):
+        UMLSEmbeddingsWriter(tmp_path / "embeddings.bin", "int4", _METADATA)
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "embeddings.bin"
+    path.write_bytes(b"\0" * 5000)
+    with pytest.raises(ValueError, match="is not an UMLS embeddings file"):
+        UMLSEmbeddingsMatrix(path)
+
+
+def test_pickle(tmp_path):
+    embeddings = _get_embeddings()
+    path = tmp_path / "embeddings.bin"
+    writer = UMLSEmbeddingsWriter(path, "int8", _METADATA)
+    writer.write(embeddings)
+    writer.close()
+
+    matrix = UMLSEmbeddingsMatrix(path)
+    data = pickle.dumps(matrix)
+    # embeddings are not copied in the pickle
+    assert len(data) < embeddings.nbytes // 4
+    unpickled_matrix = pickle.loads(data)
+    assert isinstance(unpickled_matrix._data, np.memmap)
+    assert unpickled_matrix.metadata == _METADATA
+    assert np.array_equal(unpickled_matrix[:], matrix[:])
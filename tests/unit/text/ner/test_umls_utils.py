@@ -1,4 +1,5 @@
 from pathlib import Path
+import shutil
 
 import pytest
 
@@ -64,6 +65,40 @@ def test_load_umls(sources, languages, expected_entries):
     assert list(entries_iter) == expected_entries
 
 
+@pytest.mark.parametrize(
+    "sources,languages,expected_entries",
+    _LOAD_TEST_PARAMS,
+)
+def test_load_umls_columnar(tmp_path, sources, languages, expected_entries):
+    columnar_cache_dir = tmp_path / "mrconso"
+    # 1st load converts MRCONSO, 2d load only reads columnar copy
+    for _ in range(2):
+        entries_iter = load_umls(
+            _PATH_TO_MR_CONSO_FILE,
+            sources=sources,
+            languages=languages,
+            columnar_cache_dir=columnar_cache_dir,
+        )
+        assert list(entries_iter) == expected_entries
+
+
+def test_load_umls_columnar_modified_file(tmp_path):
+    """Columnar copy of MRCONSO updated when file is modified"""
+
+    mrconso_file = tmp_path / "MRCONSO.RRF"
+    shutil.copy(_PATH_TO_MR_CONSO_FILE, mrconso_file)
+    columnar_cache_dir = tmp_path / "mrconso"
+    entries = list(load_umls(mrconso_file, columnar_cache_dir=columnar_cache_dir))
+
+    with open(mrconso_file, mode="a", encoding="utf-8") as fp:
+        fp.write(
+            "C0015967|FRE|P|L9999999|PF|S9999999|Y|A99999999||||MSHFRE|MH|D005334|"
+            "Fièvre|3|N||\n"
+        )
+    new_entries = list(load_umls(mrconso_file, columnar_cache_dir=columnar_cache_dir))
+    assert new_entries == entries + [UMLSEntry(cui="C0015967", term="Fièvre")]
+
+
 _PREPROCESS_TEST_PARAMS = [
     ("Diabète", "Diabète", False, False),
     ("diabète", "diabète", True, False),
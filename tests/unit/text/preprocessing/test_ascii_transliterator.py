@@ -0,0 +1,46 @@
+from medkit.core import ProvTracer
+from medkit.core.text import Segment, Span
+from medkit.core.text.transliteration import get_ascii_text, set_ascii_text
+from medkit.text.context import NegationDetector, NegationDetectorRule
+from medkit.text.preprocessing import ASCIITransliterator
+
+
+def _get_segment(text):
+    return Segment(label="sentence", spans=[Span(0, len(text))], text=text)
+
+
+def test_run():
+    segment = _get_segment("Pas de fièvre")
+    transliterator = ASCIITransliterator()
+    transliterator.run([segment])
+    assert get_ascii_text(segment) == "Pas de fievre"
+    # ascii text is not an attribute of the segment
+    assert len(segment.attrs) == 0
+
+    # ascii text is not computed twice
+    set_ascii_text(segment, "precomputed")
+    transliterator.run([segment])
+    assert get_ascii_text(segment) == "precomputed"
+
+
+def test_used_by_rule_based_operations():
+    segment = _get_segment("Pas de fièvre")
+    ASCIITransliterator().run([segment])
+    # alter precomputed ascii text (keeping same length) to make sure it is used
+    set_ascii_text(segment, "Sans fievre..")
+
+    rule = NegationDetectorRule(regexp=r"\bsans\b")
+    detector = NegationDetector(output_label="negation", rules=[rule])
+    detector.run([segment])
+    assert segment.attrs.get(label="negation")[0].value is True
+
+
+def test_prov():
+    """No provenance is added (no data item is created)"""
+
+    segment = _get_segment("Pas de fièvre")
+    transliterator = ASCIITransliterator()
+    prov_tracer = ProvTracer()
+    transliterator.set_prov_tracer(prov_tracer)
+    transliterator.run([segment])
+    assert prov_tracer.get_provs() == []
@@ -104,6 +104,20 @@ TEST_PARAMS_CONFIG = [
             ModifiedSpan(length=3, replaced_spans=[Span(start=32, end=33)]),
         ],
     ),
+    (
+        [("]", ")"), ("^", "**"), ("\\", "/"), ("-", "")],
+        "x^2 - 1 \\ 3]",
+        "x**2  1 / 3)",
+        [
+            Span(start=0, end=1),
+            ModifiedSpan(length=2, replaced_spans=[Span(start=1, end=2)]),
+            Span(start=2, end=4),
+            Span(start=5, end=8),
+            ModifiedSpan(length=1, replaced_spans=[Span(start=8, end=9)]),
+            Span(start=9, end=11),
+            ModifiedSpan(length=1, replaced_spans=[Span(start=11, end=12)]),
+        ],
+    ),
 ]
 
 
@@ -118,6 +132,7 @@ TEST_PARAMS_CONFIG = [
         "space_rules",
         "fraction_rules",
         "special_chars",
+        "regex_special_chars",
     ],
 )
 def test_char_replacer(rules, text, expected_text, expected_spans):
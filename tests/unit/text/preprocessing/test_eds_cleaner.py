@@ -1,9 +1,14 @@
+from pathlib import Path
+
 import pytest
 from medkit.core.prov_tracer import ProvTracer
 
 from medkit.core.text import Span, ModifiedSpan, Segment
+from medkit.text.preprocessing import CharReplacer
 from medkit.text.preprocessing.eds_cleaner import EDSCleaner
 
+_PATH_TO_EDS_DOCS = Path(__file__).parent / ".." / ".." / ".." / "data" / "text" / "eds"
+
 TEST_DEFAULT_CONFIG = [
     (
         (
@@ -99,13 +104,17 @@ def _get_raw_segment(text):
         "remove_multiple_newlines",
     ],
 )
-def test_default_cleaner(text, expected_text, expected_spans):
+@pytest.mark.parametrize("engine", ["sequential", "fused"])
+def test_default_cleaner(text, expected_text, expected_spans, engine):
     # default config: this configuration allows to obtain the
     # same results as in the original version of the endlines function
     # Note: EDSCleaner replaces now all whitespaces by a single whitespace
     # this is different from the original implementation but it's more coherent
     cleaner = EDSCleaner(
-        keep_endlines=False, handle_parentheses_eds=True, handle_points_eds=True
+        keep_endlines=False,
+        handle_parentheses_eds=True,
+        handle_points_eds=True,
+        engine=engine,
     )
     raw_segment = _get_raw_segment(text)
     clean_ann = cleaner.run([raw_segment])[0]
@@ -227,6 +236,41 @@ def test_cleaner_params(cleaner, text, expected_text, expected_spans):
     assert clean_ann.spans == expected_spans
 
 
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"keep_endlines": True},
+        {"handle_parentheses_eds": False},
+        {"handle_points_eds": False},
+    ],
+)
+@pytest.mark.parametrize("replace_chars", [False, True])
+def test_fused_engine(params, replace_chars):
+    """Fused and sequential engines must give exactly the same spans"""
+
+    segments = []
+    for path in sorted(_PATH_TO_EDS_DOCS.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        segments.append(_get_raw_segment(text))
+        # also try on parts of documents
+        segments.append(_get_raw_segment(text[len(text) // 3 :]))
+    if replace_chars:
+        # start from segments with many spans
+        segments = CharReplacer(output_label="replaced").run(segments)
+
+    sequential_segments = EDSCleaner(**params).run(segments)
+    fused_segments = EDSCleaner(engine="fused", **params).run(segments)
+    for sequential_segment, fused_segment in zip(sequential_segments, fused_segments):
+        assert fused_segment.text == sequential_segment.text
+        assert fused_segment.spans == sequential_segment.spans
+
+
+def test_unsupported_engine():
+    with pytest.raises(ValueError, match="Unsupported engine"):
+        EDSCleaner(engine="unknown")
+
+
 def test_prov():
     raw_segment = _get_raw_segment("Traitement :\n\n\n à dose curative dès cet appel.")
 
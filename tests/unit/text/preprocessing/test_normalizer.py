@@ -103,6 +103,17 @@ TEST_PARAMS_CONFIG = [
             ModifiedSpan(length=3, replaced_spans=[Span(start=32, end=33)]),
         ],
     ),
+    (
+        [(r"(\d+) ?mg", "N mg"), (r"(?P<unit>ml|cl)", "L")],
+        "5 ml et 10mg",
+        "5 L et N mg",
+        [
+            Span(start=0, end=2),
+            ModifiedSpan(length=1, replaced_spans=[Span(start=2, end=4)]),
+            Span(start=4, end=8),
+            ModifiedSpan(length=4, replaced_spans=[Span(start=8, end=12)]),
+        ],
+    ),
 ]
 
 
@@ -117,6 +128,7 @@ TEST_PARAMS_CONFIG = [
         "space_rules",
         "fraction_rules",
         "special_chars",
+        "rules_with_groups",
     ],
 )
 def test_normalizer(rules, text, expected_text, expected_spans):